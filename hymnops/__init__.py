@@ -0,0 +1,3 @@
+"""
+Python tooling for the HymnOps song library.
+"""
@@ -0,0 +1,6 @@
+import sys
+
+from hymnops.cli import main
+
+
+sys.exit(main())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Print the service-history aggregates that feed derived.json.
+
+Loads the library with hymnops.library and reports rotation health, most
+sung songs, writers, recent theme coverage and the top-10 share, without
+writing anything. `--json` prints the full derived document instead.
+Writer and artist rankings are merged by canonical name when
+imports/name-map.json exists (see hymnops.names); `--raw-names` turns
+that off.
+
+Usage:
+    python -m hymnops analyze [--root .] [--top 10] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from hymnops.files import ROOT
+from hymnops.library import dumps, load_library
+from hymnops.names import load_resolver, resolve_counts
+from hymnops.profiling import run
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Summarize rotation and usage statistics for the library.")
+    parser.add_argument("--root", type=Path, default=ROOT, help="library root containing songs/, services/, series/")
+    parser.add_argument("--top", type=int, default=10, help="rows to show per ranking")
+    parser.add_argument("--json", action="store_true", help="print the full derived.json document")
+    parser.add_argument("--raw-names", action="store_true", help="rank writers/artists as spelled, without name-map.json")
+    args = parser.parse_args(argv)
+
+    root = args.root.resolve()
+    library = load_library(root)
+    derived = library.derived()
+    if args.json:
+        print(dumps(derived))
+        return 0
+    if not args.raw_names:
+        writers, artists = load_resolver(root, "writers"), load_resolver(root, "artists")
+        derived["top_writers"] = resolve_counts(derived["top_writers"], "writer", writers)
+        derived["top_original_artists"] = resolve_counts(derived["top_original_artists"], "original_artist", artists)
+
+    print(f"songs={len(library.song_records)}")
+    print(f"services={len(library.services)}")
+    print(f"series={len(library.series)}")
+    for bucket, songs in derived["rotation_health"].items():
+        print(f"{bucket}={len(songs)}")
+    reliance = derived["over_reliance"]
+    print(f"top_10_share={reliance['top_10_share']:.3f}")
+    print(f"theme_gaps_last_12_weeks={', '.join(derived['theme_gaps_last_12_weeks']) or '-'}")
+
+    sections = [
+        ("top_songs", "slug"),
+        ("top_writers", "writer"),
+        ("top_original_artists", "original_artist"),
+        ("theme_coverage_last_12_weeks", "theme"),
+        ("doctrinal_coverage_last_12_weeks", "doctrine"),
+    ]
+    for section, label in sections:
+        print(f"{section}:")
+        for row in derived[section][: args.top]:
+            print(f"  {row['count']:>4}  {row[label]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(main))
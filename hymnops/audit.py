@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Report songs whose CCLI version is missing, inconsistent or ambiguous.
+
+This is the report step of openspec/changes/song-version-audit. Each song is
+flagged with one or more reasons:
+
+- missing-ccli:        no ccli_number
+- url-mismatch:        songselect_url id differs from ccli_number
+- missing-writers:     CCLI number set but writers empty
+- version-qualifier:   title carries a parenthesised qualifier ("(Getty)",
+                       "(Hymn)"), i.e. several versions exist
+- shared-title:        another song has the same title once qualifiers
+                       are stripped
+- weak-match:          the enrichment report matched it with a low score
+                       or to a differently named song
+
+Nothing is modified. The report is written as JSON for review.
+
+Usage:
+    python -m hymnops audit [--root .] [--output imports/song-version-audit.json] [--include-archive]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Any
+
+from hymnops.enrich import REPORT_NAME
+from hymnops.files import ROOT, list_markdown_files
+from hymnops.frontmatter import parse_frontmatter
+from hymnops.profiling import run
+
+
+STRONG_MATCH_SCORE = 120.0
+QUALIFIER_RE = re.compile(r"\(([^)]*)\)")
+URL_ID_RE = re.compile(r"/songs/(\d+)")
+NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+
+def base_title(title: str) -> str:
+    return NON_ALNUM_RE.sub(" ", QUALIFIER_RE.sub(" ", title.lower())).strip()
+
+
+def load_matches(root: Path) -> dict[str, dict[str, Any]]:
+    path = root / "imports" / REPORT_NAME
+    if not path.is_file():
+        return {}
+    report = json.loads(path.read_text(encoding="utf-8"))
+    return {match["file"]: match for match in report.get("matches", []) if isinstance(match, dict) and "file" in match}
+
+
+def audit_songs(root: Path, include_archive: bool = False) -> list[dict[str, Any]]:
+    matches = load_matches(root)
+    songs: list[tuple[str, dict[str, Any]]] = []
+    for path in list_markdown_files(root / "songs"):
+        fm, _body = parse_frontmatter(path.read_text(encoding="utf-8"))
+        if include_archive or fm.get("status") != "archive":
+            songs.append((path.name, fm))
+
+    by_base: dict[str, list[str]] = {}
+    for _name, fm in songs:
+        slug = str(fm.get("slug") or "")
+        by_base.setdefault(base_title(str(fm.get("title") or slug)), []).append(slug)
+
+    flagged: list[dict[str, Any]] = []
+    for name, fm in songs:
+        title = str(fm.get("title") or "")
+        slug = str(fm.get("slug") or name[:-3])
+        ccli = fm.get("ccli_number") if isinstance(fm.get("ccli_number"), str) else None
+        url = fm.get("songselect_url") if isinstance(fm.get("songselect_url"), str) else None
+        reasons: list[str] = []
+
+        if not ccli:
+            reasons.append("missing-ccli")
+        url_id = URL_ID_RE.search(url).group(1) if url and URL_ID_RE.search(url) else None
+        if ccli and url_id and url_id != ccli:
+            reasons.append("url-mismatch")
+        if ccli and not fm.get("writers"):
+            reasons.append("missing-writers")
+        if QUALIFIER_RE.search(title):
+            reasons.append("version-qualifier")
+        siblings = [other for other in by_base.get(base_title(title or slug), []) if other != slug]
+        if siblings:
+            reasons.append("shared-title")
+
+        match = matches.get(name)
+        if match is not None:
+            renamed = base_title(str(match.get("matched_title") or "")) != base_title(title)
+            if float(match.get("score") or 0) < STRONG_MATCH_SCORE or renamed:
+                reasons.append("weak-match")
+
+        if reasons:
+            flagged.append(
+                {
+                    "file": name,
+                    "title": title,
+                    "ccli_number": ccli,
+                    "songselect_url": url,
+                    "reasons": reasons,
+                    "same_title_as": siblings,
+                    "enrichment_match": match,
+                }
+            )
+    return flagged
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Report songs with missing, inconsistent or ambiguous CCLI versions.")
+    parser.add_argument("--root", type=Path, default=ROOT, help="library root containing songs/ and imports/")
+    parser.add_argument("--output", type=Path, default=Path("imports/song-version-audit.json"), help="relative to --root")
+    parser.add_argument("--include-archive", action="store_true", help="also audit archived songs")
+    args = parser.parse_args(argv)
+
+    root = args.root.resolve()
+    flagged = audit_songs(root, args.include_archive)
+    output = args.output if args.output.is_absolute() else root / args.output
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({"flagged_count": len(flagged), "songs": flagged}, indent=2) + "\n", encoding="utf-8")
+
+    counts: dict[str, int] = {}
+    for entry in flagged:
+        for reason in entry["reasons"]:
+            counts[reason] = counts.get(reason, 0) + 1
+    print(f"flagged_songs={len(flagged)}")
+    for reason, count in sorted(counts.items()):
+        print(f"{reason}={count}")
+    print(f"report={output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(main))
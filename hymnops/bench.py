@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmarks for the Python data scripts on synthetic libraries.
+
+For each requested scale a library is generated with hymnops.synth and the
+following stages are timed (best of --repeat runs, items/second) and then
+re-run once under tracemalloc for peak memory:
+
+- parse:      read + parse every song file (hymnops.frontmatter)
+- classify:   hymnops.classify infer_themes + infer_doctrines per song
+- serialize:  dump_frontmatter per song
+- build:      hymnops.library load + render of every public/data output
+- index:      hymnops.query bitmap index build over the loaded songs
+- query:      QUERY_MIX filter expressions against that index
+- load_dicts / load_records: the whole library (songs, services, series)
+              held as frontmatter dicts vs hymnops.records objects;
+              retained_kb is what the loaded library keeps alive
+- rotation:   hymnops.rotation backfill from those records + the
+              overused / neglected / ready queries
+- enrich:     hymnops.enrich main() against a local HTTP stub
+              (skipped when `requests` is not installed)
+
+Results are written as JSON. With `--baseline`, any stage slower or
+heavier than baseline * (1 + tolerance) is reported and the exit code is 1.
+
+Usage:
+    python -m hymnops.bench [--scale 1000 --scale 10000] [--output bench.json]
+                            [--baseline bench.json] [--save-baseline bench.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import importlib.util
+import json
+import platform
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable
+from urllib.parse import parse_qs, urlparse
+
+from hymnops import classify, enrich
+from hymnops.files import list_markdown_files
+from hymnops.frontmatter import dump_frontmatter, parse_frontmatter
+from hymnops.library import OUTPUT_NAMES, Library
+from hymnops.query import QueryEngine
+from hymnops.records import load_records
+from hymnops.rotation import RotationEngine
+from hymnops.profiling import run
+from hymnops.synth import generate_library
+
+
+DEFAULT_SCALES = [1000]
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_REPEAT = 3
+ENRICH_SAMPLE = 300
+QUERY_MIX = [
+    "status:active key:G tempo<80 theme:lament weeks_since>=12",
+    "(theme:grace or doctrine:eschatology) -tone:solemn year:1800..1950",
+    "tempo>=60 tempo<=120 time_signature:3/4,6/8",
+    "status:active times_sung>=3 last_sung<2001-01-01",
+    "not status:archive",
+]
+QUERY_ROUNDS = 20
+
+
+# -- local CCLI stub ---------------------------------------------------------
+
+
+def stub_number(text: str) -> str:
+    return str(zlib.crc32(text.lower().encode("utf-8")) % 9_000_000 + 10_000)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers the SongSelect/Rehearse endpoints with a deterministic echo of the query."""
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - stdlib signature
+        pass
+
+    def _send(self, payload: Any) -> None:
+        body = json.dumps({"payload": payload}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:  # noqa: N802 - stdlib naming
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path.endswith("/GetSongDetails"):
+            number = query.get("songNumber", "")
+            self._send({"title": f"Song {number}", "ccliSongNumber": number, "authors": [{"label": "Stub Writer"}]})
+            return
+        title = query.get("search") or f"Song {query.get('cclisongnumber', '')}"
+        number = query.get("cclisongnumber") or stub_number(title)
+        self._send(
+            [
+                {
+                    "title": title,
+                    "artistName": "Stub Artist",
+                    "bpm": 72,
+                    "key": "g",
+                    "timeSignature": "4/4",
+                    "authors": ["Stub Writer"],
+                    "otherIds": {"ccliSongNumber": number},
+                    "score": 1.0,
+                }
+            ]
+        )
+
+    def do_POST(self) -> None:  # noqa: N802 - stdlib naming
+        length = int(self.headers.get("Content-Length") or 0)
+        form = {k: v[0] for k, v in parse_qs(self.rfile.read(length).decode("utf-8")).items()}
+        title = form.get("search", "")
+        self._send(
+            {
+                "items": [
+                    {
+                        "title": title,
+                        "songNumber": stub_number(title),
+                        "slug": title.lower().replace(" ", "-"),
+                        "authors": [{"label": "Stub Writer"}],
+                        "score": 1.0,
+                    }
+                ]
+            }
+        )
+
+
+class StubServer:
+    def __enter__(self) -> str:
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __exit__(self, *exc: Any) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# -- stages ------------------------------------------------------------------
+
+
+def measure(fn: Callable[[], int], trace_memory: bool, repeat: int, retained: bool = False) -> dict[str, Any]:
+    """Best-of-`repeat` wall time, then one extra run under tracemalloc for peak memory.
+
+    With `retained`, also report what is still allocated once `fn` returns,
+    i.e. the footprint of whatever it stored.
+    """
+    seconds = float("inf")
+    items = 0
+    for _ in range(max(1, repeat)):
+        gc.collect()
+        started = time.perf_counter()
+        items = fn()
+        seconds = min(seconds, time.perf_counter() - started)
+    result: dict[str, Any] = {
+        "items": items,
+        "seconds": round(seconds, 4),
+        "items_per_second": round(items / seconds, 1) if seconds > 0 else None,
+    }
+    if trace_memory:
+        gc.collect()
+        tracemalloc.start()
+        fn()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["peak_memory_kb"] = round(peak / 1024, 1)
+        if retained:
+            result["retained_memory_kb"] = round(current / 1024, 1)
+    return result
+
+
+def run_scale(scale: int, seed: int, trace_memory: bool, enrich_sample: int, repeat: int) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+
+    with tempfile.TemporaryDirectory(prefix=f"hymnops-bench-{scale}-") as tmp:
+        root = Path(tmp)
+        started = time.perf_counter()
+        counts = generate_library(root, songs=scale, seed=seed)
+        results["generate"] = {"items": counts["songs"], "seconds": round(time.perf_counter() - started, 4)}
+        song_files = list_markdown_files(root / "songs")
+        parsed: list[dict[str, Any]] = []
+
+        def parse() -> int:
+            parsed.clear()
+            for path in song_files:
+                data, _body = parse_frontmatter(path.read_text(encoding="utf-8"))
+                parsed.append(data)
+            return len(parsed)
+
+        def classify_all() -> int:
+            for data in parsed:
+                title = str(data.get("title") or "")
+                aka = [str(x) for x in data.get("aka") or []]
+                themes = classify.infer_themes(title, aka, list(data.get("dominant_themes") or []))
+                classify.infer_doctrines(title, themes, list(data.get("doctrinal_categories") or []))
+            return len(parsed)
+
+        def serialize() -> int:
+            for data in parsed:
+                dump_frontmatter(data)
+            return len(parsed)
+
+        def build() -> int:
+            library = Library(root)
+            library.load()
+            for name in OUTPUT_NAMES:
+                library.render(name)
+            return len(library.song_records) + len(library.services) + len(library.series)
+
+        results["parse"] = measure(parse, trace_memory, repeat)
+        results["classify"] = measure(classify_all, trace_memory, repeat)
+        results["serialize"] = measure(serialize, trace_memory, repeat)
+        results["build"] = measure(build, trace_memory, repeat)
+
+        library = Library(root)
+        library.load()
+        songs = library.sorted_songs()
+        engines: list[QueryEngine] = []
+
+        def index() -> int:
+            engines[:] = [QueryEngine(songs)]
+            return len(songs)
+
+        def query() -> int:
+            engine = engines[0]
+            for _ in range(QUERY_ROUNDS):
+                for text in QUERY_MIX:
+                    engine.count(text)
+            return QUERY_ROUNDS * len(QUERY_MIX)
+
+        results["index"] = measure(index, trace_memory, repeat)
+        results["query"] = measure(query, trace_memory, repeat)
+
+        loaded: list[Any] = []
+
+        def load_dicts() -> int:
+            loaded.clear()
+            for directory in ("songs", "services", "series"):
+                for path in list_markdown_files(root / directory):
+                    loaded.append(parse_frontmatter(path.read_text(encoding="utf-8")))
+            return len(loaded)
+
+        def load_record_set() -> int:
+            loaded.clear()
+            records = load_records(root)
+            loaded.append(records)
+            return len(records.songs) + len(records.services) + len(records.series)
+
+        results["load_dicts"] = measure(load_dicts, trace_memory, repeat, retained=True)
+        results["load_records"] = measure(load_record_set, trace_memory, repeat, retained=True)
+        records = loaded[0]
+        loaded.clear()
+
+        def rotation() -> int:
+            engine = RotationEngine.from_records(records)
+            week = engine.latest_week or 0
+            engine.overused(week, 50)
+            engine.neglected(week, 50)
+            engine.ready(week, 50)
+            return sum(len(service.songs) for service in records.services)
+
+        results["rotation"] = measure(rotation, trace_memory, repeat)
+        results["enrich"] = run_enrich(root, song_files[:enrich_sample], trace_memory, repeat)
+
+    return {"counts": counts, "stages": results}
+
+
+def run_enrich(root: Path, sample: list[Path], trace_memory: bool, repeat: int) -> dict[str, Any]:
+    if importlib.util.find_spec("requests") is None:
+        return {"skipped": "enrich unavailable: requests is not installed"}
+
+    sample_dir = root / "enrich-sample"
+    (sample_dir / "songs").mkdir(parents=True)
+    (sample_dir / "imports").mkdir()
+    originals = {path.name: path.read_text(encoding="utf-8") for path in sample}
+
+    def reset() -> None:
+        for name, text in originals.items():
+            (sample_dir / "songs" / name).write_text(text, encoding="utf-8")
+
+    with StubServer() as base_url:
+        enrich.SLEEP_SECONDS = 0
+        enrich.REHEARSE_API_URL = f"{base_url}/api/songs"
+        enrich.SONGSELECT_SEARCH_URL = f"{base_url}/api/GetSongSearchResults"
+        enrich.SONGSELECT_DETAILS_URL = f"{base_url}/api/GetSongDetails"
+
+        def enrich_once() -> int:
+            reset()
+            with open(sample_dir / "stdout.txt", "w", encoding="utf-8") as sink:
+                saved = sys.stdout
+                sys.stdout = sink
+                try:
+                    enrich.main(["--root", str(sample_dir)])
+                finally:
+                    sys.stdout = saved
+            return len(originals)
+
+        return measure(enrich_once, trace_memory, repeat)
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    regressions: list[str] = []
+    for scale, current in results.get("scales", {}).items():
+        reference = baseline.get("scales", {}).get(scale)
+        if not reference:
+            continue
+        for stage, metrics in current["stages"].items():
+            ref = reference["stages"].get(stage) or {}
+            for metric in ("seconds", "peak_memory_kb", "retained_memory_kb"):
+                now_value = metrics.get(metric)
+                ref_value = ref.get(metric)
+                if not isinstance(now_value, (int, float)) or not isinstance(ref_value, (int, float)) or ref_value <= 0:
+                    continue
+                if stage == "generate" and metric == "seconds":
+                    continue
+                if now_value > ref_value * (1 + tolerance):
+                    ratio = now_value / ref_value
+                    regressions.append(f"{scale} {stage} {metric}: {ref_value} -> {now_value} ({ratio:.2f}x)")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Python data scripts on synthetic libraries.")
+    parser.add_argument("--scale", type=int, action="append", help="number of songs (repeatable; default 1000)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--enrich-sample", type=int, default=ENRICH_SAMPLE, help="songs sent through enrichment")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="runs per stage; the fastest is kept")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument("--baseline", type=Path, help="compare against this results JSON")
+    parser.add_argument("--save-baseline", type=Path, help="also write results to this baseline path")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed slowdown fraction")
+    args = parser.parse_args(argv)
+
+    scales = args.scale or DEFAULT_SCALES
+    results: dict[str, Any] = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "enrich_sample": args.enrich_sample,
+            "repeat": args.repeat,
+        },
+        "scales": {},
+    }
+    for scale in scales:
+        report = run_scale(scale, args.seed, not args.no_memory, args.enrich_sample, args.repeat)
+        results["scales"][str(scale)] = report
+        for stage, metrics in report["stages"].items():
+            if "skipped" in metrics:
+                print(f"scale={scale} stage={stage} skipped ({metrics['skipped']})")
+                continue
+            memory = f" peak_kb={metrics['peak_memory_kb']}" if "peak_memory_kb" in metrics else ""
+            if "retained_memory_kb" in metrics:
+                memory += f" retained_kb={metrics['retained_memory_kb']}"
+            rate = f" items_per_s={metrics['items_per_second']}" if metrics.get("items_per_second") else ""
+            print(f"scale={scale} stage={stage} items={metrics['items']} seconds={metrics['seconds']}{rate}{memory}")
+
+    payload = json.dumps(results, indent=2)
+    for path in (args.output, args.save_baseline):
+        if path:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(payload + "\n", encoding="utf-8")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+        if regressions:
+            print(f"regressions={len(regressions)}")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("regressions=0")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(main))
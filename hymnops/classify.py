@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+Populate dominant_themes and doctrinal_categories in songs/*.md.
+
+This classifier uses title/alias heuristics and controlled vocab from TAXONOMY.md.
+It intentionally avoids storing any lyrics text.
+
+Rules are data (THEME_RULES, DOCTRINE_THEME_RULES, DOCTRINE_TITLE_RULES) and
+each has an id that fingerprints its pattern and output. A sidecar index,
+imports/classification-index.json, records per song the inputs digest
+(title, aka, existing themes and doctrines), the normalized text the rules
+saw and the ids of the rules that fired. A rerun re-evaluates only songs
+that are new, whose inputs changed, that matched a rule which has since
+changed or been removed, or that a new or edited rule now matches. Editing
+one regex therefore touches only the songs it affects, and curated themes
+on other songs are never rewritten. Changing the vocabularies, limits or
+fallbacks (or RULESET_VERSION, bumped when the evaluation code changes)
+re-evaluates everything, as does --full.
+
+Usage:
+    python -m hymnops classify [--root .] [--full] [songs/foo.md ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from collections import Counter
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import Any
+
+from hymnops.files import ROOT, atomic_write_text, list_markdown_files
+from hymnops.frontmatter import dump_frontmatter, parse_frontmatter
+from hymnops.profiling import run, timed
+
+
+THEME_VOCAB = {
+    "Adoration",
+    "Awe",
+    "Confession",
+    "Repentance",
+    "Assurance",
+    "Grace",
+    "Mercy",
+    "Holiness",
+    "Sovereignty",
+    "Providence",
+    "Faithfulness",
+    "Covenant",
+    "Identity in Christ",
+    "Union with Christ",
+    "Discipleship",
+    "Mission",
+    "Evangelism",
+    "Justice",
+    "Compassion",
+    "Lament",
+    "Suffering",
+    "Hope",
+    "Resurrection",
+    "Second Coming",
+    "Kingdom of God",
+    "Cross",
+    "Atonement",
+    "Forgiveness",
+    "Sanctification",
+    "Spiritual Warfare",
+    "Prayer",
+    "Thanksgiving",
+    "Joy",
+    "Peace",
+    "Contentment",
+    "Guidance",
+    "Communion",
+    "Baptism",
+    "Creation",
+    "Stewardship",
+    "Community",
+    "Sending",
+}
+
+DOCTRINE_VOCAB = {
+    "Trinity",
+    "Christology",
+    "Pneumatology",
+    "Soteriology",
+    "Ecclesiology",
+    "Eschatology",
+    "Sanctification",
+    "Scripture",
+    "Lament",
+    "Mission",
+    "Prayer",
+    "Worship",
+    "Sacraments",
+    "Providence",
+}
+
+
+RULESET_VERSION = 1
+THEME_LIMIT = 4
+DOCTRINE_LIMIT = 3
+THEME_FALLBACKS = ("Adoration", "Faithfulness")
+DOCTRINE_FALLBACK = "Worship"
+INDEX = Path("imports/classification-index.json")
+INDEX_VERSION = 1
+
+
+@dataclass(frozen=True)
+class Rule:
+    """One classification rule.
+
+    - kind "theme":          `pattern` searched in the normalized title + aka
+    - kind "doctrine-theme": fires when the song has any theme in `when`
+    - kind "doctrine-title": `pattern` searched in the normalized title
+    """
+
+    kind: str
+    values: tuple[str, ...]
+    pattern: str = ""
+    when: tuple[str, ...] = ()
+
+    @cached_property
+    def id(self) -> str:
+        """Fingerprint of what the rule matches and what it adds; unchanged rules keep their id."""
+        payload = json.dumps([self.kind, self.pattern, sorted(self.when), list(self.values)])
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+    def matches(self, text: str, title: str, themes: list[str]) -> bool:
+        if self.kind == "doctrine-theme":
+            return any(theme in self.when for theme in themes)
+        return re.search(self.pattern, text if self.kind == "theme" else title) is not None
+
+
+THEME_RULES = [
+    Rule(
+        "theme",
+        ("Cross", "Atonement", "Grace", "Forgiveness"),
+        r"\b(cross|calvary|blood|redeemer|redeemed|paid it all|nothing but the blood|finished upon that cross|sorrows|lamb)\b",
+    ),
+    Rule(
+        "theme",
+        ("Resurrection", "Hope", "Assurance"),
+        r"\b(risen|resurrection|living hope|he lives|roll is called up yonder)\b",
+    ),
+    Rule(
+        "theme",
+        ("Hope", "Joy", "Adoration"),
+        r"\b(noel|emmanuel|bethlehem|angels we have heard|hark the herald|o holy night|silent night|what child|joy has dawned|christmas)\b",
+    ),
+    Rule("theme", ("Holiness", "Sanctification", "Awe"), r"\b(holy|holiness|purify|refiner|sanctif)\b"),
+    Rule(
+        "theme",
+        ("Kingdom of God", "Sovereignty", "Adoration"),
+        r"\b(king|throne|lord of lords|majesty|almighty|reign|crown him|sovereign)\b",
+    ),
+    Rule(
+        "theme",
+        ("Adoration", "Joy", "Thanksgiving"),
+        r"\b(praise|rejoice|celebrate|hallelujah|thanks|thanksgiving|glorified|bless)\b",
+    ),
+    Rule(
+        "theme",
+        ("Faithfulness", "Providence", "Assurance"),
+        r"\b(faith|trust|steadfast|wait|hold me fast|goodness|mercy|through it all|everlasting)\b",
+    ),
+    Rule("theme", ("Hope", "Second Coming"), r"\b(hope|heaven|yonder|coming)\b"),
+    Rule("theme", ("Community", "Discipleship"), r"\b(church|family|one voice|we are one|belong)\b"),
+    Rule(
+        "theme",
+        ("Mission", "Evangelism", "Sending"),
+        r"\b(mission|declare|cause|call|task unfinished|gospel|evangel)\b",
+    ),
+    Rule("theme", ("Prayer",), r"\b(prayer|pray)\b"),
+    Rule("theme", ("Peace", "Hope"), r"\b(peace|still my soul|it is well|comfort)\b"),
+    Rule("theme", ("Guidance", "Discipleship"), r"\b(word|truth|scripture|way)\b"),
+    Rule("theme", ("Grace", "Compassion"), r"\b(love|compassion)\b"),
+    Rule(
+        "theme",
+        ("Repentance", "Discipleship", "Sanctification"),
+        r"\b(take my life|i surrender|just as i am|consecrate)\b",
+    ),
+    Rule("theme", ("Creation", "Providence"), r"\b(creation|father s world|tree|deer)\b"),
+]
+
+DOCTRINE_THEME_RULES = [
+    Rule(
+        "doctrine-theme",
+        ("Soteriology",),
+        when=("Cross", "Atonement", "Forgiveness", "Grace", "Mercy", "Resurrection", "Assurance"),
+    ),
+    Rule("doctrine-theme", ("Eschatology",), when=("Kingdom of God", "Second Coming", "Hope")),
+    Rule("doctrine-theme", ("Providence",), when=("Sovereignty", "Providence", "Faithfulness", "Creation")),
+    Rule(
+        "doctrine-theme",
+        ("Sanctification",),
+        when=("Discipleship", "Sanctification", "Holiness", "Repentance", "Contentment"),
+    ),
+    Rule("doctrine-theme", ("Mission",), when=("Mission", "Evangelism", "Sending")),
+    Rule("doctrine-theme", ("Prayer",), when=("Prayer",)),
+    Rule("doctrine-theme", ("Ecclesiology",), when=("Community",)),
+    Rule("doctrine-theme", ("Sacraments",), when=("Communion", "Baptism")),
+    Rule("doctrine-theme", ("Worship",), when=("Adoration", "Awe", "Joy", "Thanksgiving", "Peace", "Compassion")),
+    Rule("doctrine-theme", ("Scripture",), when=("Guidance",)),
+    Rule("doctrine-theme", ("Lament",), when=("Lament", "Suffering")),
+]
+
+DOCTRINE_TITLE_RULES = [
+    Rule("doctrine-title", ("Christology",), r"\b(jesus|christ|saviour|lamb|redeemer|cross)\b"),
+    Rule("doctrine-title", ("Pneumatology",), r"\b(spirit|holy spirit)\b"),
+    Rule("doctrine-title", ("Trinity",), r"\b(trinity|father son spirit|holy holy holy)\b"),
+    Rule("doctrine-title", ("Scripture",), r"\b(word|truth|scripture|bible)\b"),
+]
+
+RULES = THEME_RULES + DOCTRINE_THEME_RULES + DOCTRINE_TITLE_RULES
+
+
+def ruleset_base() -> str:
+    """Fingerprint of everything outside the rule lists; a change re-evaluates every song."""
+    payload = json.dumps(
+        [
+            RULESET_VERSION,
+            sorted(THEME_VOCAB),
+            sorted(DOCTRINE_VOCAB),
+            THEME_LIMIT,
+            DOCTRINE_LIMIT,
+            THEME_FALLBACKS,
+            DOCTRINE_FALLBACK,
+        ]
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+
+def normalize(value: str) -> str:
+    value = value.lower().strip()
+    value = re.sub(r"[^a-z0-9]+", " ", value)
+    return re.sub(r"\s+", " ", value).strip()
+
+
+def add_unique(target: list[str], value: str) -> None:
+    if value not in target:
+        target.append(value)
+
+
+@timed
+def infer_themes(title: str, aka: list[str], existing: list[str], matched: list[str] | None = None) -> list[str]:
+    text = normalize(" ".join([title] + aka))
+    themes: list[str] = []
+
+    for item in existing:
+        if item in THEME_VOCAB:
+            add_unique(themes, item)
+
+    for rule in THEME_RULES:
+        if rule.matches(text, "", themes):
+            for value in rule.values:
+                add_unique(themes, value)
+            if matched is not None:
+                matched.append(rule.id)
+
+    for fallback in THEME_FALLBACKS:
+        if len(themes) < 2:
+            add_unique(themes, fallback)
+
+    filtered = [t for t in themes if t in THEME_VOCAB]
+    return filtered[:THEME_LIMIT]
+
+
+@timed
+def infer_doctrines(title: str, themes: list[str], existing: list[str], matched: list[str] | None = None) -> list[str]:
+    text = normalize(title)
+    docs: list[str] = []
+
+    for item in existing:
+        if item in DOCTRINE_VOCAB:
+            add_unique(docs, item)
+
+    fired: set[str] = set()
+    for theme in themes:
+        for rule in DOCTRINE_THEME_RULES:
+            if theme in rule.when:
+                add_unique(docs, rule.values[0])
+                fired.add(rule.id)
+    for rule in DOCTRINE_TITLE_RULES:
+        if rule.matches("", text, themes):
+            add_unique(docs, rule.values[0])
+            fired.add(rule.id)
+    if matched is not None:
+        matched.extend(rule.id for rule in DOCTRINE_THEME_RULES + DOCTRINE_TITLE_RULES if rule.id in fired)
+
+    if not docs:
+        docs = [DOCTRINE_FALLBACK]
+
+    filtered = [d for d in docs if d in DOCTRINE_VOCAB]
+    return filtered[:DOCTRINE_LIMIT]
+
+
+def song_inputs(data: dict[str, Any]) -> tuple[str, list[str], list[str], list[str]]:
+    title = str(data.get("title") or "").strip()
+    aka_raw = data.get("aka")
+    aka = [str(x).strip() for x in (aka_raw if isinstance(aka_raw, list) else []) if str(x).strip()]
+    themes = data.get("dominant_themes") if isinstance(data.get("dominant_themes"), list) else []
+    docs = data.get("doctrinal_categories") if isinstance(data.get("doctrinal_categories"), list) else []
+    return title, aka, [str(x) for x in themes if isinstance(x, str)], [str(x) for x in docs if isinstance(x, str)]
+
+
+def inputs_digest(data: dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(song_inputs(data)).encode("utf-8")).hexdigest()[:12]
+
+
+def file_stat(path: Path) -> list[int]:
+    stat = path.stat()
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def classify_file(path: Path, text: str | None = None) -> tuple[bool, dict[str, Any]]:
+    """Re-derive the taxonomy fields for one song file.
+
+    Returns whether the file was rewritten and its index entry: the inputs
+    digest, the normalized text the rules see, the resulting themes and the
+    ids of the rules that fired, in evaluation order.
+    """
+    text = path.read_text(encoding="utf-8") if text is None else text
+    data, body = parse_frontmatter(text)
+
+    title, aka, existing_themes, existing_docs = song_inputs(data)
+    matched: list[str] = []
+    themes = infer_themes(title, aka, existing_themes, matched)
+    docs = infer_doctrines(title, themes, existing_docs, matched)
+
+    changed = False
+    if data.get("dominant_themes") != themes:
+        data["dominant_themes"] = themes
+        changed = True
+    if data.get("doctrinal_categories") != docs:
+        data["doctrinal_categories"] = docs
+        changed = True
+
+    if changed:
+        path.write_text(dump_frontmatter(data) + body, encoding="utf-8")
+    entry = {
+        "stat": file_stat(path),
+        "inputs": inputs_digest(data),
+        "text": normalize(" ".join([title] + aka)),
+        "title": normalize(title),
+        "themes": themes,
+        "rules": matched,
+    }
+    return changed, entry
+
+
+def load_index(path: Path) -> dict[str, Any]:
+    empty = {"version": INDEX_VERSION, "base": None, "rules": [], "songs": {}}
+    if not path.is_file():
+        return empty
+    index = json.loads(path.read_text(encoding="utf-8"))
+    return index if index.get("version") == INDEX_VERSION else empty
+
+
+def stale_reason(
+    path: Path,
+    entry: dict[str, Any] | None,
+    removed: set[str],
+    added: list[Rule],
+    position: dict[str, int],
+) -> str | None:
+    """Why `path` must be re-evaluated, or None if its index entry is still valid.
+
+    Only a changed file is read; rule changes are checked against the
+    normalized text and themes kept in the entry.
+    """
+    if entry is None:
+        return "new"
+    if entry["stat"] != file_stat(path):
+        data, _body = parse_frontmatter(path.read_text(encoding="utf-8"))
+        if inputs_digest(data) != entry["inputs"]:
+            return "inputs"
+        entry["stat"] = file_stat(path)
+    if removed.intersection(entry["rules"]):
+        return "rule-removed"
+    if any(rule.matches(entry["text"], entry["title"], entry["themes"]) for rule in added):
+        return "rule-added"
+    order = [position[rule_id] for rule_id in entry["rules"]]
+    if order != sorted(order):
+        return "rule-order"
+    return None
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Populate dominant_themes and doctrinal_categories in songs/*.md.")
+    parser.add_argument("--root", type=Path, default=ROOT, help="library root containing songs/")
+    parser.add_argument("--index", type=Path, default=INDEX, help="sidecar rule index, relative to --root")
+    parser.add_argument("--full", action="store_true", help="re-evaluate every song, ignoring the index")
+    parser.add_argument("files", nargs="*", type=Path, help="only classify these song files (always re-evaluated)")
+    args = parser.parse_args(argv)
+
+    root = args.root.resolve()
+    files = args.files or list_markdown_files(root / "songs")
+    if not files:
+        print("No song files found.")
+        return 0
+
+    index_path = args.index if args.index.is_absolute() else root / args.index
+    index = load_index(index_path)
+    base = ruleset_base()
+    if args.full or index["base"] != base:
+        index["songs"] = {}
+    position = {rule.id: i for i, rule in enumerate(RULES)}
+    previous_rules = set(index["rules"]) if index["songs"] else set()
+    removed = previous_rules - set(position)
+    added = [rule for rule in RULES if rule.id not in previous_rules]
+
+    reasons: Counter[str] = Counter()
+    updated = 0
+    songs: dict[str, dict[str, Any]] = index["songs"]
+    for path in files:
+        reason = "explicit" if args.files else stale_reason(path, songs.get(path.name), removed, added, position)
+        if reason is None:
+            continue
+        reasons[reason] += 1
+        changed, songs[path.name] = classify_file(path)
+        updated += changed
+
+    if not args.files:
+        # A partial run leaves other songs evaluated against the previous rule
+        # list, so the index only moves to the new rules after a full pass.
+        live = {path.name for path in files}
+        index["songs"] = {name: entry for name, entry in songs.items() if name in live}
+        index["rules"] = list(position)
+        index["base"] = base
+    atomic_write_text(index_path, json.dumps(index, separators=(",", ":")) + "\n")
+
+    print(f"updated_files={updated}")
+    print(f"evaluated_files={sum(reasons.values())}")
+    print(f"total_files={len(files)}")
+    for reason, count in sorted(reasons.items()):
+        print(f"reason_{reason.replace('-', '_')}={count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(main))
@@ -0,0 +1,86 @@
+"""
+`python -m hymnops <command> [args]`: one entry point for the Python tooling.
+
+Only this module is imported up front. The chosen subcommand's module is
+imported after the command line is read, so `hymnops validate songs/x.md`
+never loads the HTTP stack, the library builder or the benchmark harness.
+Every subcommand accepts --profile / --trace-memory (see hymnops.profiling).
+
+`--timing` (before the command) prints, on stderr, how long the subcommand
+import and the run took. For a per-module breakdown of startup cost use
+`python -X importtime -m hymnops <command> ...`.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+
+_STARTED = time.perf_counter()
+
+COMMANDS: dict[str, tuple[str, str]] = {
+    "validate": ("hymnops.validate", "check frontmatter and cross-references"),
+    "classify": ("hymnops.classify", "fill dominant_themes / doctrinal_categories"),
+    "enrich": ("hymnops.enrich", "fill missing CCLI metadata from SongSelect"),
+    "import": ("hymnops.importer", "import a yearly service CSV"),
+    "analyze": ("hymnops.analyze", "print rotation and usage statistics"),
+    "audit": ("hymnops.audit", "report ambiguous or inconsistent CCLI versions"),
+    "query": ("hymnops.query", "filter songs with the bitmap query DSL"),
+    "history": ("hymnops.history", "mine git history for per-field song timelines"),
+    "names": ("hymnops.names", "cluster writer/artist spellings into name-map.json"),
+    "export": ("hymnops.columnar", "export service history as a columnar dataset"),
+    "rotation": ("hymnops.rotation", "list overused, neglected and ready-to-return songs"),
+    "sermons": ("hymnops.sermons", "suggest songs for upcoming sermons"),
+    "federate": ("hymnops.federation", "merge several congregations' libraries into one index"),
+    "watch": ("hymnops.watch", "rebuild public/data incrementally on change"),
+    "shards": ("hymnops.shards", "write content-hashed data shards"),
+    "search": ("hymnops.search_index", "build the client-side search index"),
+    "synth": ("hymnops.synth", "generate a synthetic library"),
+    "bench": ("hymnops.bench", "benchmark the data scripts"),
+}
+
+
+def usage() -> str:
+    width = max(len(name) for name in COMMANDS)
+    lines = ["usage: python -m hymnops [--timing] <command> [args]", "", "commands:"]
+    lines.extend(f"  {name:<{width}}  {summary}" for name, (_module, summary) in COMMANDS.items())
+    lines.append("")
+    lines.append("Run `python -m hymnops <command> --help` for command options.")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = list(sys.argv[1:] if argv is None else argv)
+    timing = "--timing" in args[:1]
+    if timing:
+        args = args[1:]
+    if not args or args[0] in ("-h", "--help"):
+        print(usage())
+        return 0 if args else 2
+
+    command, rest = args[0], args[1:]
+    entry = COMMANDS.get(command)
+    if entry is None:
+        print(f"unknown command: {command}\n\n{usage()}", file=sys.stderr)
+        return 2
+
+    import importlib
+
+    from hymnops.profiling import run
+
+    imported = time.perf_counter()
+    module = importlib.import_module(entry[0])
+    loaded = time.perf_counter()
+
+    sys.argv = [f"hymnops {command}", *rest]
+    try:
+        return run(module.main, name=command)
+    finally:
+        if timing:
+            done = time.perf_counter()
+            print(
+                f"startup_ms={(imported - _STARTED) * 1000:.1f} "
+                f"import_ms={(loaded - imported) * 1000:.1f} "
+                f"run_ms={(done - loaded) * 1000:.1f}",
+                file=sys.stderr,
+            )
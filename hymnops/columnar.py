@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Compile services/*.md into a columnar service-history dataset.
+
+One row per song per service:
+
+    date (date32) | position (int16) | slug | usage | key | series_slug | preacher
+
+where the string columns are dictionary-encoded (a few hundred distinct
+slugs across thousands of rows) and `usage` is the comma-joined usage list.
+
+The dataset is partitioned by year under imports/service-history/:
+
+- year=<YYYY>.arrow     Arrow IPC file, zstd-compressed (default), or
+- year=<YYYY>.parquet   Parquet with dictionary pages (`--format parquet`)
+- manifest.json         format, row counts, a digest of each year's
+                        source files, and each file's digest and year
+
+A service belongs to the year of its `date` field (the file name's year
+only when the date is missing). Only years whose service files changed
+since the last export are parsed and rewritten, so adding next Sunday
+rewrites one small partition. A service file that is not UTF-8 or has
+no readable frontmatter is skipped and reported (the export still
+completes), and is retried once it changes. Analyses load the whole
+history with `read_table` (memory-mapped, via pyarrow) or `read_columns`
+(plain lists, any format).
+
+pyarrow is optional. Without it the default format is `json`: the same
+dictionary-encoded columns stored as gzipped JSON (year=<YYYY>.json.gz),
+which `read_columns` reads with the standard library alone.
+
+Usage:
+    python -m hymnops export [--root .] [--output imports/service-history] [--format arrow|parquet|json] [--rebuild]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import importlib.util
+import json
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from hymnops.files import ROOT, atomic_write_bytes, atomic_write_text, list_markdown_files
+from hymnops.frontmatter import parse_frontmatter
+from hymnops.library import build_service_record, parse_date_safe
+from hymnops.profiling import run, timed
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+
+VERSION = 2
+OUTPUT = Path("imports/service-history")
+MANIFEST_NAME = "manifest.json"
+FORMATS = {"arrow": ".arrow", "parquet": ".parquet", "json": ".json.gz"}
+COMPRESSION = "zstd"
+DICTIONARY_COLUMNS = ("slug", "usage", "key", "series_slug", "preacher")
+COLUMNS = ("date", "position", *DICTIONARY_COLUMNS)
+
+
+def has_pyarrow() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def default_format() -> str:
+    return "arrow" if has_pyarrow() else "json"
+
+
+def read_service(path: Path, payload: bytes) -> dict[str, Any]:
+    """build_service_record for one file; raises UnicodeDecodeError or ValueError when it cannot be parsed."""
+    fm, body = parse_frontmatter(payload.decode("utf-8"))
+    return build_service_record(path.name, fm, body)
+
+
+def service_year(path: Path, service: dict[str, Any]) -> str:
+    """Year of the service's `date` field; the file name's year when the date is missing or invalid."""
+    parsed = parse_date_safe(service["date"])
+    return f"{parsed.year:04d}" if parsed else path.stem[:4]
+
+
+@timed
+def files_by_year(services_dir: Path, known: dict[str, dict[str, Any]]) -> tuple[dict[str, list[Path]], dict[str, dict[str, Any]]]:
+    """Group service files by year, with each file's digest and year.
+
+    `known` is the previous manifest's per-file entries; a file whose digest
+    is unchanged keeps its year without being parsed again. A file that is
+    not UTF-8 or has no readable frontmatter gets `"year": None` and an
+    `"error"`, and is left out of every partition until it changes.
+    """
+    years: dict[str, list[Path]] = {}
+    files: dict[str, dict[str, Any]] = {}
+    for path in list_markdown_files(services_dir):
+        payload = path.read_bytes()
+        digest = hashlib.sha256(payload).hexdigest()[:16]
+        old = known.get(path.name)
+        if old and old["digest"] == digest:
+            entry = old
+        else:
+            try:
+                entry = {"digest": digest, "year": service_year(path, read_service(path, payload))}
+            except (UnicodeDecodeError, ValueError) as exc:
+                entry = {"digest": digest, "year": None, "error": str(exc)}
+        files[path.name] = entry
+        if entry["year"] is not None:
+            years.setdefault(entry["year"], []).append(path)
+    return years, files
+
+
+def digest_files(paths: list[Path], files: dict[str, dict[str, str]]) -> str:
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(path.name.encode("utf-8") + b"\0")
+        digest.update(files[path.name]["digest"].encode("ascii") + b"\0")
+    return digest.hexdigest()[:16]
+
+
+@timed
+def service_columns(paths: list[Path], files: dict[str, dict[str, Any]]) -> tuple[dict[str, list[Any]], int]:
+    """Parse service files into plain column lists, one entry per song row, and count the services read.
+
+    A file that stopped parsing since files_by_year looked at it is marked
+    in `files` and skipped.
+    """
+    columns: dict[str, list[Any]] = {name: [] for name in COLUMNS}
+    services = 0
+    for path in paths:
+        try:
+            service = read_service(path, path.read_bytes())
+        except (UnicodeDecodeError, ValueError) as exc:
+            files[path.name] = {**files[path.name], "year": None, "error": str(exc)}
+            continue
+        services += 1
+        for position, song in enumerate(service["songs"]):
+            columns["date"].append(service["date"])
+            columns["position"].append(position)
+            columns["slug"].append(song["slug"])
+            columns["usage"].append(",".join(song["usage"]) or None)
+            columns["key"].append(song["key"])
+            columns["series_slug"].append(service["series_slug"])
+            columns["preacher"].append(service["preacher"])
+    return columns, services
+
+
+def dictionary_encode(values: list[str | None]) -> dict[str, list[Any]]:
+    dictionary: list[str] = []
+    codes: dict[str, int] = {}
+    indices: list[int | None] = []
+    for value in values:
+        if value is None:
+            indices.append(None)
+            continue
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(dictionary)
+            dictionary.append(value)
+        indices.append(code)
+    return {"dictionary": dictionary, "indices": indices}
+
+
+def arrow_table(columns: dict[str, list[Any]]) -> pa.Table:
+    import pyarrow as pa
+
+    fields = [pa.field("date", pa.date32()), pa.field("position", pa.int16())]
+    arrays = [
+        pa.array([parse_date_safe(value) for value in columns["date"]], pa.date32()),
+        pa.array(columns["position"], pa.int16()),
+    ]
+    for name in DICTIONARY_COLUMNS:
+        fields.append(pa.field(name, pa.dictionary(pa.int32(), pa.string())))
+        arrays.append(pa.array(columns[name], pa.string()).dictionary_encode())
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def encode_partition(columns: dict[str, list[Any]], fmt: str) -> bytes:
+    if fmt == "json":
+        document = {
+            name: dictionary_encode(values) if name in DICTIONARY_COLUMNS else values for name, values in columns.items()
+        }
+        return gzip.compress(json.dumps(document, separators=(",", ":")).encode("utf-8"), mtime=0)
+
+    import pyarrow as pa
+
+    table = arrow_table(columns)
+    sink = pa.BufferOutputStream()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, sink, compression=COMPRESSION, use_dictionary=True)
+    else:
+        options = pa.ipc.IpcWriteOptions(compression=COMPRESSION)
+        with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+            writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def load_manifest(directory: Path) -> dict[str, Any]:
+    path = directory / MANIFEST_NAME
+    if not path.is_file():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+@timed
+def export(root: Path, directory: Path, fmt: str, rebuild: bool = False) -> dict[str, int]:
+    """Bring the partitions under `directory` up to date with services/; return counts.
+
+    Unreadable service files are skipped, counted in `services_skipped` and
+    listed with their error in the manifest's `files`.
+    """
+    previous = load_manifest(directory)
+    if rebuild or previous.get("version") != VERSION or previous.get("format") != fmt:
+        previous = {}
+    old_partitions: dict[str, dict[str, Any]] = previous.get("partitions", {})
+    partitions: dict[str, dict[str, Any]] = {}
+    written = kept = 0
+
+    years, files = files_by_year(root / "services", previous.get("files", {}))
+    for year, paths in sorted(years.items()):
+        digest = digest_files(paths, files)
+        old = old_partitions.get(year)
+        if old is not None and old["digest"] == digest and (directory / old["file"]).is_file():
+            partitions[year] = old
+            kept += 1
+            continue
+        columns, services = service_columns(paths, files)
+        name = f"year={year}{FORMATS[fmt]}"
+        atomic_write_bytes(directory / name, encode_partition(columns, fmt))
+        partitions[year] = {"file": name, "digest": digest, "services": services, "rows": len(columns["date"])}
+        written += 1
+
+    live = {entry["file"] for entry in partitions.values()}
+    for path in directory.glob("year=*"):
+        if path.name not in live:
+            path.unlink()
+
+    manifest = {"version": VERSION, "format": fmt, "columns": list(COLUMNS), "partitions": partitions, "files": files}
+    atomic_write_text(directory / MANIFEST_NAME, json.dumps(manifest, indent=2) + "\n")
+    rows = sum(entry["rows"] for entry in partitions.values())
+    skipped = sum(1 for entry in files.values() if entry["year"] is None)
+    return {"partitions_written": written, "partitions_kept": kept, "rows": rows, "services_skipped": skipped}
+
+
+def read_table(directory: Path = ROOT / OUTPUT) -> pa.Table:
+    """The whole history as one pyarrow Table; Arrow partitions are memory-mapped."""
+    import pyarrow as pa
+
+    manifest = load_manifest(directory)
+    fmt = manifest.get("format")
+    tables = []
+    for year in sorted(manifest.get("partitions", {})):
+        path = directory / manifest["partitions"][year]["file"]
+        if fmt == "arrow":
+            tables.append(pa.ipc.open_file(pa.memory_map(str(path))).read_all())
+        elif fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            tables.append(pq.read_table(path, memory_map=True))
+        else:
+            tables.append(arrow_table(read_partition_columns(path)))
+    return pa.concat_tables(tables) if tables else arrow_table({name: [] for name in COLUMNS})
+
+
+def read_partition_columns(path: Path) -> dict[str, list[Any]]:
+    document = json.loads(gzip.decompress(path.read_bytes()))
+    columns: dict[str, list[Any]] = {}
+    for name in COLUMNS:
+        value = document[name]
+        if name in DICTIONARY_COLUMNS:
+            dictionary = value["dictionary"]
+            value = [None if index is None else dictionary[index] for index in value["indices"]]
+        columns[name] = value
+    return columns
+
+
+def read_columns(directory: Path = ROOT / OUTPUT) -> dict[str, list[Any]]:
+    """The whole history as plain column lists (dates as ISO strings), whatever the format."""
+    manifest = load_manifest(directory)
+    if manifest.get("format") in ("arrow", "parquet"):
+        table = read_table(directory)
+        columns = {name: table.column(name).to_pylist() for name in COLUMNS}
+        columns["date"] = [value.isoformat() if value else None for value in columns["date"]]
+        return columns
+    merged: dict[str, list[Any]] = {name: [] for name in COLUMNS}
+    for year in sorted(manifest.get("partitions", {})):
+        columns = read_partition_columns(directory / manifest["partitions"][year]["file"])
+        for name in COLUMNS:
+            merged[name].extend(columns[name])
+    return merged
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Export service history as a dictionary-encoded columnar dataset.")
+    parser.add_argument("--root", type=Path, default=ROOT, help="library root containing services/")
+    parser.add_argument("--output", type=Path, default=OUTPUT, help="dataset directory, relative to --root")
+    parser.add_argument("--format", choices=sorted(FORMATS), default=None, help="default: arrow, or json without pyarrow")
+    parser.add_argument("--rebuild", action="store_true", help="rewrite every partition")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or default_format()
+    if fmt != "json" and not has_pyarrow():
+        print(f"--format {fmt} needs pyarrow (pip install pyarrow); use --format json", file=sys.stderr)
+        return 1
+
+    root = args.root.resolve()
+    directory = args.output if args.output.is_absolute() else root / args.output
+    stats = export(root, directory, fmt, args.rebuild)
+    for name, entry in sorted(load_manifest(directory)["files"].items()):
+        if entry["year"] is None:
+            print(f"skipped services/{name}: {entry['error']}", file=sys.stderr)
+    print(f"format={fmt}")
+    for name, value in stats.items():
+        print(f"{name}={value}")
+    print(f"output={directory}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(main))
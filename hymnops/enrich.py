@@ -0,0 +1,697 @@
+#!/usr/bin/env python3
+"""
+Populate song metadata from CCLI's public Rehearse API.
+
+This fills missing fields in songs/*.md frontmatter:
+- ccli_number
+- songselect_url
+- lyrics_source
+- original_artist
+- writers
+- tempo_bpm
+- key
+- time_signature
+
+It intentionally does not overwrite existing non-empty values.
+
+`requests` is imported only once a song actually needs a lookup, so a run
+where every song is already populated never loads the HTTP stack.
+
+Writer and artist names are mapped to their canonical spelling through
+imports/name-map.json when it exists (see hymnops.names).
+
+Progress is streamed: one JSONL record per processed song is appended to
+imports/2024-ccli-enrichment-report.jsonl as it happens, and every
+CHECKPOINT_EVERY songs the stream offset and last file are saved to
+imports/2024-ccli-enrichment.checkpoint.json. `--resume` continues after
+the last complete record, so an interrupted run loses at most the song in
+flight; after a run that finished, it only rebuilds the report. The JSON
+report is rebuilt from the stream at the end.
+
+Usage:
+    python -m hymnops enrich [--root .] [--resume]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+import textwrap
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, Callable, Iterable, Iterator
+
+from hymnops.files import ROOT, atomic_write_text, list_markdown_files
+from hymnops.frontmatter import dump_frontmatter, parse_frontmatter
+from hymnops.importer import normalize_key
+from hymnops.names import NameResolver, load_resolver
+from hymnops.profiling import run, timed
+
+if TYPE_CHECKING:
+    import requests
+
+
+REHEARSE_API_URL = "https://rehearse-api.ccli.com/api/songs"
+SONGSELECT_SEARCH_URL = "https://songselect.ccli.com/api/GetSongSearchResults"
+SONGSELECT_DETAILS_URL = "https://songselect.ccli.com/api/GetSongDetails"
+COUNTRY = "US"
+TIMEOUT = 20
+SLEEP_SECONDS = 0.08
+REPORT_NAME = "2024-ccli-enrichment-report.json"
+STREAM_NAME = "2024-ccli-enrichment-report.jsonl"
+CHECKPOINT_NAME = "2024-ccli-enrichment.checkpoint.json"
+CHECKPOINT_EVERY = 20
+UNMATCHED_SAMPLE = 15
+
+
+def normalize(value: str) -> str:
+    value = value.lower().strip()
+    value = re.sub(r"\(.*?\)", " ", value)
+    value = re.sub(r"[^a-z0-9]+", " ", value)
+    return re.sub(r"\s+", " ", value).strip()
+
+
+def normalize_musical_key(value: str | None) -> str | None:
+    if not value:
+        return None
+    key = value.strip()
+    if not key:
+        return None
+    letter = key[0].upper()
+    rest = key[1:]
+    return letter + rest
+
+
+@timed
+def query_rehearse(session: requests.Session, query: str) -> list[dict[str, Any]]:
+    params = {
+        "search": query,
+        "page": "1",
+        "limit": "20",
+        "countrycode": COUNTRY,
+    }
+    response = session.get(REHEARSE_API_URL, params=params, timeout=TIMEOUT)
+    response.raise_for_status()
+    payload = response.json().get("payload") or []
+    if not isinstance(payload, list):
+        return []
+    return payload
+
+
+@dataclass
+class Candidate:
+    score: float
+    item: dict[str, Any]
+    query: str
+    source: str
+
+
+@timed
+def rank_candidates(song_title: str, query: str, payload: list[dict[str, Any]], source: str) -> list[Candidate]:
+    title_norm = normalize(song_title)
+    query_norm = normalize(query)
+    candidates: list[Candidate] = []
+
+    for item in payload:
+        result_title = str(item.get("title") or "").strip()
+        if not result_title:
+            continue
+
+        result_norm = normalize(result_title)
+        if source == "songselect":
+            ccli_number = str(item.get("songNumber") or "").strip()
+        else:
+            ccli_number = ((item.get("otherIds") or {}).get("ccliSongNumber") or "").strip()
+
+        score = 0.0
+        if result_norm == title_norm:
+            score += 120.0
+        elif result_norm and title_norm and (result_norm in title_norm or title_norm in result_norm):
+            score += 70.0
+
+        if result_norm == query_norm:
+            score += 40.0
+        elif result_norm and query_norm and (result_norm in query_norm or query_norm in result_norm):
+            score += 20.0
+
+        api_score = item.get("score")
+        if isinstance(api_score, (int, float)):
+            score += float(api_score) * 8.0
+
+        if ccli_number:
+            score += 8.0
+
+        source_label = str(item.get("sourceLabel") or "")
+        if source_label.lower() == "original master":
+            score += 4.0
+
+        length_delta = abs(len(result_norm) - len(title_norm))
+        score -= min(length_delta, 20) * 0.6
+
+        candidates.append(Candidate(score=score, item=item, query=query, source=source))
+
+    candidates.sort(key=lambda c: c.score, reverse=True)
+    return candidates
+
+
+@timed
+def query_songselect_search(session: requests.Session, query: str) -> list[dict[str, Any]]:
+    data = {
+        "numPerPage": "25",
+        "search": query,
+        "page": "1",
+    }
+    headers = {
+        "client-locale": "en-US",
+    }
+    response = session.post(SONGSELECT_SEARCH_URL, data=data, headers=headers, timeout=TIMEOUT)
+    response.raise_for_status()
+    payload = response.json().get("payload") or {}
+    items = payload.get("items") or []
+    if not isinstance(items, list):
+        return []
+    return items
+
+
+@timed
+def get_songselect_details(session: requests.Session, song_number: str, slug: str) -> dict[str, Any] | None:
+    if not song_number:
+        return None
+    params = {
+        "songNumber": song_number,
+        "slug": slug or "",
+    }
+    headers = {
+        "client-locale": "en-US",
+    }
+    import requests
+
+    try:
+        response = session.get(SONGSELECT_DETAILS_URL, params=params, headers=headers, timeout=TIMEOUT)
+        response.raise_for_status()
+    except requests.RequestException:
+        return None
+    payload = response.json().get("payload")
+    if isinstance(payload, dict):
+        return payload
+    return None
+
+
+def extract_songselect_authors(item: dict[str, Any]) -> list[str]:
+    out: list[str] = []
+    raw_authors = item.get("authors") or []
+    if isinstance(raw_authors, list):
+        for author in raw_authors:
+            if isinstance(author, dict):
+                label = str(author.get("label") or "").strip()
+                if label:
+                    out.append(label)
+            else:
+                text = str(author).strip()
+                if text:
+                    out.append(text)
+    return dedupe_names(out)
+
+
+def dedupe_names(names: Iterable[str]) -> list[str]:
+    deduped: list[str] = []
+    seen: set[str] = set()
+    for name in names:
+        key = normalize(name)
+        if key and key not in seen:
+            seen.add(key)
+            deduped.append(name)
+    return deduped
+
+
+@timed
+def query_rehearse_by_ccli(session: requests.Session, ccli_number: str) -> dict[str, Any] | None:
+    if not ccli_number:
+        return None
+    params = {
+        "cclisongnumber": ccli_number,
+        "page": "1",
+        "limit": "5",
+        "countrycode": COUNTRY,
+    }
+    import requests
+
+    try:
+        response = session.get(REHEARSE_API_URL, params=params, timeout=TIMEOUT)
+        response.raise_for_status()
+    except requests.RequestException:
+        return None
+    payload = response.json().get("payload") or []
+    if not isinstance(payload, list) or not payload:
+        return None
+    return payload[0]
+
+
+@timed
+def pick_best_match(session: requests.Session, title: str, aka: list[str]) -> Candidate | None:
+    import requests
+
+    queries = [title]
+    bare = re.sub(r"\(.*?\)", "", title).strip()
+    if bare and bare.lower() != title.lower():
+        queries.append(bare)
+    for alt in aka:
+        alt = (alt or "").strip()
+        if alt and alt not in queries:
+            queries.append(alt)
+
+    best: Candidate | None = None
+    seen_queries: set[str] = set()
+    for query in queries:
+        qnorm = normalize(query)
+        if not qnorm or qnorm in seen_queries:
+            continue
+        seen_queries.add(qnorm)
+
+        # Primary source: SongSelect search endpoint.
+        try:
+            songselect_items = query_songselect_search(session, query)
+        except requests.RequestException:
+            songselect_items = []
+        if songselect_items:
+            candidates = rank_candidates(title, query, songselect_items, "songselect")
+            if candidates:
+                top = candidates[0]
+                if best is None or top.score > best.score:
+                    best = top
+
+        # Secondary source: Rehearse catalog.
+        if best is None or best.score < 90.0:
+            try:
+                rehearse_items = query_rehearse(session, query)
+            except requests.RequestException:
+                rehearse_items = []
+            if rehearse_items:
+                candidates = rank_candidates(title, query, rehearse_items, "rehearse")
+                if candidates:
+                    top = candidates[0]
+                    if best is None or top.score > best.score:
+                        best = top
+
+        time.sleep(SLEEP_SECONDS)
+
+    if best is None:
+        return None
+
+    # Conservative threshold to avoid bad auto-matches on generic titles.
+    if best.score < 78.0:
+        return None
+
+    return best
+
+
+@dataclass
+class Match:
+    """Metadata found for one title; enrichment fills empty fields from it."""
+
+    title: str
+    ccli_number: str
+    authors: list[str]
+    artist: str
+    bpm: Any
+    key: str | None
+    time_signature: str
+    score: float
+    query: str
+    source: str
+
+
+@timed
+def lookup_song(session: requests.Session, title: str, aka: list[str], slug: str) -> Match | None:
+    """Search SongSelect/Rehearse for `title` and gather the details of the best match."""
+    best = pick_best_match(session, title, aka)
+    if best is None:
+        return None
+
+    item = best.item
+    result_title = str(item.get("title") or title).strip()
+    authors: list[str] = []
+    artist_name = ""
+    bpm: Any = None
+    key: str | None = None
+    time_sig = ""
+
+    if best.source == "songselect":
+        ccli_number = str(item.get("songNumber") or "").strip()
+        details = get_songselect_details(session, ccli_number, str(item.get("slug") or "").strip())
+        if details:
+            result_title = str(details.get("title") or result_title).strip()
+            detail_num = str(details.get("ccliSongNumber") or "").strip()
+            if detail_num:
+                ccli_number = detail_num
+            authors = extract_songselect_authors(details)
+        else:
+            authors = extract_songselect_authors(item)
+
+        rehearse = query_rehearse_by_ccli(session, ccli_number)
+        if rehearse:
+            artist_name = str(rehearse.get("artistName") or "").strip()
+            bpm = rehearse.get("bpm")
+            key = normalize_musical_key(str(rehearse.get("key") or "").strip())
+            time_sig = str(rehearse.get("timeSignature") or "").strip()
+    else:
+        other_ids = item.get("otherIds") or {}
+        ccli_number = str(other_ids.get("ccliSongNumber") or "").strip()
+        authors = [str(a).strip() for a in (item.get("authors") or []) if str(a).strip()]
+        artist_name = str(item.get("artistName") or "").strip()
+        bpm = item.get("bpm")
+        key = normalize_musical_key(str(item.get("key") or "").strip())
+        time_sig = str(item.get("timeSignature") or "").strip()
+
+        # SongSelect is the canonical metadata source; prefer its title/authors when available.
+        if ccli_number:
+            details = get_songselect_details(session, ccli_number, slug)
+            if details:
+                result_title = str(details.get("title") or result_title).strip()
+                detail_authors = extract_songselect_authors(details)
+                if detail_authors:
+                    authors = detail_authors
+
+    return Match(
+        title=result_title,
+        ccli_number=ccli_number,
+        authors=authors,
+        artist=artist_name,
+        bpm=bpm,
+        key=key,
+        time_signature=time_sig,
+        score=best.score,
+        query=best.query,
+        source=best.source,
+    )
+
+
+def open_session() -> requests.Session:
+    import requests
+
+    session = requests.Session()
+    session.headers.update({"User-Agent": "HymnOps-Importer/1.0"})
+    return session
+
+
+def read_records(stream_path: Path) -> Iterator[dict[str, Any]]:
+    if not stream_path.is_file():
+        return
+    with stream_path.open(encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+def save_checkpoint(path: Path, offset: int, last_file: str | None, complete: bool = False) -> None:
+    checkpoint = {"stream": STREAM_NAME, "offset": offset, "last_file": last_file, "complete": complete}
+    atomic_write_text(path, json.dumps(checkpoint, indent=2) + "\n")
+
+
+def checkpoint_complete(checkpoint_path: Path) -> bool:
+    """True when the last run finished, so there is nothing left to resume."""
+    if not checkpoint_path.is_file():
+        return False
+    return bool(json.loads(checkpoint_path.read_text(encoding="utf-8")).get("complete"))
+
+
+def resume_position(stream_path: Path, checkpoint_path: Path) -> tuple[int, str | None]:
+    """Return (stream offset, last processed file) to continue from, trimming any torn tail.
+
+    Records appended after the last checkpoint are kept when complete: a song
+    only gets its record once its file has been written, so they are safe to
+    skip as well.
+    """
+    if not checkpoint_path.is_file() or not stream_path.is_file():
+        return 0, None
+    checkpoint = json.loads(checkpoint_path.read_text(encoding="utf-8"))
+    offset = min(int(checkpoint.get("offset") or 0), stream_path.stat().st_size)
+    last_file = checkpoint.get("last_file")
+    with stream_path.open("r+b") as handle:
+        handle.seek(offset)
+        for line in handle:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            offset += len(line)
+            last_file = record.get("file", last_file)
+        handle.truncate(offset)
+    return offset, last_file
+
+
+def write_json_array(handle: IO[str], name: str, items: Iterator[Any]) -> None:
+    handle.write(f'  "{name}": [')
+    first = True
+    for item in items:
+        handle.write("\n" if first else ",\n")
+        handle.write(textwrap.indent(json.dumps(item, indent=2), "    "))
+        first = False
+    handle.write("]" if first else "\n  ]")
+
+
+def match_entry(record: dict[str, Any]) -> dict[str, Any]:
+    return {key: value for key, value in record.items() if key not in ("status", "updated")}
+
+
+def unmatched_label(record: dict[str, Any]) -> str:
+    return f"{record['file']} ({record['reason']})" if record.get("reason") else record["file"]
+
+
+@timed
+def write_report(stream_path: Path, report_path: Path) -> dict[str, Any]:
+    """Summarize the JSONL stream into the JSON report without holding it in memory.
+
+    The stream is read once for the counts, then once per array, so memory
+    stays flat however large the library is. The layout matches
+    json.dumps(report, indent=2).
+    """
+    summary: dict[str, Any] = {"updated_files": 0, "skipped_already_populated": 0, "unmatched_count": 0}
+    sample: list[str] = []
+    for record in read_records(stream_path):
+        status = record.get("status")
+        if record.get("updated"):
+            summary["updated_files"] += 1
+        if status == "skipped":
+            summary["skipped_already_populated"] += 1
+        elif status == "unmatched":
+            summary["unmatched_count"] += 1
+            if len(sample) < UNMATCHED_SAMPLE:
+                sample.append(unmatched_label(record))
+
+    with report_path.open("w", encoding="utf-8") as handle:
+        handle.write("{\n")
+        for key, value in summary.items():
+            handle.write(f'  "{key}": {value},\n')
+        unmatched = (unmatched_label(r) for r in read_records(stream_path) if r.get("status") == "unmatched")
+        write_json_array(handle, "unmatched_files", unmatched)
+        handle.write(",\n")
+        matches = (match_entry(r) for r in read_records(stream_path) if r.get("status") == "matched")
+        write_json_array(handle, "matches", matches)
+        handle.write("\n}")
+
+    summary["unmatched_sample"] = sample
+    return summary
+
+
+def enrich_root(root: Path, resume: bool = False, lookups: dict[str, Match | None] | None = None) -> dict[str, Any] | None:
+    """Enrich <root>/songs with its own stream, checkpoint and report; None when there are no songs.
+
+    On KeyboardInterrupt the checkpoint is saved before the exception propagates.
+    """
+    files = list_markdown_files(root / "songs")
+    if not files:
+        return None
+
+    imports = root / "imports"
+    imports.mkdir(parents=True, exist_ok=True)
+    stream_path = imports / STREAM_NAME
+    checkpoint_path = imports / CHECKPOINT_NAME
+
+    report_path = imports / REPORT_NAME
+    if resume and stream_path.is_file() and checkpoint_complete(checkpoint_path):
+        print("nothing_to_resume=the last run completed; run without --resume to start over")
+        summary = write_report(stream_path, report_path)
+        summary["report"] = report_path
+        return summary
+
+    if resume:
+        offset, last_file = resume_position(stream_path, checkpoint_path)
+    else:
+        offset, last_file = 0, None
+        save_checkpoint(checkpoint_path, 0, None)
+    if last_file is not None:
+        files = [path for path in files if path.name > last_file]
+        print(f"resumed_after={last_file}")
+
+    stream = stream_path.open("r+" if offset else "w", encoding="utf-8")
+    stream.seek(offset)
+    since_checkpoint = 0
+
+    def record(entry: dict[str, Any]) -> None:
+        nonlocal last_file, since_checkpoint
+        stream.write(json.dumps(entry) + "\n")
+        stream.flush()
+        last_file = entry["file"]
+        since_checkpoint += 1
+        if since_checkpoint >= CHECKPOINT_EVERY:
+            save_checkpoint(checkpoint_path, stream.tell(), last_file)
+            since_checkpoint = 0
+
+    try:
+        enrich_files(files, record, load_resolver(root, "writers"), load_resolver(root, "artists"), lookups)
+    except KeyboardInterrupt:
+        save_checkpoint(checkpoint_path, stream.tell(), last_file)
+        print(f"interrupted_after={last_file}; rerun with --resume to continue", file=sys.stderr)
+        raise
+    finally:
+        stream.close()
+    save_checkpoint(checkpoint_path, stream_path.stat().st_size, last_file, complete=True)
+
+    summary = write_report(stream_path, report_path)
+    summary["report"] = report_path
+    return summary
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Fill missing CCLI metadata in songs/*.md from SongSelect/Rehearse.")
+    parser.add_argument("--root", type=Path, default=ROOT, help="library root containing songs/ and imports/")
+    parser.add_argument("--resume", action="store_true", help="continue after the last checkpointed song")
+    args = parser.parse_args(argv)
+
+    try:
+        summary = enrich_root(args.root.resolve(), args.resume)
+    except KeyboardInterrupt:
+        return 130
+    if summary is None:
+        print("No song files found.")
+        return 0
+
+    print(f"updated_files={summary['updated_files']}")
+    print(f"skipped_already_populated={summary['skipped_already_populated']}")
+    print(f"unmatched_count={summary['unmatched_count']}")
+    print(f"report={summary['report']}")
+    if summary["unmatched_sample"]:
+        print("unmatched_sample=" + ", ".join(summary["unmatched_sample"]))
+
+    return 0
+
+
+def enrich_files(
+    files: list[Path],
+    record: Callable[[dict[str, Any]], None],
+    writer_names: NameResolver,
+    artist_names: NameResolver,
+    lookups: dict[str, Match | None] | None = None,
+) -> None:
+    """Enrich each file in order, passing one report record per song to `record`.
+
+    Writer and artist names from the APIs are mapped through the canonical
+    name map (hymnops.names), so a known writer keeps one spelling.
+    `lookups` caches matches by normalized title (importer.normalize_key);
+    callers that enrich several libraries share one dict so a song is
+    looked up once (see hymnops.federation).
+    """
+    session: requests.Session | None = None
+
+    for path in files:
+        text = path.read_text(encoding="utf-8")
+        data, body = parse_frontmatter(text)
+
+        title = str(data.get("title") or "").strip()
+        slug = str(data.get("slug") or path.stem).strip()
+        aka = data.get("aka") if isinstance(data.get("aka"), list) else []
+        aka = [str(x) for x in aka if x is not None]
+
+        if not title:
+            record({"file": path.name, "status": "unmatched", "reason": "missing title"})
+            continue
+
+        has_ccli = isinstance(data.get("ccli_number"), str) and bool(str(data.get("ccli_number")).strip())
+        has_writers = isinstance(data.get("writers"), list) and len(data.get("writers")) > 0
+        has_url = isinstance(data.get("songselect_url"), str) and bool(str(data.get("songselect_url")).strip())
+        if has_ccli and has_writers and has_url:
+            record({"file": path.name, "status": "skipped"})
+            continue
+
+        cache_key = normalize_key(title)
+        if lookups is not None and cache_key in lookups:
+            match = lookups[cache_key]
+        else:
+            if session is None:
+                session = open_session()
+            match = lookup_song(session, title, aka, slug)
+            if lookups is not None:
+                lookups[cache_key] = match
+        if match is None:
+            record({"file": path.name, "status": "unmatched"})
+            continue
+
+        ccli_number = match.ccli_number
+        authors = dedupe_names(writer_names.resolve(author) for author in match.authors)
+        artist_name = artist_names.resolve(match.artist) if match.artist else ""
+        bpm = match.bpm
+        key = match.key
+        time_sig = match.time_signature
+
+        changed = False
+
+        if ccli_number and (data.get("ccli_number") is None or str(data.get("ccli_number")).strip() == ""):
+            data["ccli_number"] = ccli_number
+            changed = True
+
+        if ccli_number and (data.get("songselect_url") is None or str(data.get("songselect_url")).strip() == ""):
+            data["songselect_url"] = f"https://songselect.ccli.com/songs/{ccli_number}/{slug}"
+            changed = True
+
+        lyrics_source = str(data.get("lyrics_source") or "").strip()
+        if ccli_number and (lyrics_source == "" or lyrics_source == "Unknown"):
+            data["lyrics_source"] = "SongSelect"
+            changed = True
+
+        if artist_name and (data.get("original_artist") is None or str(data.get("original_artist")).strip() == ""):
+            data["original_artist"] = artist_name
+            changed = True
+
+        if authors and (not isinstance(data.get("writers"), list) or len(data.get("writers")) == 0):
+            data["writers"] = authors
+            changed = True
+
+        if isinstance(bpm, (int, float)) and data.get("tempo_bpm") is None:
+            data["tempo_bpm"] = int(round(float(bpm)))
+            changed = True
+
+        if key and (data.get("key") is None or str(data.get("key")).strip() == ""):
+            data["key"] = key
+            changed = True
+
+        if time_sig and (data.get("time_signature") is None or str(data.get("time_signature")).strip() == ""):
+            data["time_signature"] = time_sig
+            changed = True
+
+        if changed:
+            frontmatter = dump_frontmatter(data)
+            path.write_text(frontmatter + body, encoding="utf-8")
+
+        record(
+            {
+                "file": path.name,
+                "status": "matched",
+                "updated": changed,
+                "title": title,
+                "matched_title": match.title,
+                "ccli_number": ccli_number,
+                "score": round(match.score, 2),
+                "query": match.query,
+                "source": match.source,
+            }
+        )
+
+
+if __name__ == "__main__":
+    sys.exit(run(main))
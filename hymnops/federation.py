@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Federate several congregations' libraries into one deduplicated song index.
+
+Each --root is a HymnOps-style tree with its own songs/, services/,
+series/ and imports/name-map.json. A root is parsed into a snapshot
+(hymnops.records plus its name map) in a worker process, so N roots load
+in parallel. The snapshots are then merged:
+
+- songs with the same `ccli_number` are one federated song;
+- songs whose normalized titles match (importer.normalize_key) join the
+  same song, unless both sides carry different CCLI numbers, so
+  "Holy" (CCLI 1) and "Holy" (CCLI 2) stay apart. A song without a CCLI
+  number joins by title only when that title belongs to at most one CCLI
+  number; an ambiguous title is not seeded into the enrichment cache
+  either;
+- usage is counted per congregation from each root's services, and writer
+  rankings are merged through the union of the roots' name maps
+  (hymnops.names), with each distinct song counted once.
+
+The index is written to imports/federated-index.json under the first root
+and summarized on stdout. `--enrich` then runs hymnops.enrich on every
+root with one shared lookup cache. It is seeded from songs that some
+congregation has already populated, so a song the congregations share
+reaches the CCLI APIs at most once, and often not at all. Each root keeps
+its own enrichment stream, checkpoint and report; `--resume` is passed on.
+
+Usage:
+    python -m hymnops federate --root ../north --root ../south [--root ...]
+                               [--workers 4] [--top 10] [--output imports/federated-index.json]
+                               [--enrich [--resume]]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from hymnops.enrich import Match, enrich_root
+from hymnops.files import ROOT, atomic_write_text
+from hymnops.importer import normalize_key
+from hymnops.library import sorted_pairs
+from hymnops.names import KINDS, NameResolver, UnionFind, cluster_names, load_map, resolve_counts
+from hymnops.names import OUTPUT as NAME_MAP
+from hymnops.profiling import run, timed
+from hymnops.records import Records, ServiceSong, Song, load_records
+
+
+VERSION = 1
+OUTPUT = Path("imports/federated-index.json")
+FEDERATED_SCORE = 100.0
+
+
+@dataclass(slots=True)
+class Snapshot:
+    """One congregation's parsed library."""
+
+    name: str
+    root: Path
+    records: Records
+    name_maps: dict[str, dict[str, list[str]]]
+
+
+def load_snapshot(name: str, root: Path) -> Snapshot:
+    """Parse one root. Runs in a worker process, so song bodies (unused here) are dropped before pickling."""
+    records = load_records(root)
+    for song in records.songs:
+        song.body = ""
+    return Snapshot(name, root, records, load_map(root / NAME_MAP))
+
+
+@timed
+def load_snapshots(roots: dict[str, Path], workers: int) -> list[Snapshot]:
+    """Snapshots in `roots` order, parsed in up to `workers` processes."""
+    names, paths = list(roots), list(roots.values())
+    if workers <= 1 or len(roots) <= 1:
+        return [load_snapshot(name, path) for name, path in roots.items()]
+    with ProcessPoolExecutor(max_workers=min(workers, len(roots))) as pool:
+        return list(pool.map(load_snapshot, names, paths))
+
+
+def congregation_names(roots: list[Path]) -> dict[str, Path]:
+    """Name each root after its directory, suffixing repeats ("north", "north-2")."""
+    named: dict[str, Path] = {}
+    for root in roots:
+        base = root.name or "root"
+        name, n = base, 1
+        while name in named:
+            n += 1
+            name = f"{base}-{n}"
+        named[name] = root
+    return named
+
+
+def song_ccli(song: Song) -> str | None:
+    value = song.ccli_number
+    return value.strip() or None if isinstance(value, str) else None
+
+
+def is_populated(song: Song) -> bool:
+    """Same test enrich uses to skip a song: CCLI number, writers and SongSelect URL all present."""
+    url = song.songselect_url
+    return bool(song_ccli(song) and isinstance(song.writers, tuple) and song.writers and isinstance(url, str) and url.strip())
+
+
+@dataclass(slots=True)
+class FederatedSong:
+    title: str
+    ccli_number: str | None
+    members: list[tuple[str, str]] = field(default_factory=list)
+    uses: dict[str, int] = field(default_factory=dict)
+    last_sung: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def total_uses(self) -> int:
+        return sum(self.uses.values())
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "title": self.title,
+            "ccli_number": self.ccli_number,
+            "members": [{"congregation": name, "slug": slug} for name, slug in self.members],
+            "uses": self.uses,
+            "last_sung": self.last_sung,
+        }
+
+
+class FederatedIndex:
+    """Songs of every snapshot merged by CCLI number and normalized title."""
+
+    def __init__(self, snapshots: list[Snapshot]) -> None:
+        self.snapshots = snapshots
+        self.songs: list[FederatedSong] = []
+        self.by_member: dict[tuple[str, str], int] = {}
+        self.by_ccli: dict[str, int] = {}
+        self.by_title: dict[str, list[int]] = {}
+        self._entries: list[tuple[str, Song]] = []
+        self._group: list[int] = []
+        self._merge()
+        self._count_uses()
+
+    @timed
+    def _merge(self) -> None:
+        entries = self._entries
+        for snapshot in self.snapshots:
+            entries.extend((snapshot.name, song) for song in snapshot.records.songs if isinstance(song.slug, str))
+
+        uf = UnionFind(len(entries))
+        cclis = [song_ccli(song) for _, song in entries]
+
+        def join(left: int, right: int) -> None:
+            a, b = uf.find(left), uf.find(right)
+            if a == b or (cclis[a] and cclis[b] and cclis[a] != cclis[b]):
+                return
+            uf.union(a, b)
+            cclis[uf.find(a)] = cclis[a] or cclis[b]
+
+        first_by_ccli: dict[str, int] = {}
+        titles: dict[str, list[int]] = {}
+        for i, (_, song) in enumerate(entries):
+            if cclis[i]:
+                join(first_by_ccli.setdefault(cclis[i], i), i)  # type: ignore[arg-type]
+            key = normalize_key(song.title) if isinstance(song.title, str) else ""
+            if key:
+                titles.setdefault(key, []).append(i)
+        for members in titles.values():
+            numbered = {root for root in (uf.find(i) for i in members) if cclis[root]}
+            # A title held by several CCLI numbers names different songs: songs
+            # without a number cannot tell which one they are, so they only
+            # join each other.
+            joinable = members if len(numbered) <= 1 else [i for i in members if not cclis[uf.find(i)]]
+            for i in joinable[1:]:
+                join(joinable[0], i)
+
+        position: dict[int, int] = {}
+        for i, (name, song) in enumerate(entries):
+            root = uf.find(i)
+            index = position.get(root)
+            if index is None:
+                index = position[root] = len(self.songs)
+                self.songs.append(FederatedSong(title=song.title, ccli_number=cclis[root]))
+                if cclis[root]:
+                    self.by_ccli[cclis[root]] = index  # type: ignore[index]
+            self.songs[index].members.append((name, song.slug))
+            self.by_member[(name, song.slug)] = index
+            self._group.append(index)
+            key = normalize_key(song.title) if isinstance(song.title, str) else ""
+            if key:
+                bucket = self.by_title.setdefault(key, [])
+                if index not in bucket:
+                    bucket.append(index)
+
+    @timed
+    def _count_uses(self) -> None:
+        for snapshot in self.snapshots:
+            name = snapshot.name
+            for service in snapshot.records.services:
+                if not isinstance(service.songs, tuple) or not isinstance(service.date, str):
+                    continue
+                for item in service.songs:
+                    if type(item) is not ServiceSong:
+                        continue
+                    index = self.by_member.get((name, item.slug))
+                    if index is None:
+                        continue
+                    song = self.songs[index]
+                    song.uses[name] = song.uses.get(name, 0) + 1
+                    if service.date > song.last_sung.get(name, ""):
+                        song.last_sung[name] = service.date
+
+    def find(self, title: str | None = None, ccli_number: str | None = None) -> list[FederatedSong]:
+        """Federated songs with this CCLI number, else with this normalized title."""
+        if ccli_number and ccli_number.strip() in self.by_ccli:
+            return [self.songs[self.by_ccli[ccli_number.strip()]]]
+        return [self.songs[i] for i in self.by_title.get(normalize_key(title), [])] if title else []
+
+    def member_songs(self) -> list[list[tuple[str, Song]]]:
+        """Parsed records of each federated song's members, in `songs` order."""
+        grouped: list[list[tuple[str, Song]]] = [[] for _ in self.songs]
+        for entry, index in zip(self._entries, self._group):
+            grouped[index].append(entry)
+        return grouped
+
+    def seed_lookups(self) -> dict[str, Match | None]:
+        """Enrichment cache entries for every title of a song some congregation has already populated.
+
+        The cache is keyed by normalized title only, so a title shared by
+        several federated songs ("Holy" with CCLI 1 and with CCLI 2) is not
+        seeded; those songs go through the normal lookup instead.
+        """
+        lookups: dict[str, Match | None] = {}
+        for members in self.member_songs():
+            populated = [(name, song) for name, song in members if is_populated(song)]
+            if not populated:
+                continue
+            name, source = max(populated, key=lambda item: completeness(item[1]))
+            match = Match(
+                title=source.title,
+                ccli_number=song_ccli(source) or "",
+                authors=list(source.writers),
+                artist=source.original_artist if isinstance(source.original_artist, str) else "",
+                bpm=source.tempo_bpm,
+                key=source.key if isinstance(source.key, str) else None,
+                time_signature=source.time_signature if isinstance(source.time_signature, str) else "",
+                score=FEDERATED_SCORE,
+                query=source.title,
+                source=f"federated:{name}",
+            )
+            for _, song in members:
+                key = normalize_key(song.title) if isinstance(song.title, str) else ""
+                if key and len(self.by_title.get(key, ())) == 1:
+                    lookups[key] = match
+        return lookups
+
+    def name_counts(self) -> dict[str, Counter[str]]:
+        """Writer/artist spellings counted once per federated song, however many congregations hold it."""
+        counts: dict[str, Counter[str]] = {kind: Counter() for kind in KINDS}
+        for members in self.member_songs():
+            writers: set[str] = set()
+            artists: set[str] = set()
+            for _, song in members:
+                if isinstance(song.writers, tuple):
+                    writers.update(w.strip() for w in song.writers if isinstance(w, str) and w.strip())
+                if isinstance(song.original_artist, str) and song.original_artist.strip():
+                    artists.add(song.original_artist.strip())
+            counts["writers"].update(writers)
+            counts["artists"].update(artists)
+        return counts
+
+    def name_resolvers(self, counts: dict[str, Counter[str]]) -> dict[str, NameResolver]:
+        """Resolvers clustered over every root's names, seeded with each root's saved name map."""
+        resolvers: dict[str, NameResolver] = {}
+        for kind in KINDS:
+            seed: dict[str, list[str]] = {}
+            for snapshot in self.snapshots:
+                for canonical, variants in snapshot.name_maps[kind].items():
+                    bucket = seed.setdefault(canonical, [])
+                    bucket.extend(variant for variant in variants if variant not in bucket)
+            resolvers[kind] = NameResolver(cluster_names(counts[kind], seed))
+        return resolvers
+
+    @timed
+    def analytics(self, top: int = 10) -> dict[str, Any]:
+        congregations = {
+            snapshot.name: {
+                "root": str(snapshot.root),
+                "songs": len(snapshot.records.songs),
+                "services": len(snapshot.records.services),
+                "series": len(snapshot.records.series),
+            }
+            for snapshot in self.snapshots
+        }
+        shared = [song for song in self.songs if len({name for name, _ in song.members}) > 1]
+        ranked = sorted(self.songs, key=lambda song: (-song.total_uses, song.title))
+        counts = self.name_counts()
+        resolvers = self.name_resolvers(counts)
+        return {
+            "congregations": congregations,
+            "member_songs": len(self._entries),
+            "federated_songs": len(self.songs),
+            "shared_songs": len(shared),
+            "top_songs": [
+                {"title": song.title, "ccli_number": song.ccli_number, "count": song.total_uses, "congregations": len(song.uses)}
+                for song in ranked[:top]
+            ],
+            "top_writers": resolve_counts(sorted_pairs(counts["writers"], "writer"), "writer", resolvers["writers"])[:top],
+            "top_original_artists": resolve_counts(
+                sorted_pairs(counts["artists"], "original_artist"), "original_artist", resolvers["artists"]
+            )[:top],
+        }
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "version": VERSION,
+            "congregations": {snapshot.name: str(snapshot.root) for snapshot in self.snapshots},
+            "songs": [song.to_json() for song in self.songs],
+        }
+
+
+def completeness(song: Song) -> int:
+    return sum(bool(value) for value in (song.original_artist, song.tempo_bpm, song.key, song.time_signature))
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Merge several congregations' libraries into one deduplicated index.")
+    parser.add_argument("--root", type=Path, action="append", help="library root (repeat for each congregation; default: this repo)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes used to parse roots")
+    parser.add_argument("--top", type=int, default=10, help="rows to show per ranking")
+    parser.add_argument("--output", type=Path, default=OUTPUT, help="relative to the first --root")
+    parser.add_argument("--enrich", action="store_true", help="run CCLI enrichment on every root with shared lookups")
+    parser.add_argument("--resume", action="store_true", help="with --enrich: continue each root from its checkpoint")
+    args = parser.parse_args(argv)
+
+    roots = congregation_names([root.resolve() for root in args.root or [ROOT]])
+    snapshots = load_snapshots(roots, args.workers)
+    index = FederatedIndex(snapshots)
+
+    first = next(iter(roots.values()))
+    output = args.output if args.output.is_absolute() else first / args.output
+    atomic_write_text(output, json.dumps(index.to_json(), indent=2, ensure_ascii=False) + "\n")
+
+    stats = index.analytics(args.top)
+    for name, counts in stats["congregations"].items():
+        print(f"congregation={name} songs={counts['songs']} services={counts['services']} series={counts['series']}")
+    print(f"member_songs={stats['member_songs']}")
+    print(f"federated_songs={stats['federated_songs']}")
+    print(f"shared_songs={stats['shared_songs']}")
+    print("top_songs:")
+    for row in stats["top_songs"]:
+        print(f"  {row['count']:>4}  {row['title']}  congregations={row['congregations']}")
+    for section, label in (("top_writers", "writer"), ("top_original_artists", "original_artist")):
+        print(f"{section}:")
+        for row in stats[section]:
+            print(f"  {row['count']:>4}  {row[label]}")
+    print(f"output={output}")
+
+    if not args.enrich:
+        return 0
+    lookups = index.seed_lookups()
+    seeded = len(lookups)
+    for name, root in roots.items():
+        try:
+            summary = enrich_root(root, args.resume, lookups)
+        except KeyboardInterrupt:
+            return 130
+        if summary is None:
+            continue
+        print(
+            f"enrich[{name}] updated_files={summary['updated_files']} "
+            f"skipped_already_populated={summary['skipped_already_populated']} unmatched_count={summary['unmatched_count']}"
+        )
+    print(f"lookups_seeded={seeded}")
+    print(f"lookups_fetched={len(lookups) - seeded}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(main))
@@ -0,0 +1,48 @@
+"""
+Filesystem helpers shared by the Python tooling.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+SONGS_DIR = ROOT / "songs"
+SERVICES_DIR = ROOT / "services"
+SERIES_DIR = ROOT / "series"
+DATA_DIR = ROOT / "public" / "data"
+OUTPUT_DIRS = [ROOT / "public" / "data", ROOT / "dist" / "data"]
+
+
+def is_library_file(path: Path) -> bool:
+    return path.suffix == ".md" and not path.name.startswith("_")
+
+
+def list_markdown_files(directory: Path) -> list[Path]:
+    if not directory.is_dir():
+        return []
+    return sorted((p for p in directory.glob("*.md") if is_library_file(p) and p.is_file()), key=lambda p: p.name)
+
+
+def atomic_write_bytes(path: Path, payload: bytes) -> None:
+    """Write via a sibling temp file and rename, so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(payload)
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    atomic_write_bytes(path, text.encode("utf-8"))
@@ -0,0 +1,253 @@
+"""
+Frontmatter parsing and dumping for songs/*.md, services/*.md and series/*.md.
+
+This follows the same restricted YAML subset the data scripts have always
+written, extended with the shapes used by service and series files:
+flow lists (`usage: ["main"]`) and block lists of mappings (`songs:`).
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any
+
+from hymnops.profiling import timed
+
+
+SONG_KEY_ORDER = [
+    "title",
+    "slug",
+    "aka",
+    "ccli_number",
+    "songselect_url",
+    "lyrics_source",
+    "lyrics_hint",
+    "original_artist",
+    "writers",
+    "publisher",
+    "year",
+    "tempo_bpm",
+    "key",
+    "time_signature",
+    "congregational_fit",
+    "vocal_range",
+    "dominant_themes",
+    "doctrinal_categories",
+    "emotional_tone",
+    "scriptural_anchors",
+    "theological_summary",
+    "arrangement_notes",
+    "slides_path",
+    "tags",
+    "last_sung_override",
+    "status",
+    "licensing_notes",
+    "language",
+    "meter",
+]
+
+SERVICE_KEY_ORDER = ["date", "series_slug", "sermon_title", "sermon_text", "preacher", "songs"]
+SERIES_KEY_ORDER = ["title", "slug", "date_range", "description", "recommended"]
+# Fixed-length lists written inline, as in `date_range: ["2024-01-07", null]`.
+FLOW_LIST_KEYS = {"date_range"}
+
+KEY_RE = re.compile(r"^([A-Za-z0-9_]+):\s*(.*)$")
+ITEM_RE = re.compile(r"^(\s*)-\s*(.*)$")
+INT_RE = re.compile(r"-?\d+")
+FLOAT_RE = re.compile(r"-?\d+\.\d+")
+ESCAPE_RE = re.compile(r"\\(.)")
+OPEN_RE = re.compile(r"---\r?\n")
+CLOSE_RE = re.compile(r"\n---(?:\r?\n|$)")
+
+
+def split_flow_list(inner: str) -> list[str]:
+    parts: list[str] = []
+    buf: list[str] = []
+    quote = ""
+    escaped = False
+    for ch in inner:
+        if quote:
+            buf.append(ch)
+            if escaped:
+                escaped = False
+            elif ch == "\\" and quote == '"':
+                escaped = True
+            elif ch == quote:
+                quote = ""
+            continue
+        if ch in "\"'":
+            quote = ch
+            buf.append(ch)
+        elif ch == ",":
+            parts.append("".join(buf))
+            buf = []
+        else:
+            buf.append(ch)
+    tail = "".join(buf)
+    if tail.strip() or parts:
+        parts.append(tail)
+    return [p for p in parts if p.strip()]
+
+
+def parse_scalar(raw: str) -> Any:
+    text = raw.strip()
+    if text in ("null", "~", ""):
+        return None
+    if text == "[]":
+        return []
+    if text == "true":
+        return True
+    if text == "false":
+        return False
+    if INT_RE.fullmatch(text):
+        return int(text)
+    if FLOAT_RE.fullmatch(text):
+        return float(text)
+    if len(text) >= 2 and text[0] == '"' and text[-1] == '"':
+        return ESCAPE_RE.sub(r"\1", text[1:-1])
+    if len(text) >= 2 and text[0] == "'" and text[-1] == "'":
+        return text[1:-1].replace("''", "'").replace("\\'", "'")
+    if len(text) >= 2 and text[0] == "[" and text[-1] == "]":
+        return [parse_scalar(part) for part in split_flow_list(text[1:-1])]
+    return text
+
+
+def quote_yaml(text: str) -> str:
+    escaped = text.replace("\\", "\\\\").replace('"', r"\"")
+    return f'"{escaped}"'
+
+
+def dump_scalar(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        return str(value)
+    if isinstance(value, str):
+        return quote_yaml(value)
+    raise TypeError(f"Unsupported scalar type: {type(value)!r}")
+
+
+def split_frontmatter(text: str) -> tuple[str, str]:
+    if text.startswith("\ufeff"):
+        text = text.lstrip("\ufeff")
+    m = OPEN_RE.match(text)
+    if not m:
+        raise ValueError("File does not start with frontmatter")
+    close = CLOSE_RE.search(text, m.end() - 1)
+    if close is None:
+        raise ValueError("Frontmatter closing delimiter not found")
+    return text[m.end() : close.start() + 1].replace("\r\n", "\n"), text[close.end() :]
+
+
+def parse_block_items(lines: list[str], start: int) -> tuple[list[Any], int]:
+    items: list[Any] = []
+    j = start
+    while j < len(lines):
+        line = lines[j]
+        if not line.strip():
+            j += 1
+            continue
+        lm = ITEM_RE.match(line)
+        if not lm:
+            break
+        item_indent = len(lm.group(1))
+        rest = lm.group(2)
+        km = KEY_RE.match(rest)
+        if km and not rest.startswith(('"', "'")):
+            mapping: dict[str, Any] = {km.group(1): parse_scalar(km.group(2))}
+            j += 1
+            while j < len(lines):
+                cont = lines[j]
+                indent = len(cont) - len(cont.lstrip(" "))
+                if not cont.strip():
+                    j += 1
+                    continue
+                if indent <= item_indent:
+                    break
+                cm = KEY_RE.match(cont.strip())
+                if cm:
+                    mapping[cm.group(1)] = parse_scalar(cm.group(2))
+                j += 1
+            items.append(mapping)
+            continue
+        items.append(parse_scalar(rest))
+        j += 1
+    return items, j
+
+
+@timed
+def parse_frontmatter(text: str) -> tuple[dict[str, Any], str]:
+    fm_block, body = split_frontmatter(text)
+    lines = fm_block.splitlines()
+
+    data: dict[str, Any] = {}
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if not line.strip():
+            i += 1
+            continue
+
+        m = KEY_RE.match(line)
+        if not m:
+            i += 1
+            continue
+
+        key = m.group(1)
+        remainder = m.group(2)
+
+        if remainder == "":
+            items, i = parse_block_items(lines, i + 1)
+            data[key] = items
+            continue
+
+        data[key] = parse_scalar(remainder)
+        i += 1
+
+    return data, body
+
+
+@timed
+def dump_frontmatter(data: dict[str, Any], key_order: list[str] | None = None) -> str:
+    order = SONG_KEY_ORDER if key_order is None else key_order
+    keys: list[str] = [key for key in order if key in data]
+    for key in data.keys():
+        if key not in keys:
+            keys.append(key)
+
+    out: list[str] = ["---"]
+    for key in keys:
+        value = data[key]
+        if isinstance(value, (list, tuple)):
+            if not value:
+                out.append(f"{key}: []")
+                continue
+            if key in FLOW_LIST_KEYS:
+                out.append(f"{key}: [" + ", ".join(dump_scalar(v) for v in value) + "]")
+                continue
+            out.append(f"{key}:")
+            for item in value:
+                if isinstance(item, dict):
+                    first = True
+                    for sub_key, sub_value in item.items():
+                        prefix = "  - " if first else "    "
+                        if isinstance(sub_value, (list, tuple)):
+                            rendered = "[" + ", ".join(dump_scalar(v) for v in sub_value) + "]"
+                        else:
+                            rendered = dump_scalar(sub_value)
+                        out.append(f"{prefix}{sub_key}: {rendered}")
+                        first = False
+                elif item is None:
+                    out.append("  - null")
+                elif isinstance(item, (int, float, bool)):
+                    out.append(f"  - {dump_scalar(item)}")
+                else:
+                    out.append(f"  - {quote_yaml(str(item))}")
+        else:
+            out.append(f"{key}: {dump_scalar(value)}")
+    out.append("---")
+    return "\n".join(out) + "\n"
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Mine git history for song metadata provenance and service first-commit dates.
+
+History is walked once with a single `git log --raw` (first-parent, oldest
+first), which lists, per commit, only the songs/ and services/ files whose
+blob changed. Those blobs are read in bulk through one long-lived
+`git cat-file --batch` pipe and their frontmatter is parsed once per blob
+hash, so a revert or a file copied between commits costs nothing extra.
+
+The result is written to imports/song-history.json:
+
+    {
+      "version": 1,
+      "head": "<last processed commit>",
+      "fields": [...TRACKED_FIELDS],
+      "commits": [["<sha>", "<committer date>"], ...],
+      "songs": {"<slug>": {"added": 0, "removed": 7, "key": [[0, "G"], [5, "A"]], ...}},
+      "services": {"<date>": {"added": 3}}
+    }
+
+Numbers are indexes into "commits"; each field timeline only holds the
+commits where the value changed. A song revision whose frontmatter cannot
+be parsed (malformed, or not UTF-8) is listed under the song's
+"unparsable" key and leaves its timelines untouched. A later run reads the file back and only
+walks `<head>..HEAD`; if <head> is no longer an ancestor of HEAD (rebased
+history) the timeline is rebuilt from scratch.
+
+Usage:
+    python -m hymnops history [--root .] [--output imports/song-history.json] [--rebuild] [--song <slug>]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Iterator
+
+from hymnops.files import ROOT, atomic_write_text
+from hymnops.frontmatter import parse_frontmatter
+from hymnops.profiling import run, timed
+
+
+VERSION = 1
+OUTPUT = Path("imports/song-history.json")
+TRACKED_FIELDS = (
+    "title",
+    "status",
+    "key",
+    "tempo_bpm",
+    "time_signature",
+    "ccli_number",
+    "writers",
+    "dominant_themes",
+    "doctrinal_categories",
+)
+PATHSPECS = ("songs", "services")
+COMMIT_PREFIX = "commit "
+
+
+class GitError(RuntimeError):
+    pass
+
+
+def git(root: Path, *args: str) -> str:
+    result = subprocess.run(["git", *args], cwd=root, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise GitError(f"git {' '.join(args)}: {result.stderr.strip()}")
+    return result.stdout
+
+
+def is_ancestor(root: Path, ancestor: str, head: str) -> bool:
+    result = subprocess.run(["git", "merge-base", "--is-ancestor", ancestor, head], cwd=root, capture_output=True)
+    return result.returncode == 0
+
+
+class BlobReader:
+    """A single `git cat-file --batch` process that blobs are requested from one at a time."""
+
+    def __init__(self, root: Path) -> None:
+        self.process = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            cwd=root,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+        self.reads = 0
+
+    def read(self, sha: str) -> bytes | None:
+        assert self.process.stdin is not None and self.process.stdout is not None
+        self.process.stdin.write(sha.encode("ascii") + b"\n")
+        self.process.stdin.flush()
+        header = self.process.stdout.readline().split()
+        if len(header) != 3:
+            return None
+        payload = self.process.stdout.read(int(header[2]) + 1)[:-1]
+        self.reads += 1
+        return payload
+
+    def close(self) -> None:
+        if self.process.stdin is not None:
+            self.process.stdin.close()
+        self.process.wait()
+
+    def __enter__(self) -> BlobReader:
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+
+def iter_changes(root: Path, revisions: str) -> Iterator[tuple[str, str, list[tuple[str, str, str]]]]:
+    """Yield (sha, date, [(status, blob, path), ...]) per commit touching songs/ or services/, oldest first."""
+    process = subprocess.Popen(
+        [
+            "git",
+            "log",
+            "--reverse",
+            "--first-parent",
+            "--diff-merges=first-parent",
+            "--no-renames",
+            "--raw",
+            "--no-abbrev",
+            f"--format={COMMIT_PREFIX}%H %cI",
+            revisions,
+            "--",
+            *PATHSPECS,
+        ],
+        cwd=root,
+        stdout=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+    )
+    assert process.stdout is not None
+    current: tuple[str, str] | None = None
+    changes: list[tuple[str, str, str]] = []
+    for line in process.stdout:
+        if line.startswith(COMMIT_PREFIX):
+            if current is not None:
+                yield current[0], current[1], changes
+            sha, _, date = line[len(COMMIT_PREFIX) :].strip().partition(" ")
+            current, changes = (sha, date), []
+        elif line.startswith(":"):
+            meta, _, path = line.rstrip("\n").partition("\t")
+            parts = meta.split()
+            changes.append((parts[4][0], parts[3], path))
+    if current is not None:
+        yield current[0], current[1], changes
+    if process.wait() != 0:
+        raise GitError(f"git log {revisions} failed")
+
+
+def tracked_values(payload: bytes) -> dict[str, Any]:
+    fm, _body = parse_frontmatter(payload.decode("utf-8").lstrip("\ufeff"))
+    return {field: fm.get(field) for field in TRACKED_FIELDS}
+
+
+def empty_history() -> dict[str, Any]:
+    return {"version": VERSION, "head": None, "fields": list(TRACKED_FIELDS), "commits": [], "songs": {}, "services": {}}
+
+
+def load_history(path: Path) -> dict[str, Any]:
+    if not path.is_file():
+        return empty_history()
+    history = json.loads(path.read_text(encoding="utf-8"))
+    if history.get("version") != VERSION or history.get("fields") != list(TRACKED_FIELDS):
+        return empty_history()
+    return history
+
+
+def library_entry(path: str) -> tuple[str, str] | None:
+    """Return (kind, stem) for songs/<slug>.md and services/<date>.md, else None."""
+    kind, _, name = path.partition("/")
+    if kind not in PATHSPECS or "/" in name or not name.endswith(".md") or name.startswith("_"):
+        return None
+    return kind, name[:-3]
+
+
+@timed
+def mine(root: Path, history: dict[str, Any], head: str) -> dict[str, int]:
+    """Extend `history` in place with every commit after history["head"] up to `head`."""
+    start = history.get("head")
+    if start and not is_ancestor(root, start, head):
+        history.clear()
+        history.update(empty_history())
+        start = None
+    revisions = f"{start}..{head}" if start else head
+
+    commits: list[list[str]] = history["commits"]
+    songs: dict[str, dict[str, Any]] = history["songs"]
+    services: dict[str, dict[str, Any]] = history["services"]
+    parsed: dict[str, dict[str, Any] | None] = {}
+    scanned = changed = unparsable = 0
+
+    with BlobReader(root) as reader:
+        for sha, date, changes in iter_changes(root, revisions):
+            scanned += 1
+            index = len(commits)
+            used = False
+            for status, blob, path in changes:
+                entry = library_entry(path)
+                if entry is None:
+                    continue
+                kind, stem = entry
+                used = True
+                if kind == "services":
+                    record = services.setdefault(stem, {"added": index})
+                    if status == "D":
+                        record["removed"] = index
+                    else:
+                        record.pop("removed", None)
+                    continue
+
+                song = songs.setdefault(stem, {"added": index})
+                if status == "D":
+                    song["removed"] = index
+                    continue
+                song.pop("removed", None)
+                if blob not in parsed:
+                    payload = reader.read(blob)
+                    if payload is None:
+                        continue
+                    try:
+                        parsed[blob] = tracked_values(payload)
+                    except (ValueError, UnicodeDecodeError):
+                        parsed[blob] = None
+                values = parsed[blob]
+                if values is None:
+                    song.setdefault("unparsable", []).append(index)
+                    unparsable += 1
+                    continue
+                for field, value in values.items():
+                    timeline = song.setdefault(field, [])
+                    if not timeline or timeline[-1][1] != value:
+                        timeline.append([index, value])
+                        changed += 1
+            if used:
+                commits.append([sha, date])
+        blobs_read = reader.reads
+
+    history["head"] = head
+    return {"commits_scanned": scanned, "blobs_read": blobs_read, "field_changes": changed, "unparsable_revisions": unparsable}
+
+
+def song_timeline(history: dict[str, Any], slug: str) -> list[tuple[str, str, str, Any]]:
+    """Flatten one song's history into (date, sha, event, value) rows, oldest first."""
+    song = history["songs"].get(slug)
+    if song is None:
+        return []
+    commits = history["commits"]
+    rows: list[tuple[int, str, Any]] = [(song["added"], "added", None)]
+    for field in TRACKED_FIELDS:
+        rows.extend((index, field, value) for index, value in song.get(field, []))
+    rows.extend((index, "unparsable", None) for index in song.get("unparsable", []))
+    if "removed" in song:
+        rows.append((song["removed"], "removed", None))
+    rows.sort(key=lambda row: row[0])
+    return [(commits[index][1], commits[index][0][:10], event, value) for index, event, value in rows]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Build per-field change timelines for songs from git history.")
+    parser.add_argument("--root", type=Path, default=ROOT, help="git checkout containing songs/ and services/")
+    parser.add_argument("--output", type=Path, default=OUTPUT, help="relative to --root")
+    parser.add_argument("--rebuild", action="store_true", help="ignore the previous output and walk all history")
+    parser.add_argument("--song", help="print the timeline for one song slug")
+    args = parser.parse_args(argv)
+
+    root = args.root.resolve()
+    output = args.output if args.output.is_absolute() else root / args.output
+    try:
+        head = git(root, "rev-parse", "HEAD").strip()
+        history = empty_history() if args.rebuild else load_history(output)
+        if history.get("head") == head:
+            stats = {"commits_scanned": 0, "blobs_read": 0, "field_changes": 0, "unparsable_revisions": 0}
+        else:
+            stats = mine(root, history, head)
+            atomic_write_text(output, json.dumps(history, separators=(",", ":"), ensure_ascii=False) + "\n")
+    except GitError as exc:
+        print(str(exc), file=sys.stderr)
+        return 1
+
+    if args.song:
+        rows = song_timeline(history, args.song)
+        if not rows:
+            print(f"unknown song: {args.song}", file=sys.stderr)
+            return 1
+        for date, sha, event, value in rows:
+            print(f"{date}  {sha}  {event}" + ("" if event in ("added", "removed", "unparsable") else f"={json.dumps(value)}"))
+        return 0
+
+    for name, value in stats.items():
+        print(f"{name}={value}")
+    print(f"songs={len(history['songs'])}")
+    print(f"services={len(history['services'])}")
+    print(f"head={head}")
+    print(f"output={output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(main))
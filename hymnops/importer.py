@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+"""
+Import a year of service song lists from CSV into songs/, services/ and series/.
+
+Python port of scripts/import-2024.ps1. The CSV has the columns
+`Song Title`, `Date of Service` (e.g. `17 Mar`) and `Sermon Series`. Titles
+are normalized through CORRECTIONS and matched against existing songs by a
+punctuation-insensitive key; unmatched titles get a new stub song file.
+
+Unlike the PowerShell script, files that already exist are merged rather
+than overwritten: a service keeps its sermon fields, body and the
+usage/key/notes of songs it already lists, and a series keeps its
+description, recommendations and notes (its date range is widened). Stale
+services for the year are only deleted with `--prune`.
+
+Usage:
+    python -m hymnops import [--csv imports/2024.csv] [--year 2024] [--prune]
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import re
+import sys
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from hymnops.files import ROOT, list_markdown_files
+from hymnops.frontmatter import SERIES_KEY_ORDER, SERVICE_KEY_ORDER, dump_frontmatter, parse_frontmatter
+from hymnops.profiling import run
+
+
+DATE_FORMATS = ["%d %b %Y", "%d %B %Y"]
+
+CORRECTION_PAIRS = [
+    ("mighty mighty saviour", "Mighty Mighty Saviour"),
+    ("In Christ Alone (getty)", "In Christ Alone (Getty)"),
+    ("What Grace is Mine", "What Grace Is Mine"),
+    ("Lord I Lift Your name on high", "Lord I Lift Your Name On High"),
+    ("Lead me to Calvary", "Lead Me To Calvary"),
+    ("Christ is Risen He is Risen Indeed", "Christ Is Risen, He Is Risen Indeed"),
+    ("Hymn Of the Saviour", "Hymn Of The Saviour"),
+    ("There Is a Hope", "There Is A Hope"),
+    ("Jesus Is the King", "Jesus Is The King"),
+    ("Crown Him with many Crowns", "Crown Him With Many Crowns"),
+    ("Come People of the Risen King", "Come People Of The Risen King"),
+    ("There is One Gospel", "There Is One Gospel"),
+    ("King of Kings", "King Of Kings"),
+    ("I Have Decided to Follow Jesus", "I Have Decided To Follow Jesus"),
+    ("Jesus Came to Earth", "Jesus Came To Earth"),
+    ("God the Uncreated One", "God The Uncreated One"),
+    ("Amazing Grace (hymn)", "Amazing Grace (Hymn)"),
+    ("No other Name (Emu)", "No Other Name (Emu)"),
+    ("Great Is The Lord (and most worthy of praise)", "Great Is The Lord (And Most Worthy Of Praise)"),
+    ("Trust and Obey", "Trust And Obey"),
+    ("Goodness of Jesus", "Goodness Of Jesus"),
+    ("Goodness of God", "Goodness Of God"),
+    ("Come Praise and Glorify", "Come Praise And Glorify"),
+    ("Tis so Sweet To Trust In Jesus", "'Tis So Sweet To Trust In Jesus"),
+    ("OThe Wonderful Cross", "O The Wonderful Cross"),
+    ("Beneath The Cross of Jesus", "Beneath The Cross Of Jesus"),
+    ("Holy Spirit Living Breath of God", "Holy Spirit, Living Breath Of God"),
+    ("What a Friend We Have In Jesus", "What A Friend We Have In Jesus"),
+    ("Meekness and Majesty", "Meekness And Majesty"),
+    ("Man of Sorrows", "Man Of Sorrows"),
+    ("All Hail The Power of Jesus Name", "All Hail The Power Of Jesus' Name"),
+    ("O Come O Come Emmanuel", "O Come, O Come Emmanuel"),
+    ("Joy To The World (King of Kings)", "Joy To The World (King Of Kings)"),
+    ("Crown Him King of Kings", "Crown Him King Of Kings"),
+    ("Hark the Herald Angels Sing", "Hark The Herald Angels Sing"),
+    ("Angels We Have Heard on High", "Angels We Have Heard On High"),
+    ("O Little Town of Bethlehem", "O Little Town Of Bethlehem"),
+    ("What Child is This", "What Child Is This"),
+    ("It Came Upon a Midnight Clear", "It Came Upon A Midnight Clear"),
+    ("My Hope is Built on Nothing Less", "My Hope Is Built On Nothing Less"),
+    ("Christ is Enough", "Christ Is Enough"),
+    ("Christ is Mine Forevermore", "Christ Is Mine Forevermore"),
+    ("We will Feast", "We Will Feast"),
+    ("Hallelujah, What a Saviour", "Hallelujah, What A Saviour"),
+    ("Y", "Yet Not I"),
+    ("There's No Greater Love", "No Greater Love"),
+    ("Rejoice the Lord is King", "Rejoice The Lord Is King"),
+    ("Turn your eyes", "Turn Your Eyes"),
+    ("I stand amazed", "I Stand Amazed"),
+    ("My heart is filled with thankfulness", "My Heart Is Filled With Thankfulness"),
+    ("Come thou Fount (Chris Tomlin ver)", "Come Thou Fount"),
+    ("Only a Holy God", "Only A Holy God"),
+    ("O church arise", "O Church Arise"),
+    ("Christ has Risen", "Christ Has Risen"),
+    ("Christ Our Hope In Life and Death", "Christ Our Hope In Life And Death"),
+    ("Take heart", "Take Heart"),
+    ("Come Priase and Glorify", "Come Praise And Glorify"),
+    ("All I have is Christ", "All I Have Is Christ"),
+    ("The Wonderful Cross", "O The Wonderful Cross"),
+    ("Your Love (will last forever)", "Your Love"),
+    ("Great is the Lord and most worthy", "Great Is The Lord (And Most Worthy Of Praise)"),
+    ("The Battle and thne Blessing", "The Battle and the Blessing"),
+    ("Jesus Shall Take the highest honour", "Jesus Shall Take The Highest Honour"),
+    ("I Stand in awe of you", "I Stand In Awe Of You"),
+    ("How Good it Is", "O How Good It Is"),
+    ("Psalm 150 (praise the lord)", "Psalm 150 (Praise The Lord)"),
+    ("The Lord is my Salvation", "The Lord Is My Salvation"),
+    ("He Calls me Friend", "He Calls Me Friend"),
+    ("I'm gonna be like a tree", "Be Like A Tree"),
+    ("Everlasting God (strength will rise)", "Everlasting God"),
+    ("How Excellent Your name", "How Excellent Your Name"),
+    ("Bless The Lord O my Soul", "Bless The Lord O My Soul"),
+    ("His Mercy is More", "His Mercy Is More"),
+    ("The Love of God", "The Love Of God"),
+    ("The Goodness of Jesus", "Goodness Of Jesus"),
+    ("Before the Throne of God Above", "Before The Throne Of God Above"),
+    ("It was Finished Upon That Cross", "It Was Finished Upon That Cross"),
+    ("Still, my Soul Be Still", "Still My Soul Be Still"),
+    ("Let Us Exalt his Name", "Let Us Exalt His Name"),
+    ("Lord of Lords", "Lord Of Lords"),
+    ("God's Big Family", "God's Great Family"),
+    ("I Am The way The Truth And The Life", "I Am The Way The Truth And The Life"),
+    ("How Deep The Father's Love", "How Deep The Father's Love For Us"),
+    ("I Love You lord (and I lift my voice)", "I Love You Lord (And I Lift My Voice)"),
+    ("His Banner Over me Is Love", "His Banner Over Me Is Love"),
+    ("Take My Life and Let It Be", "Take My Life And Let It Be"),
+    ("Be Still, my Soul", "Be Still My Soul"),
+    ("All to Jesus I Surrender", "All To Jesus I Surrender"),
+    ("He WIll Hold Me Fast", "He Will Hold Me Fast"),
+    ("There Is a Redeemer (Keith Green)", "There Is A Redeemer (Keith Green)"),
+    ("I Stand Amazed (Glasbyrd)", "I Stand Amazed"),
+    ("The Steadast Love Of the Lord never ceases", "The Steadfast Love Of The Lord Never Ceases"),
+    ("I Will Sing of My Redeemer", "I Will Sing Of My Redeemer"),
+    ("How Deep the Father's Love For Us", "How Deep The Father's Love For Us"),
+    ("He Leadeth me", "He Leadeth Me"),
+    ("Known & Loved", "Known and Loved"),
+    ("Ancient of Days", "Ancient Of Days"),
+    ("Hallelujah What A Saviour", "Hallelujah, What A Saviour"),
+    ("Fill my Eyes O My God", "Fill My Eyes O My God"),
+]
+# PowerShell hashtables are case-insensitive; the table relies on that.
+CORRECTIONS = {raw.casefold(): fixed for raw, fixed in CORRECTION_PAIRS}
+
+SPACE_RE = re.compile(r"\s+")
+NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_whitespace(value: str | None) -> str:
+    return SPACE_RE.sub(" ", value or "").strip()
+
+
+def normalize_key(value: str) -> str:
+    return NON_ALNUM_RE.sub(" ", normalize_whitespace(value).lower()).strip()
+
+
+def slugify(value: str) -> str:
+    text = normalize_whitespace(value).lower().replace("&", " and ")
+    text = re.sub("['’]", "", text)
+    text = NON_ALNUM_RE.sub("-", text).strip("-")
+    return text or "untitled"
+
+
+def parse_service_date(value: str, year: int) -> str:
+    text = normalize_whitespace(value)
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(f"{text} {year}", fmt).date().isoformat()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized date format: '{text}'")
+
+
+def most_common(values: list[str]) -> str:
+    """Most frequent value (case-insensitive), ties broken alphabetically, as Group-Object | Sort-Object does."""
+    counts: Counter[str] = Counter()
+    first_seen: dict[str, str] = {}
+    for value in values:
+        key = value.casefold()
+        counts[key] += 1
+        first_seen.setdefault(key, value)
+    best = min(counts, key=lambda key: (-counts[key], key))
+    return first_seen[best]
+
+
+def unique_slug(base: str, taken: set[str]) -> str:
+    slug = base
+    suffix = 2
+    while slug in taken:
+        slug = f"{base}-{suffix}"
+        suffix += 1
+    taken.add(slug)
+    return slug
+
+
+@dataclass
+class Row:
+    index: int
+    raw_title: str
+    title: str
+    song_key: str
+    date: str
+    series_title: str
+
+
+def read_rows(csv_path: Path, year: int) -> list[Row]:
+    with csv_path.open(encoding="utf-8-sig", newline="") as handle:
+        records = list(csv.DictReader(handle))
+    if not records:
+        raise ValueError(f"CSV is empty: {csv_path}")
+
+    rows: list[Row] = []
+    for index, record in enumerate(records):
+        raw_title = normalize_whitespace(record.get("Song Title"))
+        date_text = normalize_whitespace(record.get("Date of Service"))
+        if not raw_title or not date_text:
+            continue
+        title = CORRECTIONS.get(raw_title.casefold(), raw_title)
+        rows.append(
+            Row(
+                index=index,
+                raw_title=raw_title,
+                title=title,
+                song_key=normalize_key(title),
+                date=parse_service_date(date_text, year),
+                series_title=normalize_whitespace(record.get("Sermon Series")),
+            )
+        )
+    if not rows:
+        raise ValueError("No usable rows parsed from CSV.")
+    return rows
+
+
+def title_index(directory: Path) -> tuple[dict[str, str], set[str]]:
+    """Map normalized title -> slug (first file wins) and return every existing slug."""
+    by_title: dict[str, str] = {}
+    slugs: set[str] = set()
+    for path in list_markdown_files(directory):
+        slugs.add(path.stem)
+        fm, _body = parse_frontmatter(path.read_text(encoding="utf-8"))
+        title = fm.get("title")
+        if isinstance(title, str) and normalize_key(title):
+            by_title.setdefault(normalize_key(title), path.stem)
+    return by_title, slugs
+
+
+def new_song(title: str, slug: str, akas: list[str], last_sung: str, label: str, tag: str) -> str:
+    fm = {
+        "title": title,
+        "slug": slug,
+        "aka": akas,
+        "ccli_number": None,
+        "songselect_url": None,
+        "lyrics_source": "Unknown",
+        "lyrics_hint": "",
+        "original_artist": None,
+        "writers": [],
+        "publisher": None,
+        "year": None,
+        "tempo_bpm": None,
+        "key": None,
+        "time_signature": None,
+        "congregational_fit": None,
+        "vocal_range": None,
+        "dominant_themes": [],
+        "doctrinal_categories": [],
+        "emotional_tone": [],
+        "scriptural_anchors": [],
+        "theological_summary": f"Imported from {label}; update with a non-lyrical theological summary.",
+        "arrangement_notes": None,
+        "slides_path": None,
+        "tags": [tag],
+        "last_sung_override": last_sung,
+        "status": "active",
+        "licensing_notes": None,
+        "language": "en",
+        "meter": None,
+    }
+    body = (
+        f"\n## Notes\n\nImported from `{label}`. Add arrangement and preparation notes only (no lyrics).\n"
+        "\n## Pastoral Use\n\nAdd practical worship-flow and ministry guidance only (no lyrics).\n"
+    )
+    return dump_frontmatter(fm) + body
+
+
+def read_existing(path: Path) -> tuple[dict[str, Any], str] | None:
+    if not path.is_file():
+        return None
+    return parse_frontmatter(path.read_text(encoding="utf-8"))
+
+
+def write_if_changed(path: Path, text: str) -> bool:
+    if path.is_file() and path.read_text(encoding="utf-8").lstrip("\ufeff") == text:
+        return False
+    path.write_text(text, encoding="utf-8")
+    return True
+
+
+def import_csv(root: Path, csv_path: Path, year: int, prune: bool = False) -> dict[str, int]:
+    songs_dir, services_dir, series_dir = root / "songs", root / "services", root / "series"
+    label = csv_path.relative_to(root).as_posix() if csv_path.is_relative_to(root) else csv_path.as_posix()
+    tag = f"import-{year}"
+    rows = read_rows(csv_path, year)
+
+    # -- songs -------------------------------------------------------------
+    song_by_title, taken_song_slugs = title_index(songs_dir)
+    groups: dict[str, list[Row]] = {}
+    for row in rows:
+        if row.song_key:
+            groups.setdefault(row.song_key, []).append(row)
+
+    slug_by_key: dict[str, str] = {}
+    created_songs = 0
+    for song_key, items in groups.items():
+        if song_key in song_by_title:
+            slug_by_key[song_key] = song_by_title[song_key]
+            continue
+        title = most_common([item.title for item in items])
+        slug = unique_slug(slugify(title), taken_song_slugs)
+        slug_by_key[song_key] = slug
+        akas = list(dict.fromkeys(item.raw_title for item in items if item.raw_title.casefold() != title.casefold()))
+        last_sung = max(item.date for item in items)
+        write_if_changed(songs_dir / f"{slug}.md", new_song(title, slug, akas, last_sung, label, tag))
+        created_songs += 1
+
+    # -- series ------------------------------------------------------------
+    series_by_title, taken_series_slugs = title_index(series_dir)
+    series_titles = list(dict.fromkeys(row.series_title for row in rows if row.series_title))
+    series_slug_by_title: dict[str, str] = {}
+    for title in series_titles:
+        if normalize_key(title) in series_by_title:
+            series_slug_by_title[title] = series_by_title[normalize_key(title)]
+        elif slugify(title) in taken_series_slugs:
+            series_slug_by_title[title] = slugify(title)
+        else:
+            series_slug_by_title[title] = unique_slug(slugify(title), taken_series_slugs)
+
+    # -- services ----------------------------------------------------------
+    by_date: dict[str, list[Row]] = {}
+    for row in rows:
+        by_date.setdefault(row.date, []).append(row)
+
+    written_services = 0
+    used_series: set[str] = set()
+    for service_date, items in by_date.items():
+        path = services_dir / f"{service_date}.md"
+        existing = read_existing(path)
+        old_fm, body = existing if existing else ({}, f"\n## Service Notes\n\nImported from `{label}`.\n")
+        old_songs: dict[str, list[dict[str, Any]]] = {}
+        for item in old_fm.get("songs") or []:
+            if isinstance(item, dict) and "slug" in item:
+                old_songs.setdefault(item["slug"], []).append(item)
+        series_title = most_common([item.series_title for item in items])
+        songs: list[dict[str, Any]] = []
+        for item in sorted(items, key=lambda row: row.index):
+            if not item.song_key:
+                continue
+            slug = slug_by_key[item.song_key]
+            previous = old_songs[slug].pop(0) if old_songs.get(slug) else {}
+            songs.append(
+                {
+                    "slug": slug,
+                    "usage": previous.get("usage") or ["main"],
+                    "key": previous.get("key"),
+                    "notes": previous.get("notes"),
+                }
+            )
+        # A series assigned by hand to an existing service wins over the CSV.
+        series_slug = old_fm.get("series_slug") or series_slug_by_title.get(series_title)
+        if series_slug:
+            used_series.add(series_slug)
+        fm = {
+            "date": service_date,
+            "series_slug": series_slug,
+            "sermon_title": old_fm.get("sermon_title"),
+            "sermon_text": old_fm.get("sermon_text"),
+            "preacher": old_fm.get("preacher"),
+            "songs": songs,
+        }
+        if write_if_changed(path, dump_frontmatter(fm, SERVICE_KEY_ORDER) + body):
+            written_services += 1
+
+    removed_services = 0
+    if prune:
+        for path in list_markdown_files(services_dir):
+            if path.name.startswith(f"{year}-") and path.stem not in by_date:
+                path.unlink()
+                removed_services += 1
+
+    written_series = 0
+    for title in series_titles:
+        slug = series_slug_by_title[title]
+        if slug not in used_series:
+            continue
+        items = [row for row in rows if row.series_title == title]
+        dates = sorted(row.date for row in items)
+        counts = Counter(row.song_key for row in items)
+        recommended = [slug_by_key[key] for key, _ in sorted(counts.items(), key=lambda pair: (-pair[1], pair[0]))[:5]]
+
+        path = series_dir / f"{slug}.md"
+        existing = read_existing(path)
+        old_fm, body = existing if existing else (
+            {},
+            f"\n## Notes\n\nImported from `{label}`. Add planning notes, liturgical emphasis, and playlist ideas.\n",
+        )
+        old_range = old_fm.get("date_range") if isinstance(old_fm.get("date_range"), list) else []
+        starts = [dates[0], *(v for v in old_range[:1] if isinstance(v, str))]
+        ends = [dates[-1], *(v for v in old_range[1:2] if isinstance(v, str))]
+        fm = {
+            "title": old_fm.get("title") or title,
+            "slug": slug,
+            "date_range": [min(starts), max(ends)],
+            "description": old_fm.get("description"),
+            "recommended": old_fm.get("recommended") or recommended,
+        }
+        if write_if_changed(path, dump_frontmatter(fm, SERIES_KEY_ORDER) + body):
+            written_series += 1
+
+    known = {path.stem for path in list_markdown_files(songs_dir)}
+    missing = sum(1 for row in rows if row.song_key and slug_by_key[row.song_key] not in known)
+
+    return {
+        "processed_rows": len(rows),
+        "song_records": len(groups),
+        "created_songs": created_songs,
+        "written_services": written_services,
+        "removed_stale_services": removed_services,
+        "written_series": written_series,
+        "missing_song_refs": missing,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Import service song lists from a yearly CSV.")
+    parser.add_argument("--root", type=Path, default=ROOT, help="library root containing songs/, services/, series/")
+    parser.add_argument("--csv", type=Path, default=Path("imports/2024.csv"), help="CSV path, relative to --root")
+    parser.add_argument("--year", type=int, help="service year (default: the CSV file name, e.g. 2024.csv)")
+    parser.add_argument("--prune", action="store_true", help="delete services for the year that are not in the CSV")
+    args = parser.parse_args(argv)
+
+    root = args.root.resolve()
+    csv_path = args.csv if args.csv.is_absolute() else root / args.csv
+    if not csv_path.is_file():
+        print(f"CSV not found: {csv_path}", file=sys.stderr)
+        return 1
+    year = args.year
+    if year is None:
+        if not csv_path.stem.isdigit():
+            print("--year is required when the CSV name is not a year", file=sys.stderr)
+            return 2
+        year = int(csv_path.stem)
+
+    try:
+        counts = import_csv(root, csv_path, year, prune=args.prune)
+    except ValueError as exc:
+        print(str(exc), file=sys.stderr)
+        return 1
+    for name, count in counts.items():
+        print(f"{name}={count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(main))
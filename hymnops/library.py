@@ -0,0 +1,582 @@
+"""
+In-memory HymnOps library: the Python counterpart of scripts/build-index.ts.
+
+`Library` parses songs/, services/ and series/ once and then keeps every
+intermediate product keyed by file so that a single edited file only
+re-derives what depends on it:
+
+- a song file touches its own song record and the writer/artist tallies;
+- a service file touches the history of the songs it lists (before and
+  after the edit), the services list and the derived aggregates;
+- a series file touches series.json only.
+
+Serialized JSON is cached per record, so rewriting songs.json after one
+edit re-encodes one song rather than the whole library.
+
+Song records are kept per file, as build-index.ts emits them: two files
+with the same `slug:` (which validate reports as an error) are two entries
+in songs.json, sharing the slug's history. Lookups by slug (writer and
+artist tallies, theme coverage) use the last of them in title order, like
+the TS `songBySlug` map.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import unicodedata
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterable
+
+from hymnops.files import ROOT, list_markdown_files
+from hymnops.frontmatter import parse_frontmatter
+from hymnops.profiling import timed
+
+
+OUTPUT_NAMES = ("songs.json", "services.json", "series.json", "derived.json")
+ROTATION_THRESHOLDS = [4, 8, 12, 24]
+HISTORY_LIMIT = 12
+RECENT_WEEKS = 12
+
+SECTION_MARKER_RE = re.compile(r"^\s*(verse|chorus|bridge|tag|refrain)\b[\s:\d-]*$", re.IGNORECASE)
+MARKER_KEYWORD_RE = re.compile(r"\b(verse|chorus|bridge|tag|refrain)\b", re.IGNORECASE)
+HEADING_RE = re.compile(r"^##\s+(.+)\s*$", re.MULTILINE)
+
+
+def is_string(value: Any) -> bool:
+    return isinstance(value, str)
+
+
+def is_string_list(value: Any) -> bool:
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+
+def is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def string_or_none(value: Any) -> str | None:
+    return value if isinstance(value, str) else None
+
+
+def string_list(value: Any) -> list[str]:
+    return list(value) if is_string_list(value) else []
+
+
+def normalize_name(value: str) -> str:
+    return re.sub(r"\s+", " ", value.lower().strip())
+
+
+def collation_key(value: str) -> tuple[str, str]:
+    """Approximate `String.prototype.localeCompare` ordering used by build-index.ts."""
+    folded = unicodedata.normalize("NFKD", value).casefold()
+    base = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    return base, value
+
+
+def detect_lyric_like_content(markdown: str) -> list[str]:
+    reasons: list[str] = []
+    trimmed = [line.strip() for line in re.split(r"\r?\n", markdown) if line.strip()]
+
+    if any(SECTION_MARKER_RE.match(line) for line in trimmed):
+        reasons.append("section markers")
+    if MARKER_KEYWORD_RE.search(markdown):
+        reasons.append("marker keywords")
+
+    def is_short(line: str) -> bool:
+        return len(line) < 60 and not line.startswith("#") and not line.startswith("- ")
+
+    if sum(1 for line in trimmed if is_short(line)) > 40:
+        reasons.append("more-than-40-short-lines")
+
+    short_run = 0
+    max_short_run = 0
+    for line in trimmed:
+        short_run = short_run + 1 if is_short(line) else 0
+        max_short_run = max(max_short_run, short_run)
+    if max_short_run >= 16:
+        reasons.append("long-line-broken-block")
+
+    return reasons
+
+
+def extract_sections(body: str) -> dict[str, str | None]:
+    matches = list(HEADING_RE.finditer(body))
+    sections: dict[str, str] = {}
+    for idx, match in enumerate(matches):
+        next_start = matches[idx + 1].start() if idx < len(matches) - 1 else len(body)
+        sections[match.group(1).strip()] = body[match.end() : next_start].strip()
+    return {
+        "notes_markdown": sections.get("Notes", "").strip() or None,
+        "pastoral_use_markdown": sections.get("Pastoral Use", "").strip() or None,
+    }
+
+
+def parse_date_safe(value: str | None) -> date | None:
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        return None
+
+
+def start_of_week(value: date) -> date:
+    return value - timedelta(days=(value.weekday() + 1) % 7)
+
+
+def weeks_since(value: str | None, now: datetime) -> int | None:
+    parsed = parse_date_safe(value)
+    if parsed is None:
+        return None
+    delta = start_of_week(now.date()) - start_of_week(parsed)
+    return max(0, round(delta.days / 7))
+
+
+def iso_timestamp(now: datetime) -> str:
+    utc = now.astimezone(timezone.utc)
+    return utc.strftime("%Y-%m-%dT%H:%M:%S.") + f"{utc.microsecond // 1000:03d}Z"
+
+
+def dumps(data: Any) -> str:
+    return json.dumps(data, indent=2, ensure_ascii=False)
+
+
+def encode_list_item(record: Any) -> str:
+    return "\n".join("  " + line for line in dumps(record).split("\n"))
+
+
+def join_list(chunks: list[str]) -> str:
+    if not chunks:
+        return "[]"
+    return "[\n" + ",\n".join(chunks) + "\n]"
+
+
+@timed
+def build_service_record(file_name: str, fm: dict[str, Any], body: str) -> dict[str, Any]:
+    songs: list[dict[str, Any]] = []
+    raw_songs = fm.get("songs")
+    if isinstance(raw_songs, list):
+        for item in raw_songs:
+            if not isinstance(item, dict):
+                continue
+            slug = item.get("slug") if is_string(item.get("slug")) else ""
+            if not slug:
+                continue
+            songs.append(
+                {
+                    "slug": slug,
+                    "usage": string_list(item.get("usage")),
+                    "key": string_or_none(item.get("key")),
+                    "notes": string_or_none(item.get("notes")),
+                }
+            )
+    return {
+        "date": fm["date"] if is_string(fm.get("date")) else file_name[:-3],
+        "series_slug": string_or_none(fm.get("series_slug")),
+        "sermon_title": string_or_none(fm.get("sermon_title")),
+        "sermon_text": string_or_none(fm.get("sermon_text")),
+        "preacher": string_or_none(fm.get("preacher")),
+        "songs": songs,
+        "notes_markdown": body.strip() or None,
+    }
+
+
+@timed
+def build_song_base(file_name: str, fm: dict[str, Any], body: str) -> dict[str, Any]:
+    """Song fields that depend only on the song file itself."""
+    slug = fm["slug"] if is_string(fm.get("slug")) else file_name[:-3]
+    lyric_warnings = detect_lyric_like_content(body)
+    if lyric_warnings:
+        sections: dict[str, str | None] = {"notes_markdown": None, "pastoral_use_markdown": None}
+    else:
+        sections = extract_sections(body)
+    writers = string_list(fm.get("writers"))
+    original_artist = string_or_none(fm.get("original_artist"))
+    lyrics_source = fm.get("lyrics_source")
+
+    return {
+        "title": fm["title"] if is_string(fm.get("title")) else slug,
+        "slug": slug,
+        "aka": string_list(fm.get("aka")),
+        "ccli_number": string_or_none(fm.get("ccli_number")),
+        "songselect_url": string_or_none(fm.get("songselect_url")),
+        "lyrics_source": lyrics_source if lyrics_source in ("SongSelect", "Other") else "Unknown",
+        "lyrics_hint": string_or_none(fm.get("lyrics_hint")),
+        "original_artist": original_artist,
+        "writers": writers,
+        "publisher": string_or_none(fm.get("publisher")),
+        "year": fm.get("year") if is_number(fm.get("year")) else None,
+        "tempo_bpm": fm.get("tempo_bpm") if is_number(fm.get("tempo_bpm")) else None,
+        "key": string_or_none(fm.get("key")),
+        "time_signature": string_or_none(fm.get("time_signature")),
+        "congregational_fit": fm.get("congregational_fit") if is_number(fm.get("congregational_fit")) else None,
+        "vocal_range": string_or_none(fm.get("vocal_range")),
+        "dominant_themes": string_list(fm.get("dominant_themes")),
+        "doctrinal_categories": string_list(fm.get("doctrinal_categories")),
+        "emotional_tone": string_list(fm.get("emotional_tone")),
+        "scriptural_anchors": string_list(fm.get("scriptural_anchors")),
+        "theological_summary": fm.get("theological_summary") if is_string(fm.get("theological_summary")) else "",
+        "arrangement_notes": string_or_none(fm.get("arrangement_notes")),
+        "slides_path": string_or_none(fm.get("slides_path")),
+        "tags": string_list(fm.get("tags")),
+        "last_sung_override": string_or_none(fm.get("last_sung_override")),
+        "status": "archive" if fm.get("status") == "archive" else "active",
+        "licensing_notes": string_or_none(fm.get("licensing_notes")),
+        "language": string_or_none(fm.get("language")),
+        "meter": string_or_none(fm.get("meter")),
+        "notes_markdown": sections["notes_markdown"],
+        "pastoral_use_markdown": sections["pastoral_use_markdown"],
+        "lyric_warning_reasons": lyric_warnings,
+    }
+
+
+def build_series_record(file_name: str, fm: dict[str, Any], body: str) -> dict[str, Any]:
+    stem = file_name[:-3]
+    raw_range = fm.get("date_range")
+    if isinstance(raw_range, list) and len(raw_range) == 2:
+        date_range = [string_or_none(raw_range[0]), string_or_none(raw_range[1])]
+    else:
+        date_range = [None, None]
+    return {
+        "title": fm["title"] if is_string(fm.get("title")) else stem,
+        "slug": fm["slug"] if is_string(fm.get("slug")) else stem,
+        "date_range": date_range,
+        "description": string_or_none(fm.get("description")),
+        "recommended": string_list(fm.get("recommended")),
+        "notes_markdown": body.strip() or None,
+    }
+
+
+def read_markdown(path: Path) -> tuple[dict[str, Any], str]:
+    return parse_frontmatter(path.read_text(encoding="utf-8"))
+
+
+class Library:
+    """Parsed songs/services/series for one library root, updatable file by file."""
+
+    def __init__(self, root: Path = ROOT) -> None:
+        self.root = root
+        self.songs_dir = root / "songs"
+        self.services_dir = root / "services"
+        self.series_dir = root / "series"
+
+        self.song_bases: dict[str, dict[str, Any]] = {}
+        self.song_files_by_slug: dict[str, set[str]] = {}
+        # The file that stands for a slug in lookups by slug.
+        self.song_file_by_slug: dict[str, str] = {}
+        self.services: dict[str, dict[str, Any]] = {}
+        self.service_files_by_slug: dict[str, set[str]] = {}
+        self.series: dict[str, dict[str, Any]] = {}
+
+        self.song_records: dict[str, dict[str, Any]] = {}
+        self.song_chunks: dict[str, str] = {}
+        self.service_chunks: dict[str, str] = {}
+        self.series_chunks: dict[str, str] = {}
+
+        self.writer_count: Counter[str] = Counter()
+        self.artist_count: Counter[str] = Counter()
+        self.contributions: dict[str, tuple[tuple[str, ...], str | None, int]] = {}
+
+    # -- loading -----------------------------------------------------------
+
+    def load(self) -> None:
+        for path in list_markdown_files(self.services_dir):
+            self._upsert_service(path.name, *read_markdown(path))
+        for path in list_markdown_files(self.songs_dir):
+            self._upsert_song(path.name, *read_markdown(path))
+        for path in list_markdown_files(self.series_dir):
+            self._upsert_series(path.name, *read_markdown(path))
+        self._refresh_songs(set(self.song_files_by_slug))
+
+    def kind_of(self, path: Path) -> str | None:
+        parent = path.parent.resolve()
+        if parent == self.songs_dir.resolve():
+            return "song"
+        if parent == self.services_dir.resolve():
+            return "service"
+        if parent == self.series_dir.resolve():
+            return "series"
+        return None
+
+    def apply_changes(self, paths: Iterable[Path]) -> set[str]:
+        """Re-read the given files (missing means deleted) and return the outputs they dirty."""
+        dirty_outputs: set[str] = set()
+        dirty_slugs: set[str] = set()
+        for path in paths:
+            kind = self.kind_of(path)
+            if kind is None or path.name.startswith("_") or path.suffix != ".md":
+                continue
+            parsed = read_markdown(path) if path.is_file() else None
+            if kind == "song":
+                dirty_slugs |= self._upsert_song(path.name, *parsed) if parsed else self._remove_song(path.name)
+                dirty_outputs |= {"songs.json", "derived.json"}
+            elif kind == "service":
+                dirty_slugs |= self._upsert_service(path.name, *parsed) if parsed else self._remove_service(path.name)
+                dirty_outputs |= {"services.json", "songs.json", "derived.json"}
+            else:
+                changed = self._upsert_series(path.name, *parsed) if parsed else self._remove_series(path.name)
+                if changed:
+                    dirty_outputs.add("series.json")
+        self._refresh_songs(dirty_slugs)
+        return dirty_outputs
+
+    # -- per-file updates --------------------------------------------------
+
+    def _upsert_song(self, file_name: str, fm: dict[str, Any], body: str) -> set[str]:
+        dirty = self._remove_song(file_name)
+        base = build_song_base(file_name, fm, body)
+        self.song_bases[file_name] = base
+        self.song_files_by_slug.setdefault(base["slug"], set()).add(file_name)
+        dirty.add(base["slug"])
+        return dirty
+
+    def _remove_song(self, file_name: str) -> set[str]:
+        old = self.song_bases.pop(file_name, None)
+        if old is None:
+            return set()
+        slug = old["slug"]
+        files = self.song_files_by_slug[slug]
+        files.discard(file_name)
+        if not files:
+            del self.song_files_by_slug[slug]
+        self.song_records.pop(file_name, None)
+        self.song_chunks.pop(file_name, None)
+        return {slug}
+
+    def _upsert_service(self, file_name: str, fm: dict[str, Any], body: str) -> set[str]:
+        dirty = self._remove_service(file_name)
+        record = build_service_record(file_name, fm, body)
+        self.services[file_name] = record
+        self.service_chunks[file_name] = encode_list_item(record)
+        for item in record["songs"]:
+            self.service_files_by_slug.setdefault(item["slug"], set()).add(file_name)
+            dirty.add(item["slug"])
+        return dirty
+
+    def _remove_service(self, file_name: str) -> set[str]:
+        old = self.services.pop(file_name, None)
+        self.service_chunks.pop(file_name, None)
+        if old is None:
+            return set()
+        dirty: set[str] = set()
+        for item in old["songs"]:
+            files = self.service_files_by_slug.get(item["slug"])
+            if files is not None:
+                files.discard(file_name)
+                if not files:
+                    del self.service_files_by_slug[item["slug"]]
+            dirty.add(item["slug"])
+        return dirty
+
+    def _upsert_series(self, file_name: str, fm: dict[str, Any], body: str) -> bool:
+        record = build_series_record(file_name, fm, body)
+        if self.series.get(file_name) == record:
+            return False
+        self.series[file_name] = record
+        self.series_chunks[file_name] = encode_list_item(record)
+        return True
+
+    def _remove_series(self, file_name: str) -> bool:
+        self.series_chunks.pop(file_name, None)
+        return self.series.pop(file_name, None) is not None
+
+    # -- song derivation ---------------------------------------------------
+
+    def history_for(self, slug: str) -> list[dict[str, Any]]:
+        entries: list[dict[str, Any]] = []
+        for file_name in sorted(self.service_files_by_slug.get(slug, ())):
+            service = self.services[file_name]
+            for item in service["songs"]:
+                if item["slug"] == slug:
+                    entries.append(
+                        {
+                            "date": service["date"],
+                            "series_slug": service["series_slug"],
+                            "usage": item["usage"],
+                            "key": item["key"],
+                        }
+                    )
+        entries.sort(key=lambda entry: entry["date"], reverse=True)
+        return entries
+
+    @timed
+    def _refresh_songs(self, slugs: set[str]) -> None:
+        for slug in slugs:
+            files = self.song_files_by_slug.get(slug)
+            self._retract_contribution(slug)
+            if not files:
+                self.song_file_by_slug.pop(slug, None)
+                continue
+            history = self.history_for(slug)
+            last_from_history = history[0]["date"] if history else None
+            for file_name in files:
+                base = self.song_bases[file_name]
+                override = base["last_sung_override"]
+                record = dict(base)
+                record.update(
+                    {
+                        "times_sung": len(history),
+                        "last_sung_computed": override if override is not None else last_from_history,
+                        "history": history[:HISTORY_LIMIT],
+                        "writers_normalized": [normalize_name(w) for w in base["writers"]],
+                        "original_artist_normalized": normalize_name(base["original_artist"]) if base["original_artist"] else None,
+                    }
+                )
+                self.song_records[file_name] = record
+                self.song_chunks[file_name] = encode_list_item(record)
+            file_name = max(files, key=self.song_order)
+            self.song_file_by_slug[slug] = file_name
+            base = self.song_bases[file_name]
+            self._add_contribution(slug, tuple(base["writers"]), base["original_artist"], len(history))
+
+    def song_order(self, file_name: str) -> tuple[tuple[str, str], str]:
+        """songs.json order: by title, then by file name (the order build-index.ts reads files in)."""
+        return collation_key(self.song_records[file_name]["title"]), file_name
+
+    def song_record(self, slug: str) -> dict[str, Any] | None:
+        file_name = self.song_file_by_slug.get(slug)
+        return self.song_records[file_name] if file_name is not None else None
+
+    def _retract_contribution(self, slug: str) -> None:
+        previous = self.contributions.pop(slug, None)
+        if previous is None:
+            return
+        writers, artist, count = previous
+        for writer in writers:
+            self.writer_count[writer] -= count
+            if self.writer_count[writer] <= 0:
+                del self.writer_count[writer]
+        if artist:
+            self.artist_count[artist] -= count
+            if self.artist_count[artist] <= 0:
+                del self.artist_count[artist]
+
+    def _add_contribution(self, slug: str, writers: tuple[str, ...], artist: str | None, count: int) -> None:
+        self.contributions[slug] = (writers, artist, count)
+        if count == 0:
+            return
+        for writer in writers:
+            self.writer_count[writer] += count
+        if artist:
+            self.artist_count[artist] += count
+
+    # -- outputs -----------------------------------------------------------
+
+    def song_names(self) -> list[str]:
+        return sorted(self.song_records, key=self.song_order)
+
+    def sorted_songs(self) -> list[dict[str, Any]]:
+        return [self.song_records[name] for name in self.song_names()]
+
+    def service_names(self) -> list[str]:
+        names = sorted(self.services)
+        names.sort(key=lambda name: self.services[name]["date"], reverse=True)
+        return names
+
+    def sorted_services(self) -> list[dict[str, Any]]:
+        return [self.services[name] for name in self.service_names()]
+
+    def sorted_series(self) -> list[dict[str, Any]]:
+        names = sorted(self.series, key=lambda name: (collation_key(self.series[name]["title"]), name))
+        return [self.series[name] for name in names]
+
+    def render_songs(self) -> str:
+        return join_list([self.song_chunks[name] for name in self.song_names()])
+
+    def render_services(self) -> str:
+        return join_list([self.service_chunks[name] for name in self.service_names()])
+
+    def render_series(self) -> str:
+        names = sorted(self.series, key=lambda name: (collation_key(self.series[name]["title"]), name))
+        return join_list([self.series_chunks[name] for name in names])
+
+    @timed
+    def derived(self, now: datetime | None = None) -> dict[str, Any]:
+        now = now or datetime.now().astimezone()
+        songs = self.sorted_songs()
+        services = self.sorted_services()
+        active = [song for song in songs if song["status"] == "active"]
+
+        rotation_health: dict[str, list[dict[str, Any]]] = {}
+        for threshold in ROTATION_THRESHOLDS:
+            bucket = []
+            for song in active:
+                weeks = weeks_since(song["last_sung_computed"], now)
+                if weeks is None or weeks >= threshold:
+                    bucket.append({"slug": song["slug"], "title": song["title"], "weeks_since_last_sung": weeks})
+            bucket.sort(key=lambda item: float("inf") if item["weeks_since_last_sung"] is None else item["weeks_since_last_sung"], reverse=True)
+            rotation_health[f"not_sung_{threshold}_weeks"] = bucket
+
+        top_songs = [
+            {"slug": song["slug"], "title": song["title"], "count": song["times_sung"]}
+            for song in sorted(songs, key=lambda song: (-song["times_sung"], collation_key(song["title"])))
+        ]
+
+        cutoff = now.replace(tzinfo=None) - timedelta(weeks=RECENT_WEEKS)
+        theme_coverage: Counter[str] = Counter()
+        doctrinal_coverage: Counter[str] = Counter()
+        for service in services:
+            parsed = parse_date_safe(service["date"])
+            if parsed is None or datetime.combine(parsed, datetime.min.time()) < cutoff:
+                continue
+            for item in service["songs"]:
+                song = self.song_record(item["slug"])
+                if song is None:
+                    continue
+                theme_coverage.update(song["dominant_themes"])
+                doctrinal_coverage.update(song["doctrinal_categories"])
+
+        all_themes = {theme for song in active for theme in song["dominant_themes"]}
+        theme_gaps = sorted((theme for theme in all_themes if theme not in theme_coverage), key=collation_key)
+
+        total_usage = sum(song["times_sung"] for song in songs)
+        top_10_usage = sum(item["count"] for item in top_songs[:10])
+
+        return {
+            "generated_at": iso_timestamp(now),
+            "rotation_health": rotation_health,
+            "top_songs": top_songs,
+            "top_writers": sorted_pairs(self.writer_count, "writer"),
+            "top_original_artists": sorted_pairs(self.artist_count, "original_artist"),
+            "theme_coverage_last_12_weeks": sorted_pairs(theme_coverage, "theme"),
+            "doctrinal_coverage_last_12_weeks": sorted_pairs(doctrinal_coverage, "doctrine"),
+            "theme_gaps_last_12_weeks": theme_gaps,
+            "over_reliance": {
+                "top_10_usage_count": top_10_usage,
+                "total_usage_count": total_usage,
+                "top_10_share": top_10_usage / total_usage if total_usage > 0 else 0,
+            },
+            "recently_sung_services": [
+                {
+                    "date": service["date"],
+                    "series_slug": service["series_slug"],
+                    "song_slugs": [item["slug"] for item in service["songs"]],
+                }
+                for service in services[:5]
+            ],
+        }
+
+    def render(self, name: str, now: datetime | None = None) -> str:
+        if name == "songs.json":
+            return self.render_songs()
+        if name == "services.json":
+            return self.render_services()
+        if name == "series.json":
+            return self.render_series()
+        if name == "derived.json":
+            return dumps(self.derived(now))
+        raise KeyError(name)
+
+
+def sorted_pairs(counts: Counter[str], label: str) -> list[dict[str, Any]]:
+    ordered = sorted(counts.items(), key=lambda pair: (-pair[1], collation_key(pair[0])))
+    return [{label: name, "count": count} for name, count in ordered]
+
+
+def load_library(root: Path = ROOT) -> Library:
+    library = Library(root)
+    library.load()
+    return library
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Resolve writer and original-artist name variants to one canonical name.
+
+"Stuart Townend", "Townend, Stuart" and "S. Townend" are the same writer,
+but build-index.ts only lower-cases names, so analytics count them apart.
+This module clusters the names found in songs/*.md:
+
+1. Each name is parsed into tokens ("Surname, Given" is reordered, accents,
+   punctuation and Jr./Sr./III suffixes are dropped).
+2. Names are blocked by surname and first given name, by surname and
+   first initial (for "S. Townend"), and by first given name and surname
+   prefix (for surname typos). Only names that share a block are compared,
+   which keeps the work near-linear in the number of names.
+3. Within a block, a name joins a cluster when its middle names agree
+   with every member's up to initials or are missing on one side, and no
+   other cluster fits it as well; in the typo block, names merge when the
+   whole name is a near-exact string match. A name whose given name is
+   only an initial merges only if exactly one cluster fits it, so
+   "S. Townend" cannot glue two different Townends together.
+4. Merges go through a union-find, and each cluster keeps its most used
+   spelling as the canonical name (ties go to the spelling the other
+   members agree with, then the shorter one).
+
+The map is saved to imports/name-map.json as {canonical: [variants]} for
+writers and artists. On the next run the saved clusters seed the
+union-find and are fixed: new names may join a saved cluster, but two
+saved clusters are never merged. Hand edits (moving a variant, renaming a
+canonical) are therefore kept, and a wrong merge is split by giving each
+part its own entry; an entry with no variants (`"Chris Tomllin": []`) is
+kept in the file for that purpose. Enrichment uses `load_resolver` to write canonical
+spellings, and `hymnops analyze` uses it to merge writer and artist counts.
+
+Usage:
+    python -m hymnops names [--root .] [--output imports/name-map.json] [--rebuild] [--show]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+import unicodedata
+from collections import Counter
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Iterable
+
+from hymnops.files import ROOT, atomic_write_text, list_markdown_files
+from hymnops.profiling import run, timed
+from hymnops.records import load_songs
+
+
+VERSION = 1
+OUTPUT = Path("imports/name-map.json")
+KINDS = ("writers", "artists")
+SUFFIXES = frozenset({"jr", "sr", "ii", "iii", "iv"})
+TYPO_RATIO = 0.92
+LOOSE_PREFIX = 3
+NON_WORD_RE = re.compile(r"[^a-z0-9\s]+")
+
+
+def name_tokens(name: str) -> tuple[str, ...]:
+    """Lower-case, accent-free tokens in "given ... surname" order."""
+    if name.count(",") == 1:
+        surname, given = name.split(",")
+        if given.strip().lower().strip(".") not in SUFFIXES:
+            name = f"{given} {surname}"
+    folded = unicodedata.normalize("NFKD", name).casefold()
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    folded = NON_WORD_RE.sub(" ", folded.replace(".", ". "))
+    tokens = [token for token in folded.split() if token not in SUFFIXES]
+    return tuple(tokens)
+
+
+def name_key(name: str) -> str:
+    return " ".join(name_tokens(name))
+
+
+def given_compatible(left: tuple[str, ...], right: tuple[str, ...]) -> bool:
+    """True when two given-name lists can describe the same person.
+
+    The first given names must be equal; middle names may be missing on
+    either side, and present ones must agree up to initials.
+    """
+    if not left or not right:
+        return not left and not right
+    if left[0] != right[0]:
+        return False
+    for a, b in zip(left[1:], right[1:]):
+        if a != b and not (len(a) == 1 and b.startswith(a)) and not (len(b) == 1 and a.startswith(b)):
+            return False
+    return True
+
+
+def initial_compatible(initials: tuple[str, ...], full: tuple[str, ...]) -> bool:
+    """True when `initials` (single letters, e.g. ("s",)) abbreviate the given names in `full`."""
+    if not full or len(initials) > len(full):
+        return False
+    return all(full[i].startswith(initial) for i, initial in enumerate(initials))
+
+
+class UnionFind:
+    def __init__(self, size: int) -> None:
+        self.parent = list(range(size))
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, left: int, right: int) -> None:
+        left, right = self.find(left), self.find(right)
+        if left != right:
+            self.parent[max(left, right)] = min(left, right)
+
+
+@timed
+def cluster_names(counts: Counter[str], seed: dict[str, list[str]] | None = None) -> dict[str, list[str]]:
+    """Group name spellings into {canonical: [other variants]}.
+
+    `counts` maps each spelling to how often it is used; `seed` is a
+    previously saved map whose clusters are kept as they are.
+    """
+    names = sorted(set(counts) | {n for canonical, variants in (seed or {}).items() for n in (canonical, *variants)})
+    index = {name: i for i, name in enumerate(names)}
+    uf = UnionFind(len(names))
+    # Saved clusters are fixed: names in two different saved clusters are never merged.
+    owner: list[int | None] = [None] * len(names)
+    for n, (canonical, variants) in enumerate((seed or {}).items()):
+        for name in (canonical, *variants):
+            owner[index[name]] = n
+
+    def join(left: int, right: int) -> bool:
+        a, b = uf.find(left), uf.find(right)
+        if a == b:
+            return True
+        if owner[a] is not None and owner[b] is not None and owner[a] != owner[b]:
+            return False
+        uf.union(a, b)
+        root = uf.find(a)
+        owner[root] = owner[a] if owner[a] is not None else owner[b]
+        return True
+
+    for canonical, variants in (seed or {}).items():
+        for variant in variants:
+            join(index[canonical], index[variant])
+
+    # Identical keys ("Townend, Stuart" vs "stuart townend") merge outright.
+    by_key: dict[tuple[str, ...], int] = {}
+    parsed: list[tuple[str, ...]] = []
+    for i, name in enumerate(names):
+        tokens = name_tokens(name)
+        parsed.append(tokens)
+        if tokens:
+            first = by_key.setdefault(tokens, i)
+            join(first, i)
+
+    blocks: dict[tuple[str, str], list[int]] = {}
+    by_initial: dict[tuple[str, str], list[int]] = {}
+    abbreviated: list[int] = []
+    loose: dict[str, list[int]] = {}
+    for tokens, i in by_key.items():
+        if len(tokens) < 2:
+            continue
+        if len(tokens[0]) == 1:
+            abbreviated.append(i)
+            continue
+        blocks.setdefault((tokens[-1], tokens[0]), []).append(i)
+        by_initial.setdefault((tokens[-1], tokens[0][0]), []).append(i)
+        loose.setdefault(f"{tokens[0]} {tokens[-1][:LOOSE_PREFIX]}", []).append(i)
+
+    # Most specific spellings first. A name joins a cluster only when it is
+    # compatible with every member, and only when exactly one cluster fits,
+    # so a bare "John Smith" cannot glue "John Paul" and "John Peter" together.
+    for members in blocks.values():
+        members.sort(key=lambda i: (-len(parsed[i]), names[i]))
+        placed: list[int] = []
+        for i in members:
+            groups: dict[int, list[int]] = {}
+            for j in placed:
+                groups.setdefault(uf.find(j), []).append(j)
+            if uf.find(i) not in groups:
+                fits = [
+                    root
+                    for root, group in groups.items()
+                    if all(given_compatible(parsed[i][:-1], parsed[j][:-1]) for j in group)
+                ]
+                if len(fits) == 1:
+                    join(i, fits[0])
+            placed.append(i)
+
+    for members in loose.values():
+        keys = [" ".join(parsed[i]) for i in members]
+        for n, i in enumerate(members):
+            for m in range(n + 1, len(members)):
+                j = members[m]
+                if parsed[i][-1] != parsed[j][-1] and SequenceMatcher(None, keys[n], keys[m]).ratio() >= TYPO_RATIO:
+                    join(i, j)
+
+    # Initials last, once the full-name clusters they could join are known.
+    for i in abbreviated:
+        tokens = parsed[i]
+        candidates = by_initial.get((tokens[-1], tokens[0]), [])
+        roots = {uf.find(j) for j in candidates if initial_compatible(tokens[:-1], parsed[j][:-1])}
+        if len(roots) == 1:
+            join(i, roots.pop())
+
+    clusters: dict[int, list[str]] = {}
+    for name in names:
+        clusters.setdefault(uf.find(index[name]), []).append(name)
+
+    seeded = set(seed or {})
+    result: dict[str, list[str]] = {}
+    for members in clusters.values():
+        canonical = pick_canonical(members, counts, seeded)
+        result[canonical] = sorted(name for name in members if name != canonical)
+    return result
+
+
+def pick_canonical(members: list[str], counts: Counter[str], seeded: set[str]) -> str:
+    """A saved canonical wins; otherwise the most used, most complete "Given Surname" spelling.
+
+    Ties go to the spelling the other members agree with (same key, then
+    same surname), then to the shorter name, so a one-letter typo such as
+    "Chris Tomllin" does not win over "Chris Tomlin".
+    """
+    for name in members:
+        if name in seeded:
+            return name
+    parsed = {name: name_tokens(name) for name in members}
+    keys = Counter(parsed.values())
+    surnames = Counter(tokens[-1] for tokens in parsed.values() if tokens)
+    return min(
+        members,
+        key=lambda name: (
+            "," in name,
+            -counts.get(name, 0),
+            -sum(len(token) > 1 for token in parsed[name]),
+            -keys[parsed[name]],
+            -surnames[parsed[name][-1]] if parsed[name] else 0,
+            len(name),
+            name,
+        ),
+    )
+
+
+class NameResolver:
+    """Map any known spelling (or a case/punctuation variant of one) to its canonical name."""
+
+    def __init__(self, clusters: dict[str, list[str]] | None = None) -> None:
+        self.canonical: dict[str, str] = {}
+        self.by_key: dict[str, str] = {}
+        for canonical, variants in (clusters or {}).items():
+            for name in (canonical, *variants):
+                self.canonical[name] = canonical
+                self.by_key.setdefault(name_key(name), canonical)
+
+    def resolve(self, name: str) -> str:
+        found = self.canonical.get(name)
+        if found is None:
+            found = self.by_key.get(name_key(name), name)
+        return found
+
+    def __len__(self) -> int:
+        return len(self.canonical)
+
+
+def load_map(path: Path) -> dict[str, dict[str, list[str]]]:
+    if not path.is_file():
+        return {kind: {} for kind in KINDS}
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return {kind: data.get(kind) or {} for kind in KINDS}
+
+
+def load_resolver(root: Path, kind: str = "writers") -> NameResolver:
+    """Resolver for `kind` ("writers" or "artists") from <root>/imports/name-map.json; empty if absent."""
+    return NameResolver(load_map(root / OUTPUT)[kind])
+
+
+def resolve_counts(rows: Iterable[dict[str, object]], label: str, resolver: NameResolver) -> list[dict[str, object]]:
+    """Merge `[{label: name, "count": n}]` rows by canonical name, largest first."""
+    merged: Counter[str] = Counter()
+    for row in rows:
+        merged[resolver.resolve(str(row[label]))] += int(row["count"])  # type: ignore[call-overload]
+    return [{label: name, "count": count} for name, count in sorted(merged.items(), key=lambda item: (-item[1], item[0]))]
+
+
+@timed
+def collect_names(root: Path) -> dict[str, Counter[str]]:
+    found: dict[str, Counter[str]] = {kind: Counter() for kind in KINDS}
+    for song in load_songs(list_markdown_files(root / "songs")):
+        if isinstance(song.writers, tuple):
+            found["writers"].update(w.strip() for w in song.writers if isinstance(w, str) and w.strip())
+        if isinstance(song.original_artist, str) and song.original_artist.strip():
+            found["artists"][song.original_artist.strip()] += 1
+    return found
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Cluster writer/artist spellings into a canonical-name map.")
+    parser.add_argument("--root", type=Path, default=ROOT, help="library root containing songs/ and imports/")
+    parser.add_argument("--output", type=Path, default=OUTPUT, help="relative to --root")
+    parser.add_argument("--rebuild", action="store_true", help="ignore the saved map instead of seeding from it")
+    parser.add_argument("--show", action="store_true", help="print every cluster with more than one spelling")
+    args = parser.parse_args(argv)
+
+    root = args.root.resolve()
+    output = args.output if args.output.is_absolute() else root / args.output
+    saved = {kind: {} for kind in KINDS} if args.rebuild else load_map(output)
+    found = collect_names(root)
+
+    result: dict[str, object] = {"version": VERSION}
+    for kind in KINDS:
+        clusters = cluster_names(found[kind], saved[kind])
+        # Saved entries are kept even without variants: that is how a hand split is recorded.
+        kept = {canonical: variants for canonical, variants in sorted(clusters.items()) if variants or canonical in saved[kind]}
+        merged = {canonical: variants for canonical, variants in kept.items() if variants}
+        result[kind] = kept
+        print(f"{kind}_names={len(found[kind])}")
+        print(f"{kind}_clusters={len(clusters)}")
+        print(f"{kind}_merged={len(merged)}")
+        if args.show:
+            for canonical, variants in merged.items():
+                print(f"  {canonical} <- {' | '.join(variants)}")
+
+    atomic_write_text(output, json.dumps(result, indent=2, ensure_ascii=False) + "\n")
+    print(f"output={output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(main))
@@ -0,0 +1,208 @@
+"""
+Profiling switches and lightweight timers shared by the Python scripts.
+
+Entry points call `run(main)` instead of `main()`. That strips two options
+from the command line before the script sees it:
+
+- `--profile[=BASE]`: run under cProfile and write BASE.pstats plus
+  BASE.collapsed (sampled stacks in the folded format read by
+  flamegraph.pl and speedscope). BASE defaults to
+  `profile-<script>-<timestamp>` in the current directory.
+- `--trace-memory[=PATH]`: run under tracemalloc, print peak usage and
+  the top allocation sites, and optionally dump the snapshot to PATH for
+  later `tracemalloc.Snapshot.load`.
+
+Independently, functions decorated with `@timed` always count calls and
+accumulate wall time (two perf_counter_ns calls per call); `run` prints a
+summary table of them on stderr when the script exits.
+
+cProfile, pstats, tracemalloc and threading are only imported when one of
+the switches is given, so plain runs do not pay for them at startup.
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, TypeVar
+
+if TYPE_CHECKING:
+    import cProfile
+    import tracemalloc
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+SAMPLE_INTERVAL_SECONDS = 0.001
+TRACEMALLOC_FRAMES = 25
+TOP_ALLOCATIONS = 15
+TOP_FUNCTIONS = 20
+
+TIMERS: dict[str, list[int]] = {}
+_RUN_NAME: str | None = None
+
+
+def timed(fn: F) -> F:
+    """Accumulate call count and total nanoseconds for `fn` in TIMERS."""
+    slot = TIMERS.setdefault(fn.__qualname__, [0, 0])
+    clock = time.perf_counter_ns
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        started = clock()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            slot[0] += 1
+            slot[1] += clock() - started
+
+    return wrapper  # type: ignore[return-value]
+
+
+def reset_timers() -> None:
+    for slot in TIMERS.values():
+        slot[0] = 0
+        slot[1] = 0
+
+
+def format_timers() -> str:
+    rows = sorted(((name, calls, total) for name, (calls, total) in TIMERS.items() if calls), key=lambda r: -r[2])
+    if not rows:
+        return ""
+    width = max(len("function"), *(len(name) for name, _, _ in rows))
+    lines = [f"{'function':<{width}}  {'calls':>9}  {'total ms':>10}  {'mean us':>9}"]
+    for name, calls, total in rows:
+        lines.append(f"{name:<{width}}  {calls:>9}  {total / 1e6:>10.1f}  {total / calls / 1e3:>9.1f}")
+    return "\n".join(lines)
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a timer and folds identical stacks."""
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL_SECONDS) -> None:
+        import threading
+
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="hymnops-sampler", daemon=True)
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names: list[str] = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path: Path) -> None:
+        with path.open("w", encoding="utf-8") as handle:
+            for stack, count in sorted(self.stacks.items()):
+                handle.write(f"{stack} {count}\n")
+
+
+def pop_option(argv: list[str], name: str) -> tuple[bool, str | None, list[str]]:
+    """Remove `--name` / `--name=value` from argv; return (present, value, remaining)."""
+    present = False
+    value: str | None = None
+    rest: list[str] = []
+    for arg in argv:
+        if arg == name:
+            present = True
+        elif arg.startswith(name + "="):
+            present = True
+            value = arg.split("=", 1)[1] or None
+        else:
+            rest.append(arg)
+    return present, value, rest
+
+
+def script_name() -> str:
+    if _RUN_NAME:
+        return _RUN_NAME
+    main_module = sys.modules.get("__main__")
+    spec = getattr(main_module, "__spec__", None)
+    if spec is not None and spec.name:
+        return spec.name.rsplit(".", 1)[-1]
+    return Path(sys.argv[0]).stem or "python"
+
+
+def report_memory(snapshot: tracemalloc.Snapshot, peak: int, dump_path: str | None) -> None:
+    print(f"memory_peak_kb={peak / 1024:.1f}", file=sys.stderr)
+    for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+        print(f"  {stat}", file=sys.stderr)
+    if dump_path:
+        snapshot.dump(dump_path)
+        print(f"memory_snapshot={dump_path}", file=sys.stderr)
+
+
+def run(main: Callable[[], int | None], name: str | None = None) -> int:
+    """Call `main()` honouring --profile / --trace-memory, then print the timer summary.
+
+    `name` overrides the script name used for the default profile file name.
+    """
+    global _RUN_NAME
+    _RUN_NAME = name
+    profile, profile_base, rest = pop_option(sys.argv[1:], "--profile")
+    trace, trace_path, rest = pop_option(rest, "--trace-memory")
+    sys.argv = [sys.argv[0], *rest]
+
+    profiler: cProfile.Profile | None = None
+    sampler: StackSampler | None = None
+    if trace:
+        import tracemalloc
+
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    if profile:
+        import cProfile
+        import threading
+
+        sampler = StackSampler(threading.get_ident())
+        profiler = cProfile.Profile()
+        sampler.start()
+        profiler.enable()
+
+    try:
+        result = main()
+    finally:
+        if profiler is not None and sampler is not None:
+            profiler.disable()
+            sampler.stop()
+            base = Path(profile_base or f"profile-{script_name()}-{time.strftime('%Y%m%d-%H%M%S')}")
+            if base.parent != Path("."):
+                base.parent.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(os.fspath(base.with_name(base.name + ".pstats")))
+            sampler.write(base.with_name(base.name + ".collapsed"))
+            import io
+            import pstats
+
+            summary = io.StringIO()
+            pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+            print(summary.getvalue(), file=sys.stderr)
+            print(f"profile={base}.pstats", file=sys.stderr)
+            print(f"flamegraph_stacks={base}.collapsed", file=sys.stderr)
+        if trace:
+            snapshot = tracemalloc.take_snapshot()
+            _current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            report_memory(snapshot, peak, trace_path)
+        table = format_timers()
+        if table:
+            print(table, file=sys.stderr)
+
+    return int(result or 0)
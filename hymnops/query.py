@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Bitmap-indexed, in-memory query engine over the song library.
+
+Songs are numbered in songs.json order (title collation) and every index
+answers with a bitset, held as a Python int where bit i is song i, so
+filters combine with `&`, `|` and `~` at C speed:
+
+- facets (`status`, `key`, `time_signature`, `theme`, `doctrine`, `tone`,
+  `tag`, `writer`, `artist`, `source`): value -> sorted song ids. Values
+  shared by at least 1/DENSE_FRACTION of the library keep a materialized
+  bitset; rarer ones (most writers and tags) are turned into one on use,
+  which keeps memory linear in the library size.
+- ranges (`tempo`, `year`, `fit`, `times_sung`, `last_sung`): values
+  sorted with their song ids, plus the cumulative bitset every BLOCK
+  entries, so "everything below v" costs one bisect and at most BLOCK
+  bit sets.
+
+Filter DSL (terms are ANDed unless joined by `or`; `-term` / `not` negate;
+parentheses group; facet values are case-insensitive, comma means any-of):
+
+    status:active key:G,D tempo<80 theme:Lament weeks_since>=12
+    (theme:"Kingdom of God" or doctrine:eschatology) -tag:christmas
+    year:1990..2010 last_sung<2024-06-01 writer:"Keith Getty"
+
+`weeks_since` counts Sunday-based weeks from the last sung date like
+derived.json's rotation health; never-sung songs count as infinitely old.
+
+Usage:
+    python -m hymnops query [--root .] "status:active tempo<80" [--limit 20] [--facet theme]
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import re
+import sys
+from array import array
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Iterable
+
+from hymnops.files import ROOT
+from hymnops.library import Library, parse_date_safe, start_of_week
+from hymnops.profiling import run, timed
+
+
+BLOCK = 1024
+DENSE_FRACTION = 256
+
+FACET_FIELDS = {
+    "status": "status",
+    "key": "key",
+    "time_signature": "time_signature",
+    "theme": "dominant_themes",
+    "doctrine": "doctrinal_categories",
+    "tone": "emotional_tone",
+    "tag": "tags",
+    "writer": "writers",
+    "artist": "original_artist",
+    "source": "lyrics_source",
+}
+RANGE_FIELDS = {
+    "tempo": "tempo_bpm",
+    "year": "year",
+    "fit": "congregational_fit",
+    "times_sung": "times_sung",
+    "last_sung": "last_sung_computed",
+}
+DATE_FIELDS = {"last_sung"}
+
+TOKEN_RE = re.compile(
+    r"""\s*(?:
+        (?P<lparen>\()
+      | (?P<rparen>\))
+      | (?P<term>-?[A-Za-z_]+\s*(?:<=|>=|<|>|=|:)\s*(?:"(?:[^"\\]|\\.)*"|[^\s()"]+))
+      | (?P<word>[^\s()]+)
+    )""",
+    re.VERBOSE,
+)
+TERM_RE = re.compile(r"(?P<neg>-?)(?P<field>[A-Za-z_]+)\s*(?P<op><=|>=|<|>|=|:)\s*(?P<value>.+)", re.DOTALL)
+ESCAPE_RE = re.compile(r"\\(.)")
+
+# BYTE_BITS[b] lists the set bit positions of byte value b.
+BYTE_BITS = [tuple(i for i in range(8) if b >> i & 1) for b in range(256)]
+
+
+class QueryError(ValueError):
+    """The filter expression could not be parsed or names an unknown field."""
+
+
+def normalize_value(value: str) -> str:
+    return " ".join(value.lower().split())
+
+
+def bitmap_from_ids(ids: Iterable[int], size: int) -> int:
+    buf = bytearray((size + 7) >> 3)
+    for doc in ids:
+        buf[doc >> 3] |= 1 << (doc & 7)
+    return int.from_bytes(buf, "little")
+
+
+def ids_from_bitmap(mask: int, limit: int | None = None) -> list[int]:
+    ids: list[int] = []
+    raw = mask.to_bytes((mask.bit_length() + 7) >> 3, "little")
+    for offset, byte in enumerate(raw):
+        if byte:
+            base = offset << 3
+            ids.extend(base + bit for bit in BYTE_BITS[byte])
+            if limit is not None and len(ids) >= limit:
+                return ids[:limit]
+    return ids
+
+
+class Facet:
+    """value -> song ids, with bitsets materialized for common values."""
+
+    def __init__(self, postings: dict[str, list[int]], size: int) -> None:
+        self.size = size
+        self.ids = {value: array("I", ids) for value, ids in postings.items()}
+        threshold = max(1, size // DENSE_FRACTION)
+        self.dense = {value: bitmap_from_ids(ids, size) for value, ids in self.ids.items() if len(ids) >= threshold}
+
+    def bitmap(self, value: str) -> int:
+        dense = self.dense.get(value)
+        if dense is not None:
+            return dense
+        ids = self.ids.get(value)
+        return bitmap_from_ids(ids, self.size) if ids else 0
+
+    def counts(self, mask: int) -> list[tuple[str, int]]:
+        out = [(value, (mask & self.bitmap(value)).bit_count()) for value in self.ids]
+        return sorted(((value, count) for value, count in out if count), key=lambda pair: (-pair[1], pair[0]))
+
+
+class RangeIndex:
+    """Sorted (value, id) pairs with cumulative bitsets every BLOCK entries."""
+
+    def __init__(self, pairs: list[tuple[float, int]], size: int) -> None:
+        pairs.sort()
+        self.size = size
+        self.values = [value for value, _ in pairs]
+        self.ids = array("I", (doc for _, doc in pairs))
+        self.prefix = [0]
+        for start in range(0, len(self.ids), BLOCK):
+            self.prefix.append(self.prefix[-1] | bitmap_from_ids(self.ids[start : start + BLOCK], size))
+
+    def below(self, position: int) -> int:
+        """Bitset of the first `position` entries in value order."""
+        block, rest = divmod(position, BLOCK)
+        mask = self.prefix[block]
+        if rest:
+            mask |= bitmap_from_ids(self.ids[block * BLOCK : position], self.size)
+        return mask
+
+    def select(self, op: str, value: float, upper: float | None = None) -> int:
+        if upper is not None:
+            return self.below(bisect.bisect_right(self.values, upper)) & ~self.below(bisect.bisect_left(self.values, value))
+        if op == "<":
+            return self.below(bisect.bisect_left(self.values, value))
+        if op == "<=":
+            return self.below(bisect.bisect_right(self.values, value))
+        everything = self.below(len(self.values))
+        if op == ">":
+            return everything & ~self.below(bisect.bisect_right(self.values, value))
+        if op == ">=":
+            return everything & ~self.below(bisect.bisect_left(self.values, value))
+        lo, hi = bisect.bisect_left(self.values, value), bisect.bisect_right(self.values, value)
+        return self.below(hi) & ~self.below(lo)
+
+
+class QueryEngine:
+    """Answers filter-DSL queries over a fixed list of song records."""
+
+    def __init__(self, songs: list[dict[str, Any]], now: datetime | None = None) -> None:
+        self.now = now or datetime.now().astimezone()
+        self.slugs = [song["slug"] for song in songs]
+        self.size = len(songs)
+        self.all = (1 << self.size) - 1
+        self.facets, self.ranges = build_indexes(songs)
+
+    @classmethod
+    def from_library(cls, library: Library, now: datetime | None = None) -> QueryEngine:
+        return cls(library.sorted_songs(), now)
+
+    # -- evaluation --------------------------------------------------------
+
+    def facet(self, name: str) -> Facet:
+        if name not in self.facets:
+            raise QueryError(f"unknown facet {name!r}; expected one of {', '.join(FACET_FIELDS)}")
+        return self.facets[name]
+
+    def term(self, field: str, op: str, raw: str) -> int:
+        field = field.lower()
+        if raw.startswith('"') and raw.endswith('"') and len(raw) >= 2:
+            raw = ESCAPE_RE.sub(r"\1", raw[1:-1])
+        if field in FACET_FIELDS:
+            if op not in (":", "="):
+                raise QueryError(f"{field} only supports ':' matching")
+            facet = self.facet(field)
+            mask = 0
+            for value in raw.split(","):
+                mask |= facet.bitmap(normalize_value(value))
+            return mask
+        if field == "weeks_since":
+            return self.weeks_since(op, raw)
+        if field not in RANGE_FIELDS:
+            raise QueryError(f"unknown field {field!r}")
+        index = self.ranges[field]
+        parse = parse_date_value if field in DATE_FIELDS else parse_number
+        if op == ":" and ".." in raw:
+            low, high = raw.split("..", 1)
+            return index.select("=", parse(low), parse(high))
+        return index.select("=" if op == ":" else op, parse(raw))
+
+    def weeks_since(self, op: str, raw: str) -> int:
+        weeks = int(parse_number(raw))
+        this_week = start_of_week(self.now.date())
+        # Week counts are clamped at 0 (future dates), so a song is `weeks` old
+        # when its Sunday is exactly `weeks` before this one, or later for 0.
+        boundary = (this_week - timedelta(weeks=weeks)).toordinal()
+        index = self.ranges["last_sung"]
+        dated = index.below(len(index.values))
+        unsung = self.all & ~dated
+        if op == ">=":
+            return self.all if weeks <= 0 else index.select("<", boundary + 7) | unsung
+        if op == ">":
+            return self.all if weeks < 0 else index.select("<", boundary) | unsung
+        if op == "<=":
+            return 0 if weeks < 0 else index.select(">=", boundary)
+        if op == "<":
+            return 0 if weeks <= 0 else index.select(">=", boundary + 7)
+        if weeks < 0:
+            return 0
+        if weeks == 0:
+            return index.select(">=", boundary)
+        return index.select("=", boundary, boundary + 6)
+
+    @timed
+    def evaluate(self, text: str) -> int:
+        tokens = [m for m in TOKEN_RE.finditer(text) if m.group(0).strip()]
+        consumed = sum(len(m.group(0)) for m in tokens)
+        if consumed != len(text.rstrip()) and text.strip():
+            raise QueryError(f"cannot parse query: {text!r}")
+        parser = Parser([(m.lastgroup or "", m.group(m.lastgroup or 0).strip()) for m in tokens], self)
+        return parser.parse()
+
+    def query(self, text: str, limit: int | None = None) -> list[str]:
+        ids = ids_from_bitmap(self.evaluate(text), limit)
+        return [self.slugs[doc] for doc in ids]
+
+    def count(self, text: str) -> int:
+        return self.evaluate(text).bit_count()
+
+    def facet_counts(self, text: str, name: str) -> list[tuple[str, int]]:
+        """Value counts of facet `name` among songs matching `text` (for drill-down)."""
+        return self.facet(name).counts(self.evaluate(text))
+
+
+class Parser:
+    """Recursive descent: or_expr := and_expr ('or' and_expr)*; and_expr := unary+; unary := ('not'|'-')? atom."""
+
+    def __init__(self, tokens: list[tuple[str, str]], engine: QueryEngine) -> None:
+        self.tokens = tokens
+        self.pos = 0
+        self.engine = engine
+
+    def peek(self) -> tuple[str, str] | None:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def parse(self) -> int:
+        if not self.tokens:
+            return self.engine.all
+        mask = self.or_expr()
+        if self.peek() is not None:
+            raise QueryError(f"unexpected {self.peek()[1]!r}")  # type: ignore[index]
+        return mask
+
+    def or_expr(self) -> int:
+        mask = self.and_expr()
+        while self.peek() == ("word", "or") or self.peek() == ("word", "OR"):
+            self.pos += 1
+            mask |= self.and_expr()
+        return mask
+
+    def and_expr(self) -> int:
+        mask = self.unary()
+        while True:
+            token = self.peek()
+            if token is None or token[0] == "rparen" or token[1].lower() == "or":
+                return mask
+            if token[1].lower() == "and":
+                self.pos += 1
+                continue
+            mask &= self.unary()
+
+    def unary(self) -> int:
+        token = self.peek()
+        if token is None:
+            raise QueryError("unexpected end of query")
+        if token[1].lower() == "not" or token[1] == "-":
+            self.pos += 1
+            return self.engine.all & ~self.unary()
+        return self.atom()
+
+    def atom(self) -> int:
+        kind, text = self.tokens[self.pos]
+        self.pos += 1
+        if kind == "lparen":
+            mask = self.or_expr()
+            if self.peek() is None or self.peek()[0] != "rparen":  # type: ignore[index]
+                raise QueryError("missing ')'")
+            self.pos += 1
+            return mask
+        if kind != "term":
+            raise QueryError(f"expected field:value, got {text!r}")
+        m = TERM_RE.fullmatch(text)
+        if m is None:
+            raise QueryError(f"cannot parse term {text!r}")
+        mask = self.engine.term(m.group("field"), m.group("op"), m.group("value").strip())
+        return self.engine.all & ~mask if m.group("neg") else mask
+
+
+def parse_number(raw: str) -> float:
+    try:
+        return float(raw)
+    except ValueError as exc:
+        raise QueryError(f"expected a number, got {raw!r}") from exc
+
+
+def parse_date_value(raw: str) -> float:
+    parsed = parse_date_safe(raw)
+    if parsed is None:
+        raise QueryError(f"expected YYYY-MM-DD, got {raw!r}")
+    return parsed.toordinal()
+
+
+def facet_postings(songs: list[dict[str, Any]], field: str) -> dict[str, list[int]]:
+    postings: dict[str, list[int]] = {}
+    normalized: dict[str, str] = {}
+    for doc, song in enumerate(songs):
+        value = song.get(field)
+        if value is None:
+            continue
+        for raw in value if isinstance(value, list) else (value,):
+            if not isinstance(raw, str):
+                continue
+            key = normalized.get(raw)
+            if key is None:
+                key = normalized[raw] = normalize_value(raw)
+            if not key:
+                continue
+            ids = postings.get(key)
+            if ids is None:
+                postings[key] = [doc]
+            elif ids[-1] != doc:
+                ids.append(doc)
+    return postings
+
+
+def range_pairs(songs: list[dict[str, Any]], field: str) -> list[tuple[float, int]]:
+    pairs: list[tuple[float, int]] = []
+    for doc, song in enumerate(songs):
+        value = song.get(field)
+        if value is None or isinstance(value, bool):
+            continue
+        if isinstance(value, (int, float)):
+            pairs.append((float(value), doc))
+        elif isinstance(value, str):
+            parsed = parse_date_safe(value)
+            if parsed is not None:
+                pairs.append((float(parsed.toordinal()), doc))
+    return pairs
+
+
+@timed
+def build_indexes(songs: list[dict[str, Any]]) -> tuple[dict[str, Facet], dict[str, RangeIndex]]:
+    size = len(songs)
+    facets = {name: Facet(facet_postings(songs, field), size) for name, field in FACET_FIELDS.items()}
+    ranges = {name: RangeIndex(range_pairs(songs, field), size) for name, field in RANGE_FIELDS.items()}
+    return facets, ranges
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Filter the song library with the bitmap query DSL.")
+    parser.add_argument("query", nargs="?", default="", help='e.g. "status:active key:G tempo<80 theme:lament"')
+    parser.add_argument("--root", type=Path, default=ROOT, help="library root containing songs/, services/, series/")
+    parser.add_argument("--limit", type=int, default=50, help="matching slugs to print (0 for none)")
+    parser.add_argument("--facet", action="append", default=[], help="print value counts for this facet")
+    args = parser.parse_args(argv)
+
+    library = Library(args.root.resolve())
+    library.load()
+    engine = QueryEngine.from_library(library)
+    try:
+        mask = engine.evaluate(args.query)
+        for name in args.facet:
+            engine.facet(name)
+    except QueryError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+
+    print(f"matches={mask.bit_count()}")
+    for doc in ids_from_bitmap(mask, args.limit):
+        print(f"  {engine.slugs[doc]}")
+    for name in args.facet:
+        print(f"{name}:")
+        for value, count in engine.facet(name).counts(mask):
+            print(f"  {count:>5}  {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(main))
@@ -0,0 +1,273 @@
+"""
+Typed, slotted records for songs, services and series (see DATA_MODEL.md).
+
+`parse_frontmatter` returns one dict per file, and its lists are rebuilt by
+every caller. Tools that hold a whole library (or several) in memory use
+these records instead:
+
+- every record class uses `__slots__` (no per-instance `__dict__`);
+- list fields are stored as tuples, and repeated strings (slugs in service
+  lists, themes, keys, usage, writers, tags, preachers, ...) are interned,
+  so 10k service rows that say "main" share one string object;
+- conversion is zero-copy in both directions: `from_frontmatter` keeps the
+  parsed string objects (interning returns the same object when it is
+  already the canonical copy), and `to_frontmatter` hands the stored values,
+  tuples included, straight to `dump_frontmatter`. Keys outside the data
+  model are kept in `extra`, model keys the file leaves out in `missing`
+  (so they are not written back as `key: null`), and a leading UTF-8 BOM
+  in `bom`.
+
+A file written in the data model's key order, with LF line endings,
+round-trips byte for byte, which covers every file in this repository.
+Files with reordered keys come back in model order, and CRLF line endings
+come back as LF (tests/test_records.py).
+
+Values are not validated or coerced; that is hymnops.validate's job.
+`python -m hymnops bench` reports the retained memory of a library loaded
+as records versus as frontmatter dicts.
+"""
+
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable
+
+from hymnops.files import list_markdown_files
+from hymnops.frontmatter import SERIES_KEY_ORDER, SERVICE_KEY_ORDER, SONG_KEY_ORDER, dump_frontmatter, parse_frontmatter
+
+
+SERVICE_SONG_KEY_ORDER = ["slug", "usage", "key", "notes"]
+
+# Fields whose values come from small vocabularies or repeat across files.
+INTERNED_FIELDS = frozenset(
+    {
+        "slug",
+        "lyrics_source",
+        "original_artist",
+        "publisher",
+        "key",
+        "time_signature",
+        "vocal_range",
+        "status",
+        "language",
+        "meter",
+        "series_slug",
+        "preacher",
+    }
+)
+LIST_FIELDS = frozenset(
+    {
+        "aka",
+        "writers",
+        "dominant_themes",
+        "doctrinal_categories",
+        "emotional_tone",
+        "scriptural_anchors",
+        "tags",
+        "usage",
+        "date_range",
+        "recommended",
+    }
+)
+
+
+def intern_value(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+def intern_list(value: Any) -> Any:
+    """Lists become tuples of interned strings; anything else is kept as parsed."""
+    if type(value) is not list:
+        return value
+    return tuple(sys.intern(item) if type(item) is str else item for item in value)
+
+
+def field_values(fm: dict[str, Any], order: list[str]) -> list[Any]:
+    values: list[Any] = []
+    for name in order:
+        value = fm.get(name)
+        if name in LIST_FIELDS:
+            value = intern_list(value)
+        elif name in INTERNED_FIELDS:
+            value = intern_value(value)
+        values.append(value)
+    return values
+
+
+def extra_keys(fm: dict[str, Any], order: list[str]) -> dict[str, Any] | None:
+    if len(fm) == len(order) and all(name in fm for name in order):
+        return None
+    extra = {key: value for key, value in fm.items() if key not in order}
+    return extra or None
+
+
+def missing_keys(fm: dict[str, Any], order: list[str]) -> frozenset[str] | None:
+    missing = frozenset(name for name in order if name not in fm)
+    return missing or None
+
+
+def as_frontmatter(record: Any, order: list[str]) -> dict[str, Any]:
+    missing = record.missing or ()
+    fm = {name: getattr(record, name) for name in order if name not in missing}
+    if record.extra:
+        fm.update(record.extra)
+    return fm
+
+
+def markdown_text(record: Any, frontmatter: str) -> str:
+    return ("\ufeff" if record.bom else "") + frontmatter + record.body
+
+
+@dataclass(slots=True)
+class Song:
+    title: str
+    slug: str
+    aka: tuple[str, ...]
+    ccli_number: str | None
+    songselect_url: str | None
+    lyrics_source: str
+    lyrics_hint: str | None
+    original_artist: str | None
+    writers: tuple[str, ...]
+    publisher: str | None
+    year: int | None
+    tempo_bpm: float | None
+    key: str | None
+    time_signature: str | None
+    congregational_fit: int | None
+    vocal_range: str | None
+    dominant_themes: tuple[str, ...]
+    doctrinal_categories: tuple[str, ...]
+    emotional_tone: tuple[str, ...]
+    scriptural_anchors: tuple[str, ...]
+    theological_summary: str
+    arrangement_notes: str | None
+    slides_path: str | None
+    tags: tuple[str, ...]
+    last_sung_override: str | None
+    status: str
+    licensing_notes: str | None
+    language: str | None
+    meter: str | None
+    body: str = ""
+    extra: dict[str, Any] | None = None
+    missing: frozenset[str] | None = None
+    bom: bool = False
+
+    @classmethod
+    def from_frontmatter(cls, fm: dict[str, Any], body: str = "", bom: bool = False) -> Song:
+        return cls(*field_values(fm, SONG_KEY_ORDER), body, extra_keys(fm, SONG_KEY_ORDER), missing_keys(fm, SONG_KEY_ORDER), bom)
+
+    def to_frontmatter(self) -> dict[str, Any]:
+        return as_frontmatter(self, SONG_KEY_ORDER)
+
+    def to_markdown(self) -> str:
+        return markdown_text(self, dump_frontmatter(self.to_frontmatter(), SONG_KEY_ORDER))
+
+
+@dataclass(slots=True)
+class ServiceSong:
+    slug: str
+    usage: tuple[str, ...]
+    key: str | None
+    notes: str | None
+    extra: dict[str, Any] | None = None
+    missing: frozenset[str] | None = None
+
+    @classmethod
+    def from_frontmatter(cls, item: dict[str, Any]) -> ServiceSong:
+        return cls(*field_values(item, SERVICE_SONG_KEY_ORDER), extra_keys(item, SERVICE_SONG_KEY_ORDER), missing_keys(item, SERVICE_SONG_KEY_ORDER))
+
+    def to_frontmatter(self) -> dict[str, Any]:
+        return as_frontmatter(self, SERVICE_SONG_KEY_ORDER)
+
+
+@dataclass(slots=True)
+class Service:
+    date: str
+    series_slug: str | None
+    sermon_title: str | None
+    sermon_text: str | None
+    preacher: str | None
+    songs: tuple[ServiceSong, ...]
+    body: str = ""
+    extra: dict[str, Any] | None = None
+    missing: frozenset[str] | None = None
+    bom: bool = False
+
+    @classmethod
+    def from_frontmatter(cls, fm: dict[str, Any], body: str = "", bom: bool = False) -> Service:
+        values = field_values(fm, SERVICE_KEY_ORDER)
+        raw_songs = fm.get("songs")
+        if type(raw_songs) is list:
+            # Malformed (non-mapping) entries are kept as parsed for validate to report.
+            values[-1] = tuple(ServiceSong.from_frontmatter(item) if type(item) is dict else item for item in raw_songs)
+        return cls(*values, body, extra_keys(fm, SERVICE_KEY_ORDER), missing_keys(fm, SERVICE_KEY_ORDER), bom)
+
+    def to_frontmatter(self) -> dict[str, Any]:
+        fm = as_frontmatter(self, SERVICE_KEY_ORDER)
+        if "songs" in fm and type(self.songs) is tuple:
+            fm["songs"] = [song.to_frontmatter() if type(song) is ServiceSong else song for song in self.songs]
+        return fm
+
+    def to_markdown(self) -> str:
+        return markdown_text(self, dump_frontmatter(self.to_frontmatter(), SERVICE_KEY_ORDER))
+
+
+@dataclass(slots=True)
+class Series:
+    title: str
+    slug: str
+    date_range: tuple[str | None, str | None]
+    description: str | None
+    recommended: tuple[str, ...]
+    body: str = ""
+    extra: dict[str, Any] | None = None
+    missing: frozenset[str] | None = None
+    bom: bool = False
+
+    @classmethod
+    def from_frontmatter(cls, fm: dict[str, Any], body: str = "", bom: bool = False) -> Series:
+        return cls(*field_values(fm, SERIES_KEY_ORDER), body, extra_keys(fm, SERIES_KEY_ORDER), missing_keys(fm, SERIES_KEY_ORDER), bom)
+
+    def to_frontmatter(self) -> dict[str, Any]:
+        return as_frontmatter(self, SERIES_KEY_ORDER)
+
+    def to_markdown(self) -> str:
+        return markdown_text(self, dump_frontmatter(self.to_frontmatter(), SERIES_KEY_ORDER))
+
+
+def read_record(path: Path, kind: type[Song] | type[Service] | type[Series]) -> Any:
+    text = path.read_text(encoding="utf-8")
+    fm, body = parse_frontmatter(text)
+    return kind.from_frontmatter(fm, body, text.startswith("\ufeff"))
+
+
+def load_songs(paths: Iterable[Path]) -> list[Song]:
+    return [read_record(path, Song) for path in paths]
+
+
+def load_services(paths: Iterable[Path]) -> list[Service]:
+    return [read_record(path, Service) for path in paths]
+
+
+def load_series(paths: Iterable[Path]) -> list[Series]:
+    return [read_record(path, Series) for path in paths]
+
+
+@dataclass(slots=True)
+class Records:
+    songs: list[Song]
+    services: list[Service]
+    series: list[Series]
+
+
+def load_records(root: Path) -> Records:
+    """Every song, service and series under `root` as records, in file-name order."""
+    return Records(
+        songs=load_songs(list_markdown_files(root / "songs")),
+        services=load_services(list_markdown_files(root / "services")),
+        series=load_series(list_markdown_files(root / "series")),
+    )
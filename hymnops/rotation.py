@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Rotation health and song fatigue from service history.
+
+For every song the engine keeps, in a small slotted state object:
+
+- an exponentially decayed usage score (half-life HALF_LIFE_WEEKS), i.e.
+  each use counts 1 on the day and half as much HALF_LIFE_WEEKS later;
+- the mean and variance of the gaps, in weeks, between the weeks it was
+  sung (Welford's online update);
+- its usage-slot mix ("main", "response", "kid-friendly", ...).
+
+Appending a service costs O(1) per song on it. A service that lands before
+a song's latest use (a backfilled or corrected date) is still handled: the
+decayed score is order-independent, and the one gap it splits is removed
+from the running statistics before its two halves are added.
+
+Queries scan the per-song states once, so they answer for the whole library
+in a few milliseconds:
+
+- overused:  decayed score at least that of a song sung every
+             OVERUSED_EVERY_WEEKS weeks indefinitely;
+- neglected: active songs not sung for more than their usual gap plus
+             NEGLECT_SIGMAS standard deviations (never less than
+             NEGLECT_MIN_WEEKS), or never sung at all;
+- ready:     active songs rested beyond their usual gap (and at least
+             MIN_REST_WEEKS) with a low score, but not yet neglected.
+
+`RotationEngine.backfill` builds every state from columns (date, slug,
+usage) in one pass: rows are sorted once by (song, week) and each song's
+run is folded without per-row method calls. The columns can come from
+hymnops.records (`from_records`) or from the hymnops.columnar export
+(`read_columns`). Dates are bucketed into Sunday-start weeks, as in
+build-index.ts.
+
+Usage:
+    python -m hymnops rotation [--root .] [--now YYYY-MM-DD] [--limit 15] [--song <slug>] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import sys
+from array import array
+from bisect import bisect_left
+from datetime import date
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+from hymnops.files import ROOT
+from hymnops.library import parse_date_safe, start_of_week
+from hymnops.profiling import run, timed
+from hymnops.records import Records, ServiceSong, load_records
+
+
+HALF_LIFE_WEEKS = 8.0
+OVERUSED_EVERY_WEEKS = 3.0
+NEGLECT_SIGMAS = 2.0
+NEGLECT_MIN_WEEKS = 12
+MIN_REST_WEEKS = 4
+MIN_GAPS = 2
+
+
+def week_index(value: date) -> int:
+    """Sunday-start week number; consecutive weeks differ by 1."""
+    return start_of_week(value).toordinal() // 7
+
+
+def week_start(index: int) -> date:
+    return date.fromordinal(index * 7)
+
+
+class SongRotation:
+    __slots__ = ("weeks", "uses", "score", "score_week", "gap_n", "gap_mean", "gap_m2", "slots")
+
+    def __init__(self) -> None:
+        self.weeks = array("i")  # distinct weeks sung, ascending
+        self.uses = 0
+        self.score = 0.0
+        self.score_week = 0
+        self.gap_n = 0
+        self.gap_mean = 0.0
+        self.gap_m2 = 0.0
+        self.slots: dict[str, int] = {}
+
+    def _add_gap(self, gap: int) -> None:
+        self.gap_n += 1
+        delta = gap - self.gap_mean
+        self.gap_mean += delta / self.gap_n
+        self.gap_m2 += delta * (gap - self.gap_mean)
+
+    def _remove_gap(self, gap: int) -> None:
+        if self.gap_n <= 1:
+            self.gap_n, self.gap_mean, self.gap_m2 = 0, 0.0, 0.0
+            return
+        self.gap_n -= 1
+        delta = gap - self.gap_mean
+        self.gap_mean -= delta / self.gap_n
+        self.gap_m2 -= delta * (gap - self.gap_mean)
+
+    def add(self, week: int, usage: Iterable[str], decay: float) -> None:
+        """Record one use in `week`; `decay` is the per-week score multiplier."""
+        self.uses += 1
+        for slot in usage:
+            self.slots[slot] = self.slots.get(slot, 0) + 1
+
+        if self.uses == 1 or week >= self.score_week:
+            self.score = self.score * decay ** (week - self.score_week) + 1.0 if self.uses > 1 else 1.0
+            self.score_week = week
+        else:
+            self.score += decay ** (self.score_week - week)
+
+        weeks = self.weeks
+        if not weeks or week > weeks[-1]:
+            if weeks:
+                self._add_gap(week - weeks[-1])
+            weeks.append(week)
+            return
+        position = bisect_left(weeks, week)
+        if weeks[position] == week:
+            return
+        if position > 0:
+            before, after = weeks[position - 1], weeks[position]
+            self._remove_gap(after - before)
+            self._add_gap(week - before)
+            self._add_gap(after - week)
+        else:
+            self._add_gap(weeks[0] - week)
+        weeks.insert(position, week)
+
+    def score_at(self, week: int, decay: float) -> float:
+        if not self.uses:
+            return 0.0
+        return self.score * decay ** (week - self.score_week)
+
+    @property
+    def gap_std(self) -> float:
+        return math.sqrt(self.gap_m2 / (self.gap_n - 1)) if self.gap_n > 1 else 0.0
+
+    def weeks_since(self, week: int) -> int | None:
+        return max(0, week - self.weeks[-1]) if self.weeks else None
+
+
+class RotationEngine:
+    def __init__(self, half_life: float = HALF_LIFE_WEEKS) -> None:
+        self.half_life = half_life
+        self.decay = 0.5 ** (1.0 / half_life)
+        self.songs: dict[str, SongRotation] = {}
+        self.titles: dict[str, str] = {}
+        self.active: set[str] = set()
+        self.latest_week: int | None = None
+
+    # -- building ----------------------------------------------------------
+
+    def set_catalog(self, songs: Iterable[tuple[str, str, bool]]) -> None:
+        """Register (slug, title, active) for every library song, sung or not."""
+        for slug, title, active in songs:
+            self.titles[slug] = title
+            if active:
+                self.active.add(slug)
+            else:
+                self.active.discard(slug)
+
+    def add_service(self, service_date: str, songs: Iterable[tuple[str, Sequence[str]]]) -> None:
+        """Append one service: (slug, usage) for each song on it."""
+        parsed = parse_date_safe(service_date)
+        if parsed is None:
+            return
+        week = week_index(parsed)
+        for slug, usage in songs:
+            state = self.songs.get(slug)
+            if state is None:
+                state = self.songs[slug] = SongRotation()
+            state.add(week, usage, self.decay)
+        if self.latest_week is None or week > self.latest_week:
+            self.latest_week = week
+
+    @classmethod
+    @timed
+    def backfill(
+        cls,
+        dates: Sequence[str | None],
+        slugs: Sequence[str],
+        usages: Sequence[Sequence[str] | str | None],
+        half_life: float = HALF_LIFE_WEEKS,
+    ) -> RotationEngine:
+        """Build every song's state from parallel columns in one sorted pass.
+
+        `usages` entries may be sequences or comma-joined strings (the
+        hymnops.columnar layout).
+        """
+        engine = cls(half_life)
+        decay = engine.decay
+        week_of: dict[str, int | None] = {}
+        for value in set(dates):
+            parsed = parse_date_safe(value)
+            week_of[value] = week_index(parsed) if parsed is not None else None  # type: ignore[index]
+        weeks = [week_of[value] for value in dates]  # type: ignore[index]
+        rows = sorted((i for i in range(len(slugs)) if weeks[i] is not None), key=lambda i: (slugs[i], weeks[i]))
+
+        start = 0
+        while start < len(rows):
+            slug = slugs[rows[start]]
+            end = start
+            while end < len(rows) and slugs[rows[end]] == slug:
+                end += 1
+            state = engine.songs[slug] = SongRotation()
+            run_weeks = [weeks[i] for i in rows[start:end]]
+            last = run_weeks[-1]
+            state.uses = end - start
+            state.score = math.fsum(decay ** (last - week) for week in run_weeks)  # type: ignore[operator]
+            state.score_week = last  # type: ignore[assignment]
+            distinct = sorted(set(run_weeks))  # type: ignore[type-var]
+            state.weeks = array("i", distinct)
+            gaps = [b - a for a, b in zip(distinct, distinct[1:])]
+            if gaps:
+                mean = math.fsum(gaps) / len(gaps)
+                state.gap_n, state.gap_mean = len(gaps), mean
+                state.gap_m2 = math.fsum((gap - mean) ** 2 for gap in gaps)
+            slots = state.slots
+            for i in rows[start:end]:
+                usage = usages[i]
+                for slot in usage.split(",") if isinstance(usage, str) else usage or ():
+                    if slot:
+                        slots[slot] = slots.get(slot, 0) + 1
+            if engine.latest_week is None or last > engine.latest_week:
+                engine.latest_week = last
+            start = end
+        return engine
+
+    @classmethod
+    def from_records(cls, records: Records, half_life: float = HALF_LIFE_WEEKS) -> RotationEngine:
+        dates: list[str | None] = []
+        slugs: list[str] = []
+        usages: list[Sequence[str]] = []
+        for service in records.services:
+            if not isinstance(service.date, str) or not isinstance(service.songs, tuple):
+                continue
+            for item in service.songs:
+                if type(item) is ServiceSong and isinstance(item.slug, str) and item.slug:
+                    dates.append(service.date)
+                    slugs.append(item.slug)
+                    usages.append(item.usage if isinstance(item.usage, tuple) else ())
+        engine = cls.backfill(dates, slugs, usages, half_life)
+        engine.set_catalog(
+            (song.slug, song.title if isinstance(song.title, str) else song.slug, song.status != "archive")
+            for song in records.songs
+            if isinstance(song.slug, str)
+        )
+        return engine
+
+    # -- queries -----------------------------------------------------------
+
+    def overused_score(self) -> float:
+        """Steady-state score of a song sung every OVERUSED_EVERY_WEEKS weeks."""
+        return 1.0 / (1.0 - self.decay**OVERUSED_EVERY_WEEKS)
+
+    def neglect_after(self, state: SongRotation) -> float:
+        if state.gap_n < MIN_GAPS:
+            return NEGLECT_MIN_WEEKS
+        return max(NEGLECT_MIN_WEEKS, state.gap_mean + NEGLECT_SIGMAS * state.gap_std)
+
+    def health(self, slug: str, week: int) -> dict[str, Any]:
+        state = self.songs.get(slug)
+        row: dict[str, Any] = {"slug": slug, "title": self.titles.get(slug, slug), "active": slug in self.active}
+        if state is None:
+            row.update({"times_sung": 0, "weeks_since_last_sung": None, "score": 0.0})
+            return row
+        row.update(
+            {
+                "times_sung": state.uses,
+                "last_sung_week": week_start(state.weeks[-1]).isoformat(),
+                "weeks_since_last_sung": state.weeks_since(week),
+                "score": round(state.score_at(week, self.decay), 3),
+                "gap_mean_weeks": round(state.gap_mean, 2) if state.gap_n else None,
+                "gap_std_weeks": round(state.gap_std, 2) if state.gap_n > 1 else None,
+                "neglected_after_weeks": round(self.neglect_after(state), 1),
+                "slots": dict(sorted(state.slots.items())),
+            }
+        )
+        return row
+
+    @timed
+    def overused(self, week: int, limit: int | None = None) -> list[dict[str, Any]]:
+        threshold = self.overused_score()
+        hits = [
+            (state.score_at(week, self.decay), slug)
+            for slug, state in self.songs.items()
+            if state.score_at(week, self.decay) >= threshold
+        ]
+        hits.sort(key=lambda hit: (-hit[0], hit[1]))
+        return [self.health(slug, week) for _score, slug in hits[:limit]]
+
+    @timed
+    def neglected(self, week: int, limit: int | None = None) -> list[dict[str, Any]]:
+        hits: list[tuple[float, str]] = []
+        for slug in self.active:
+            state = self.songs.get(slug)
+            if state is None or not state.weeks:
+                hits.append((math.inf, slug))
+                continue
+            since = week - state.weeks[-1]
+            cutoff = self.neglect_after(state)
+            if since >= cutoff:
+                hits.append((since / cutoff, slug))
+        hits.sort(key=lambda hit: (-hit[0], hit[1]))
+        return [self.health(slug, week) for _ratio, slug in hits[:limit]]
+
+    @timed
+    def ready(self, week: int, limit: int | None = None) -> list[dict[str, Any]]:
+        ceiling = self.overused_score() / 2
+        hits: list[tuple[float, str]] = []
+        for slug in self.active:
+            state = self.songs.get(slug)
+            if state is None or not state.gap_n:
+                continue
+            since = week - state.weeks[-1]
+            if since < max(MIN_REST_WEEKS, state.gap_mean) or since >= self.neglect_after(state):
+                continue
+            if state.score_at(week, self.decay) < ceiling:
+                hits.append((since / max(state.gap_mean, 1.0), slug))
+        hits.sort(key=lambda hit: (-hit[0], hit[1]))
+        return [self.health(slug, week) for _ratio, slug in hits[:limit]]
+
+
+def format_row(row: dict[str, Any]) -> str:
+    since = row["weeks_since_last_sung"]
+    gap = f"{row['gap_mean_weeks']}±{row['gap_std_weeks'] or 0}" if row.get("gap_mean_weeks") is not None else "-"
+    return (
+        f"  {row['slug']:<40} sung={row['times_sung']:<3} "
+        f"weeks_since={'never' if since is None else since:<5} score={row['score']:<6} gap={gap}"
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Report overused, neglected and ready-to-return songs.")
+    parser.add_argument("--root", type=Path, default=ROOT, help="library root containing songs/ and services/")
+    parser.add_argument("--now", type=date.fromisoformat, default=None, help="reference date (default: today)")
+    parser.add_argument("--limit", type=int, default=15, help="rows per list")
+    parser.add_argument("--song", help="print the full rotation state for one song")
+    parser.add_argument("--json", action="store_true", help="print the lists as JSON")
+    args = parser.parse_args(argv)
+
+    engine = RotationEngine.from_records(load_records(args.root.resolve()))
+    week = week_index(args.now or date.today())
+
+    if args.song:
+        print(json.dumps(engine.health(args.song, week), indent=2))
+        return 0 if args.song in engine.titles or args.song in engine.songs else 1
+
+    lists = {
+        "overused": engine.overused(week, args.limit),
+        "neglected": engine.neglected(week, args.limit),
+        "ready": engine.ready(week, args.limit),
+    }
+    if args.json:
+        print(json.dumps(lists, indent=2))
+        return 0
+    print(f"week_of={week_start(week).isoformat()}")
+    print(f"songs_tracked={len(engine.songs)}")
+    print(f"overused_score={engine.overused_score():.2f}")
+    for name, rows in lists.items():
+        print(f"{name}:")
+        for row in rows:
+            print(format_row(row))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(main))
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Precompute the song search index so the browser does not build one per visit.
+
+The index is a compact JSON document:
+
+- `docs`: song slugs; a document id is its position in this list.
+- `fields` / `weights`: searchable fields and their ranking weight. A
+  posting's field mask has bit i set when the term occurs in fields[i].
+- `terms`: sorted, normalized vocabulary. Prefix search is a binary search
+  for the range of terms starting with the query token.
+- `postings`: per term, a flat list `[doc_delta, mask, doc_delta, mask, ...]`
+  with doc ids delta-encoded in ascending order.
+- `trigrams`: trigram -> delta-encoded term ids, used to find near-miss
+  terms (typos) by trigram overlap when a token has no exact/prefix match.
+
+`normalize_text` documents the tokenizer the client must mirror; `SearchIndex`
+is the reference query implementation.
+
+Usage:
+    python -m hymnops.search_index [--root .] [--query "amazng grace"]
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import json
+import re
+import sys
+import unicodedata
+from pathlib import Path
+from typing import Any
+
+from hymnops.files import ROOT, atomic_write_text
+from hymnops.library import Library
+from hymnops.profiling import run, timed
+
+
+INDEX_NAME = "search-index.json"
+INDEX_VERSION = 1
+FIELDS = [
+    ("title", 3.0),
+    ("aka", 2.5),
+    ("writers", 1.5),
+    ("original_artist", 1.2),
+    ("dominant_themes", 1.0),
+    ("doctrinal_categories", 0.8),
+    ("tags", 0.8),
+    ("scriptural_anchors", 0.8),
+    ("ccli_number", 2.0),
+]
+PREFIX_FACTOR = 0.7
+FUZZY_FACTOR = 0.4
+FUZZY_MIN_LENGTH = 4
+FUZZY_MIN_DICE = 0.5
+TOKEN_SPLIT_RE = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_text(value: str) -> str:
+    """NFKD, drop combining marks, lowercase, remove apostrophes, non-alphanumerics to spaces."""
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+    stripped = stripped.replace("'", "").replace("\u2019", "")
+    return " ".join(TOKEN_SPLIT_RE.split(stripped)).strip()
+
+
+def tokenize(value: str) -> list[str]:
+    return [token for token in normalize_text(value).split(" ") if token]
+
+
+def trigrams(term: str) -> set[str]:
+    padded = f" {term} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def field_values(song: dict[str, Any], field: str) -> list[str]:
+    value = song.get(field)
+    if isinstance(value, list):
+        return [v for v in value if isinstance(v, str)]
+    if isinstance(value, str):
+        return [value]
+    return []
+
+
+def delta_encode(values: list[int]) -> list[int]:
+    out: list[int] = []
+    previous = 0
+    for value in values:
+        out.append(value - previous)
+        previous = value
+    return out
+
+
+def delta_decode(values: list[int]) -> list[int]:
+    out: list[int] = []
+    total = 0
+    for value in values:
+        total += value
+        out.append(total)
+    return out
+
+
+@timed
+def build_search_index(songs: list[dict[str, Any]]) -> dict[str, Any]:
+    masks: dict[str, dict[int, int]] = {}
+    for doc_id, song in enumerate(songs):
+        for bit, (field, _weight) in enumerate(FIELDS):
+            for value in field_values(song, field):
+                for token in tokenize(value):
+                    by_doc = masks.setdefault(token, {})
+                    by_doc[doc_id] = by_doc.get(doc_id, 0) | (1 << bit)
+
+    terms = sorted(masks)
+    postings: list[list[int]] = []
+    for term in terms:
+        flat: list[int] = []
+        previous = 0
+        for doc_id in sorted(masks[term]):
+            flat.extend((doc_id - previous, masks[term][doc_id]))
+            previous = doc_id
+        postings.append(flat)
+
+    grams: dict[str, list[int]] = {}
+    for term_id, term in enumerate(terms):
+        if len(term) < FUZZY_MIN_LENGTH - 1:
+            continue
+        for gram in trigrams(term):
+            grams.setdefault(gram, []).append(term_id)
+
+    return {
+        "version": INDEX_VERSION,
+        "normalizer": "nfkd-strip-marks-lower-drop-apostrophes-alnum",
+        "fields": [field for field, _ in FIELDS],
+        "weights": [weight for _, weight in FIELDS],
+        "docs": [song["slug"] for song in songs],
+        "terms": terms,
+        "postings": postings,
+        "trigrams": {gram: delta_encode(ids) for gram, ids in sorted(grams.items())},
+    }
+
+
+class SearchIndex:
+    """Reference query implementation over a loaded index document."""
+
+    def __init__(self, data: dict[str, Any]) -> None:
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported search index version: {data.get('version')!r}")
+        self.docs: list[str] = data["docs"]
+        self.weights: list[float] = data["weights"]
+        self.terms: list[str] = data["terms"]
+        self.postings: list[list[int]] = data["postings"]
+        self.trigrams: dict[str, list[int]] = data["trigrams"]
+
+    def term_scores(self, term_id: int, factor: float) -> dict[int, float]:
+        flat = self.postings[term_id]
+        scores: dict[int, float] = {}
+        doc_id = 0
+        for i in range(0, len(flat), 2):
+            doc_id += flat[i]
+            mask = flat[i + 1]
+            best = max(w for bit, w in enumerate(self.weights) if mask & (1 << bit))
+            scores[doc_id] = best * factor
+        return scores
+
+    def candidate_terms(self, token: str) -> list[tuple[int, float]]:
+        start = bisect.bisect_left(self.terms, token)
+        found: list[tuple[int, float]] = []
+        idx = start
+        while idx < len(self.terms) and self.terms[idx].startswith(token):
+            found.append((idx, 1.0 if self.terms[idx] == token else PREFIX_FACTOR))
+            idx += 1
+        if found or len(token) < FUZZY_MIN_LENGTH:
+            return found
+
+        wanted = trigrams(token)
+        overlap: dict[int, int] = {}
+        for gram in wanted:
+            for term_id in delta_decode(self.trigrams.get(gram, [])):
+                overlap[term_id] = overlap.get(term_id, 0) + 1
+        for term_id, shared in overlap.items():
+            dice = 2 * shared / (len(wanted) + len(trigrams(self.terms[term_id])))
+            if dice >= FUZZY_MIN_DICE:
+                found.append((term_id, FUZZY_FACTOR * dice))
+        return found
+
+    def search(self, text: str, limit: int | None = None) -> list[tuple[str, float]]:
+        """Return (slug, score) for songs matching every query token, best first."""
+        tokens = tokenize(text)
+        if not tokens:
+            return []
+        totals: dict[int, float] | None = None
+        for token in dict.fromkeys(tokens):
+            token_scores: dict[int, float] = {}
+            for term_id, factor in self.candidate_terms(token):
+                for doc_id, score in self.term_scores(term_id, factor).items():
+                    if score > token_scores.get(doc_id, 0.0):
+                        token_scores[doc_id] = score
+            if totals is None:
+                totals = token_scores
+            else:
+                totals = {doc: totals[doc] + score for doc, score in token_scores.items() if doc in totals}
+            if not totals:
+                return []
+        ranked = sorted((totals or {}).items(), key=lambda pair: (-pair[1], pair[0]))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [(self.docs[doc_id], round(score, 3)) for doc_id, score in ranked]
+
+
+def write_search_index(library: Library, output_dirs: list[Path]) -> dict[str, Any]:
+    index = build_search_index(library.sorted_songs())
+    payload = json.dumps(index, separators=(",", ":"), ensure_ascii=False)
+    for output_dir in output_dirs:
+        atomic_write_text(output_dir / INDEX_NAME, payload)
+    return index
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Build the prebuilt client-side song search index.")
+    parser.add_argument("--root", type=Path, default=ROOT, help="library root containing songs/, services/, series/")
+    parser.add_argument("--query", help="run a query against the freshly built index and print the matches")
+    args = parser.parse_args(argv)
+
+    root = args.root.resolve()
+    library = Library(root)
+    library.load()
+    output_dirs = [root / "public" / "data", root / "dist" / "data"]
+    index = write_search_index(library, output_dirs)
+
+    print(f"docs={len(index['docs'])}")
+    print(f"terms={len(index['terms'])}")
+    print(f"trigrams={len(index['trigrams'])}")
+    print(f"index={output_dirs[0] / INDEX_NAME}")
+    if args.query:
+        for slug, score in SearchIndex(index).search(args.query, limit=10):
+            print(f"{score:>6}  {slug}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(main))
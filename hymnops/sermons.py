@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Suggest songs for upcoming sermons from the sermon plan, series and song metadata.
+
+Inputs are imports/Sermon Info (2024-2025).csv (Dates, Sermon Series,
+Sermon Title, Sermon Text, Preacher), series/*.md and the songs/ and
+services/ history. Indexes are built once per run:
+
+- by series:  the series' `recommended` songs, plus songs already sung in
+              services of that series;
+- by book:    songs whose `scriptural_anchors` cite the book (with their
+              chapter ranges), plus the passages of earlier sermons each
+              song was sung under;
+- by theme:   active songs per dominant theme.
+
+Each sermon row is then scored by looking up its Bible passage, the themes
+that hymnops.classify's theme rules find in its title (and, more weakly,
+its series name), and its series, and merging those postings. No sermon scans the whole library.
+The passage is the main signal: anchors in the sermon's chapters, then
+songs sung under sermons on the same or nearby chapters, then title
+themes. Series recommendations, history and themes only break ties,
+since every sermon in a series shares them.
+
+Songs last sung within REST_WEEKS up to the sermon date are marked down
+(see hymnops.rotation), and so are songs this run already suggested for a
+sermon in the previous REST_WEEKS weeks, so a term's plan does not repeat
+one set. The penalty grows with how recent that use is. Archived songs are
+never suggested.
+
+"Upcoming" means after the latest service in services/, unless --from is
+given. Suggestions are written to imports/song-suggestions.json with the
+reasons behind each score.
+
+Usage:
+    python -m hymnops sermons [--root .] [--csv "imports/Sermon Info (2024-2025).csv"]
+                              [--from YYYY-MM-DD] [--to YYYY-MM-DD] [--top 8] [--output imports/song-suggestions.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import re
+import sys
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from hymnops.classify import THEME_RULES, normalize
+from hymnops.files import ROOT, atomic_write_text
+from hymnops.importer import normalize_key, slugify
+from hymnops.profiling import run, timed
+from hymnops.records import Records, ServiceSong, load_records
+from hymnops.rotation import RotationEngine, week_index
+
+
+CSV_NAME = "Sermon Info (2024-2025).csv"
+OUTPUT = Path("imports/song-suggestions.json")
+DATE_FORMATS = ["%d-%b-%Y", "%d-%B-%Y", "%Y-%m-%d"]
+TOP = 8
+REST_WEEKS = 4
+
+# Passage signals dominate: they are what differs between sermons of one
+# series. Series signals only break ties among passage-relevant songs.
+WEIGHT_ANCHOR_CHAPTER = 8.0
+WEIGHT_ANCHOR_BOOK = 2.0
+WEIGHT_PASSAGE_HISTORY = 4.0
+WEIGHT_NEARBY_HISTORY = 2.0
+WEIGHT_BOOK_HISTORY = 0.5
+WEIGHT_THEME = 2.0
+WEIGHT_SERIES_THEME = 0.5
+WEIGHT_RECOMMENDED = 2.0
+WEIGHT_SERIES_HISTORY = 0.5
+HISTORY_CAP = 3
+NEARBY_CHAPTERS = 3
+# Per week of rest still owed: a song used last week loses three chapter
+# anchors' worth, so it falls below any fresh passage match.
+PENALTY_RECENT = 8.0
+PLANNED_PER_SERMON = 5
+
+BOOK_ALIASES = {"psalms": "psalm", "song of songs": "song of solomon", "revelations": "revelation"}
+PASSAGE_RE = re.compile(
+    r"^\s*(?P<book>(?:[1-3]\s*)?[A-Za-z][A-Za-z ]*?)\s+(?P<c1>\d+)(?::(?P<v1>\d+))?"
+    r"(?:\s*[-–]\s*(?P<c2>\d+)(?::(?P<v2>\d+))?)?"
+)
+
+
+@dataclass(slots=True)
+class Passage:
+    book: str
+    first_chapter: int
+    last_chapter: int
+
+    def overlaps(self, other: Passage) -> bool:
+        return self.book == other.book and self.first_chapter <= other.last_chapter and other.first_chapter <= self.last_chapter
+
+    def chapter_gap(self, other: Passage) -> int:
+        """Chapters between two passages of the same book (0 when they overlap)."""
+        return max(0, self.first_chapter - other.last_chapter, other.first_chapter - self.last_chapter)
+
+
+@dataclass(slots=True)
+class Sermon:
+    date: str
+    series: str
+    title: str
+    text: str
+    preacher: str
+
+
+def parse_passage(text: str | None) -> Passage | None:
+    """Book and chapter span of "Matthew 20:1 - 16", "Leviticus 1 - 7", "Isaiah 52:13-53:12"."""
+    if not text:
+        return None
+    match = PASSAGE_RE.match(text)
+    if match is None:
+        return None
+    book = re.sub(r"\s+", " ", match.group("book")).strip().lower()
+    book = BOOK_ALIASES.get(book, book)
+    first = int(match.group("c1"))
+    last = first
+    if match.group("c2"):
+        # "Psalm 1:1-6" ends on a verse of the same chapter; "Leviticus 1 - 7"
+        # and "Isaiah 52:13-53:12" end on another chapter.
+        if match.group("v1") is None or match.group("v2") is not None:
+            last = int(match.group("c2"))
+    return Passage(book, first, max(first, last))
+
+
+def parse_sermon_date(value: str) -> str | None:
+    text = value.strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def read_sermons(csv_path: Path) -> list[Sermon]:
+    sermons: list[Sermon] = []
+    with csv_path.open(encoding="utf-8-sig", newline="") as handle:
+        for row in csv.DictReader(handle):
+            day = parse_sermon_date(row.get("Dates") or "")
+            if day is None:
+                continue
+            sermons.append(
+                Sermon(
+                    date=day,
+                    series=(row.get("Sermon Series") or "").strip(),
+                    title=(row.get("Sermon Title") or "").strip(),
+                    text=(row.get("Sermon Text") or "").strip(),
+                    preacher=(row.get("Preacher") or "").strip(),
+                )
+            )
+    sermons.sort(key=lambda sermon: sermon.date)
+    return sermons
+
+
+def sermon_themes(*texts: str) -> list[str]:
+    text = normalize(" ".join(texts))
+    themes: list[str] = []
+    for rule in THEME_RULES:
+        if rule.matches(text, "", themes):
+            themes.extend(value for value in rule.values if value not in themes)
+    return themes
+
+
+class SuggestionIndex:
+    """Per-series, per-book and per-theme song postings for one library snapshot."""
+
+    def __init__(self, records: Records) -> None:
+        self.titles: dict[str, str] = {}
+        self.active: set[str] = set()
+        self.series_by_key: dict[str, str] = {}
+        self.by_series: dict[str, dict[str, list[str]]] = {}
+        self.by_book: dict[str, list[tuple[str, Passage]]] = {}
+        self.anchors: dict[str, list[tuple[str, Passage]]] = {}
+        self.by_theme: dict[str, list[str]] = {}
+        self.rotation = RotationEngine.from_records(records)
+        self._build(records)
+
+    @timed
+    def _build(self, records: Records) -> None:
+        for song in records.songs:
+            if not isinstance(song.slug, str):
+                continue
+            self.titles[song.slug] = song.title if isinstance(song.title, str) else song.slug
+            if song.status == "archive":
+                continue
+            self.active.add(song.slug)
+            for theme in song.dominant_themes if isinstance(song.dominant_themes, tuple) else ():
+                self.by_theme.setdefault(theme, []).append(song.slug)
+            for anchor in song.scriptural_anchors if isinstance(song.scriptural_anchors, tuple) else ():
+                passage = parse_passage(anchor) if isinstance(anchor, str) else None
+                if passage is not None:
+                    self.anchors.setdefault(passage.book, []).append((song.slug, passage))
+
+        for series in records.series:
+            if not isinstance(series.slug, str):
+                continue
+            self.series_by_key[series.slug] = series.slug
+            if isinstance(series.title, str):
+                self.series_by_key[normalize_key(series.title)] = series.slug
+                self.series_by_key.setdefault(slugify(series.title), series.slug)
+            postings = self.by_series.setdefault(series.slug, {})
+            for slug in series.recommended if isinstance(series.recommended, tuple) else ():
+                postings.setdefault(slug, []).append("recommended")
+
+        for service in records.services:
+            if not isinstance(service.songs, tuple):
+                continue
+            passage = parse_passage(service.sermon_text if isinstance(service.sermon_text, str) else None)
+            for item in service.songs:
+                if type(item) is not ServiceSong or not isinstance(item.slug, str):
+                    continue
+                if isinstance(service.series_slug, str):
+                    self.by_series.setdefault(service.series_slug, {}).setdefault(item.slug, []).append("sung")
+                if passage is not None:
+                    self.by_book.setdefault(passage.book, []).append((item.slug, passage))
+
+    def series_slug(self, name: str) -> str | None:
+        if not name:
+            return None
+        return self.series_by_key.get(normalize_key(name)) or self.series_by_key.get(slugify(name))
+
+    def sung_weeks_before(self, slug: str, week: int) -> int | None:
+        """Weeks from the latest use of `slug` at or before `week` (uses after it do not count)."""
+        state = self.rotation.songs.get(slug)
+        if state is None:
+            return None
+        position = bisect_right(state.weeks, week)
+        return week - state.weeks[position - 1] if position else None
+
+    def suggest(self, sermon: Sermon, top: int = TOP, planned: dict[str, int] | None = None) -> dict[str, Any]:
+        """Score songs for one sermon; `planned` maps slugs already suggested this run to their week index."""
+        scores: dict[str, float] = {}
+        reasons: dict[str, list[str]] = {}
+
+        def add(slug: str, points: float, reason: str) -> None:
+            if slug in self.active:
+                scores[slug] = scores.get(slug, 0.0) + points
+                reasons.setdefault(slug, []).append(reason)
+
+        passage = parse_passage(sermon.text)
+        if passage is not None:
+            for slug, anchor in self.anchors.get(passage.book, []):
+                if anchor.overlaps(passage):
+                    add(slug, WEIGHT_ANCHOR_CHAPTER, f"anchor {passage.book} {anchor.first_chapter}")
+                else:
+                    add(slug, WEIGHT_ANCHOR_BOOK, f"anchor {passage.book}")
+            uses: dict[str, list[int]] = {}
+            for slug, used in self.by_book.get(passage.book, []):
+                gap = used.chapter_gap(passage)
+                tier = 0 if gap == 0 else 1 if gap <= NEARBY_CHAPTERS else 2
+                uses.setdefault(slug, [0, 0, 0])[tier] += 1
+            for slug, (same, nearby, book) in uses.items():
+                if same:
+                    add(slug, WEIGHT_PASSAGE_HISTORY * min(same, HISTORY_CAP), f"sung-with-{passage.book}-{passage.first_chapter} x{same}")
+                if nearby:
+                    add(slug, WEIGHT_NEARBY_HISTORY * min(nearby, HISTORY_CAP), f"sung-near-{passage.book}-{passage.first_chapter} x{nearby}")
+                if book:
+                    add(slug, WEIGHT_BOOK_HISTORY * min(book, HISTORY_CAP), f"sung-with-{passage.book} x{book}")
+
+        themes = sermon_themes(sermon.title, "" if passage else sermon.text)
+        for theme in themes:
+            for slug in self.by_theme.get(theme, []):
+                add(slug, WEIGHT_THEME, f"theme {theme}")
+        series_themes = [theme for theme in sermon_themes(sermon.series) if theme not in themes]
+        for theme in series_themes:
+            for slug in self.by_theme.get(theme, []):
+                add(slug, WEIGHT_SERIES_THEME, f"series-theme {theme}")
+
+        series_slug = self.series_slug(sermon.series)
+        for slug, marks in self.by_series.get(series_slug or "", {}).items():
+            if "recommended" in marks:
+                add(slug, WEIGHT_RECOMMENDED, "series-recommended")
+            sung = marks.count("sung")
+            if sung:
+                add(slug, WEIGHT_SERIES_HISTORY * min(sung, HISTORY_CAP), f"sung-in-series x{sung}")
+
+        week = week_index(date.fromisoformat(sermon.date))
+        for slug in scores:
+            since = self.sung_weeks_before(slug, week)
+            reason = f"sung {since} weeks before"
+            planned_week = (planned or {}).get(slug)
+            if planned_week is not None and planned_week <= week and (since is None or week - planned_week < since):
+                since = week - planned_week
+                reason = f"suggested {since} weeks before"
+            if since is not None and since < REST_WEEKS:
+                scores[slug] -= PENALTY_RECENT * (REST_WEEKS - since)
+                reasons[slug].append(reason)
+
+        ranked = sorted(scores, key=lambda slug: (-scores[slug], self.titles.get(slug, slug)))[:top]
+        return {
+            "date": sermon.date,
+            "series": sermon.series,
+            "series_slug": series_slug,
+            "sermon_title": sermon.title,
+            "sermon_text": sermon.text,
+            "preacher": sermon.preacher,
+            "themes": themes,
+            "series_themes": series_themes,
+            "suggestions": [
+                {"slug": slug, "title": self.titles.get(slug, slug), "score": round(scores[slug], 2), "reasons": reasons[slug]}
+                for slug in ranked
+            ],
+        }
+
+
+@timed
+def suggest_term(index: SuggestionIndex, sermons: list[Sermon], top: int = TOP) -> list[dict[str, Any]]:
+    """Suggestions for `sermons` in date order; each sermon's first PLANNED_PER_SERMON picks rest like sung songs."""
+    planned: dict[str, int] = {}
+    plan: list[dict[str, Any]] = []
+    for sermon in sorted(sermons, key=lambda sermon: sermon.date):
+        entry = index.suggest(sermon, top, planned)
+        week = week_index(date.fromisoformat(sermon.date))
+        for item in entry["suggestions"][:PLANNED_PER_SERMON]:
+            planned[item["slug"]] = week
+        plan.append(entry)
+    return plan
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Rank song suggestions for upcoming sermons.")
+    parser.add_argument("--root", type=Path, default=ROOT, help="library root containing songs/, services/, series/")
+    parser.add_argument("--csv", type=Path, default=Path("imports") / CSV_NAME, help="sermon plan, relative to --root")
+    parser.add_argument("--from", dest="start", type=date.fromisoformat, help="first sermon date (default: after the last service)")
+    parser.add_argument("--to", dest="end", type=date.fromisoformat, help="last sermon date")
+    parser.add_argument("--top", type=int, default=TOP, help="suggestions per sermon")
+    parser.add_argument("--output", type=Path, default=OUTPUT, help="relative to --root")
+    args = parser.parse_args(argv)
+
+    root = args.root.resolve()
+    csv_path = args.csv if args.csv.is_absolute() else root / args.csv
+    if not csv_path.is_file():
+        print(f"sermon plan not found: {csv_path}", file=sys.stderr)
+        return 1
+
+    records = load_records(root)
+    index = SuggestionIndex(records)
+    if args.start is not None:
+        after = (args.start - timedelta(days=1)).isoformat()
+    else:
+        after = max((service.date for service in records.services if isinstance(service.date, str)), default="")
+    end = args.end.isoformat() if args.end else "9999-12-31"
+    sermons = [sermon for sermon in read_sermons(csv_path) if after < sermon.date <= end]
+
+    plan = suggest_term(index, sermons, args.top)
+    output = args.output if args.output.is_absolute() else root / args.output
+    atomic_write_text(output, json.dumps({"sermons": plan}, indent=2, ensure_ascii=False) + "\n")
+
+    print(f"sermons={len(plan)}")
+    for entry in plan:
+        picks = ", ".join(item["slug"] for item in entry["suggestions"][:5]) or "-"
+        print(f"{entry['date']}  {entry['sermon_title'] or entry['sermon_text']}: {picks}")
+    print(f"output={output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(main))
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Write sharded, precompressed copies of the built data for the web client.
+
+Layout under <data dir>/shards/:
+
+- songs-index.<hash>.json      compact song-list summary (fields + rows)
+- songs/<slug>.<hash>.json     one full song record per file
+- services/<year>.<hash>.json  services grouped by year
+- series.<hash>.json, derived.<hash>.json (derived without generated_at,
+  which moves to the manifest)
+- search-index.<hash>.json     prebuilt search index (see hymnops.search_index)
+- manifest.json                maps logical names to the hashed files
+
+Every shard gets `.gz` (and `.br` when the optional `brotli` package is
+installed) siblings. Shard names carry a content hash, so a shard that did
+not change keeps its name, is not rewritten and stays cached at the CDN;
+only manifest.json needs a short cache lifetime. The manifest is written
+last, and files from the previous manifest are kept one generation so
+clients holding the old manifest can still finish loading.
+
+Usage:
+    python -m hymnops.shards [--root .]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+from hymnops.files import ROOT, atomic_write_bytes
+from hymnops.library import Library
+from hymnops.profiling import run, timed
+from hymnops.search_index import build_search_index
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always produced
+    brotli = None
+
+
+MANIFEST_NAME = "manifest.json"
+HASH_LENGTH = 12
+SUMMARY_FIELDS = [
+    "slug",
+    "title",
+    "aka",
+    "status",
+    "key",
+    "tempo_bpm",
+    "congregational_fit",
+    "dominant_themes",
+    "doctrinal_categories",
+    "emotional_tone",
+    "scriptural_anchors",
+    "writers",
+    "original_artist",
+    "times_sung",
+    "last_sung_computed",
+]
+
+
+def compact(data: Any) -> bytes:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def content_hash(payload: bytes) -> str:
+    return hashlib.sha256(payload).hexdigest()[:HASH_LENGTH]
+
+
+def encodings() -> list[str]:
+    return ["gzip", "br"] if brotli is not None else ["gzip"]
+
+
+class ShardWriter:
+    def __init__(self, shard_dirs: list[Path]) -> None:
+        self.shard_dirs = shard_dirs
+        self.written = 0
+        self.reused = 0
+
+    def put(self, logical: str, data: Any) -> str:
+        """Write `data` as <logical>.<hash>.json (plus compressed siblings) and return its relative path."""
+        payload = compact(data)
+        rel = f"{logical}.{content_hash(payload)}.json"
+        for shard_dir in self.shard_dirs:
+            target = shard_dir / rel
+            if target.exists():
+                self.reused += 1
+                continue
+            atomic_write_bytes(target.with_name(target.name + ".gz"), gzip.compress(payload, 9, mtime=0))
+            if brotli is not None:
+                atomic_write_bytes(target.with_name(target.name + ".br"), brotli.compress(payload))
+            atomic_write_bytes(target, payload)
+            self.written += 1
+        return rel
+
+
+def song_summary(library: Library) -> dict[str, Any]:
+    rows = [[song[field] for field in SUMMARY_FIELDS] for song in library.sorted_songs()]
+    return {"fields": SUMMARY_FIELDS, "rows": rows}
+
+
+def services_by_year(library: Library) -> dict[str, list[dict[str, Any]]]:
+    grouped: dict[str, list[dict[str, Any]]] = {}
+    for service in library.sorted_services():
+        grouped.setdefault(service["date"][:4], []).append(service)
+    return grouped
+
+
+def manifest_files(manifest: dict[str, Any]) -> set[str]:
+    files = {manifest.get(name) for name in ("summary", "series", "derived", "search")}
+    files.update((manifest.get("songs") or {}).values())
+    files.update((manifest.get("services") or {}).values())
+    return {f for f in files if isinstance(f, str)}
+
+
+def read_manifest(shard_dir: Path) -> dict[str, Any]:
+    try:
+        return json.loads((shard_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def prune(shard_dir: Path, keep: set[str]) -> int:
+    removed = 0
+    for path in shard_dir.rglob("*.json*"):
+        rel = path.relative_to(shard_dir).as_posix()
+        if rel == MANIFEST_NAME or path.name.startswith("."):
+            continue
+        base = rel.removesuffix(".gz").removesuffix(".br")
+        if base not in keep:
+            path.unlink()
+            removed += 1
+    return removed
+
+
+@timed
+def write_shards(library: Library, shard_dirs: list[Path]) -> tuple[dict[str, Any], dict[str, int]]:
+    writer = ShardWriter(shard_dirs)
+    derived = library.derived()
+    generated_at = derived.pop("generated_at")
+    manifest: dict[str, Any] = {
+        "version": 1,
+        "generated_at": generated_at,
+        "encodings": encodings(),
+        "summary": writer.put("songs-index", song_summary(library)),
+        "songs": {song["slug"]: writer.put(f"songs/{song['slug']}", song) for song in library.sorted_songs()},
+        "services": {year: writer.put(f"services/{year}", items) for year, items in services_by_year(library).items()},
+        "series": writer.put("series", library.sorted_series()),
+        "derived": writer.put("derived", derived),
+        "search": writer.put("search-index", build_search_index(library.sorted_songs())),
+    }
+
+    keep = manifest_files(manifest)
+    removed = 0
+    for shard_dir in shard_dirs:
+        previous = manifest_files(read_manifest(shard_dir))
+        atomic_write_bytes(shard_dir / MANIFEST_NAME, json.dumps(manifest, indent=2, ensure_ascii=False).encode("utf-8"))
+        removed += prune(shard_dir, keep | previous)
+
+    return manifest, {"written": writer.written, "reused": writer.reused, "removed": removed}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Write content-hashed, precompressed data shards.")
+    parser.add_argument("--root", type=Path, default=ROOT, help="library root containing songs/, services/, series/")
+    args = parser.parse_args(argv)
+
+    root = args.root.resolve()
+    library = Library(root)
+    library.load()
+    shard_dirs = [root / "public" / "data" / "shards", root / "dist" / "data" / "shards"]
+    manifest, stats = write_shards(library, shard_dirs)
+
+    print(f"songs={len(manifest['songs'])}")
+    print(f"service_years={len(manifest['services'])}")
+    print(f"encodings={','.join(manifest['encodings'])}")
+    print(f"written={stats['written']} reused={stats['reused']} removed={stats['removed']}")
+    print(f"manifest={shard_dirs[0] / MANIFEST_NAME}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(main))
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic HymnOps library (songs/, services/, series/) for benchmarks.
+
+Output follows DATA_MODEL.md and is deterministic for a given seed and end
+date, so two runs at the same scale produce byte-identical trees. The
+service history ends on the last Sunday on or before `--end` (default:
+today) and spans at most SPAN_WEEKS weeks; larger histories hold several
+services per week (Sunday, then Saturday, Friday, ...), so now-relative
+statistics such as rotation health stay meaningful at every scale. Titles, writers and
+themes are drawn from skewed distributions so that a handful of writers and
+songs dominate, as in real service history. No lyrics are generated.
+
+Usage:
+    python -m hymnops.synth OUT_DIR [--songs 1000] [--services N] [--series N] [--seed 0] [--end YYYY-MM-DD]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+
+from hymnops.frontmatter import SERIES_KEY_ORDER, SERVICE_KEY_ORDER, dump_frontmatter
+from hymnops.profiling import run
+
+
+THEMES = [
+    "Adoration", "Awe", "Confession", "Repentance", "Assurance", "Grace", "Mercy", "Holiness",
+    "Sovereignty", "Providence", "Faithfulness", "Covenant", "Identity in Christ", "Union with Christ",
+    "Discipleship", "Mission", "Evangelism", "Justice", "Compassion", "Lament", "Suffering", "Hope",
+    "Resurrection", "Second Coming", "Kingdom of God", "Cross", "Atonement", "Forgiveness",
+    "Sanctification", "Spiritual Warfare", "Prayer", "Thanksgiving", "Joy", "Peace", "Contentment",
+    "Guidance", "Communion", "Baptism", "Creation", "Stewardship", "Community", "Sending",
+]
+DOCTRINES = [
+    "Trinity", "Christology", "Pneumatology", "Soteriology", "Ecclesiology", "Eschatology",
+    "Sanctification", "Scripture", "Lament", "Mission", "Prayer", "Worship", "Sacraments", "Providence",
+]
+TONES = [
+    "Joyful", "Reflective", "Penitent", "Triumphant", "Hopeful", "Comforting", "Urgent", "Reverent",
+    "Tender", "Celebratory", "Solemn", "Confident",
+]
+KEYS = ["C", "D", "E", "F", "G", "A", "B", "Bb", "Eb", "Ab", "Db", "F#"]
+TIME_SIGNATURES = ["4/4", "4/4", "4/4", "3/4", "6/8"]
+TITLE_WORDS = [
+    "Amazing", "Grace", "Holy", "King", "Lamb", "Glory", "Cross", "Risen", "Saviour", "Shepherd",
+    "Mercy", "Hope", "Light", "Morning", "Throne", "Kingdom", "Faithful", "Rock", "Refuge", "Fountain",
+    "Crown", "Name", "Praise", "Heaven", "River", "Spirit", "Father", "Love", "Peace", "Hallelujah",
+    "Majesty", "Wonder", "Redeemer", "Beautiful", "Everlasting", "Victory", "Promise", "Word", "Way",
+    "Living", "Great", "Good", "Still", "Stand", "Come", "Behold", "Forever", "Alone", "Above", "All",
+]
+TITLE_LINKS = ["of", "in", "the", "my", "our", "to", "and", "is", "His", "Your"]
+FIRST_NAMES = [
+    "Matt", "Stuart", "Keith", "Kristyn", "Chris", "Ben", "Jonas", "Isaac", "Fanny", "Charles",
+    "William", "Horatio", "Jenn", "Brooke", "Reuben", "Graham", "Sandra", "Paul", "Emily",
+]
+LAST_NAMES = [
+    "Redman", "Townend", "Getty", "Tomlin", "Fielding", "Myrin", "Watts", "Crosby", "Wesley", "Cowper",
+    "Spafford", "Johnson", "Ligertwood", "Morgan", "Kendrick", "McClure", "Baloche", "Hughes", "Zschech", "Bird",
+]
+BOOKS = [
+    "Genesis", "Exodus", "Leviticus", "Psalm", "Isaiah", "Jeremiah", "Malachi", "Matthew", "Mark", "Luke",
+    "John", "Acts", "Romans", "Ephesians", "Philippians", "Colossians", "Hebrews", "1 Peter", "Revelation",
+]
+PREACHERS = ["Lincoln Mao", "Joshua Tay", "Daniel Lim", "Sarah Ong", "Guest Speaker"]
+USAGE_SLOTS = ["kid-friendly", "main", "main", "main", "response"]
+
+SPAN_WEEKS = 520
+DAYS_PER_WEEK = 7
+
+
+def last_sunday(value: date) -> date:
+    return value - timedelta(days=(value.weekday() + 1) % 7)
+
+
+def service_dates(count: int, end: date) -> list[date]:
+    """`count` distinct dates ending on the last Sunday before `end`, oldest week first."""
+    per_week = min(DAYS_PER_WEEK, max(1, -(-count // SPAN_WEEKS)))
+    weeks = -(-count // per_week)
+    first_sunday = last_sunday(end) - timedelta(weeks=weeks - 1)
+    return [first_sunday + timedelta(weeks=i // per_week, days=-(i % per_week)) for i in range(count)]
+
+
+def slugify(value: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-")
+
+
+def zipf_pick(rng: random.Random, items: list[Any], skew: float = 1.1) -> Any:
+    """Pick with probability roughly proportional to 1 / rank**skew."""
+    idx = int(len(items) * (rng.random() ** (1 + skew))) if items else 0
+    return items[min(idx, len(items) - 1)]
+
+
+def make_writers(count: int, rng: random.Random) -> list[str]:
+    names: list[str] = []
+    seen: set[str] = set()
+    while len(names) < count:
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        if name in seen:
+            name = f"{name} {len(names)}"
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+def make_title(rng: random.Random) -> str:
+    words = [rng.choice(TITLE_WORDS)]
+    for _ in range(rng.randint(0, 3)):
+        words.append(rng.choice(TITLE_LINKS))
+        words.append(rng.choice(TITLE_WORDS))
+    return " ".join(words)
+
+
+def pick_some(rng: random.Random, pool: list[str], low: int, high: int) -> list[str]:
+    return rng.sample(pool, rng.randint(low, high))
+
+
+def song_frontmatter(title: str, slug: str, writers: list[str], rng: random.Random) -> dict[str, Any]:
+    has_ccli = rng.random() < 0.7
+    ccli = str(rng.randint(10000, 7999999)) if has_ccli else None
+    return {
+        "title": title,
+        "slug": slug,
+        "aka": [f"{title} (Live)"] if rng.random() < 0.1 else [],
+        "ccli_number": ccli,
+        "songselect_url": f"https://songselect.ccli.com/songs/{ccli}/{slug}" if ccli else None,
+        "lyrics_source": "SongSelect" if ccli else "Unknown",
+        "lyrics_hint": "",
+        "original_artist": zipf_pick(rng, writers) if rng.random() < 0.8 else None,
+        "writers": sorted({zipf_pick(rng, writers) for _ in range(rng.randint(1, 3))}) if has_ccli else [],
+        "publisher": None,
+        "year": rng.randint(1700, 2025) if rng.random() < 0.5 else None,
+        "tempo_bpm": rng.randint(56, 150) if rng.random() < 0.85 else None,
+        "key": rng.choice(KEYS) if rng.random() < 0.9 else None,
+        "time_signature": rng.choice(TIME_SIGNATURES),
+        "congregational_fit": rng.randint(1, 5) if rng.random() < 0.4 else None,
+        "vocal_range": None,
+        "dominant_themes": pick_some(rng, THEMES, 1, 4),
+        "doctrinal_categories": pick_some(rng, DOCTRINES, 1, 3),
+        "emotional_tone": pick_some(rng, TONES, 0, 2),
+        "scriptural_anchors": [f"{rng.choice(BOOKS)} {rng.randint(1, 20)}:{rng.randint(1, 30)}"] if rng.random() < 0.5 else [],
+        "theological_summary": "Synthetic benchmark entry; non-lyrical summary placeholder.",
+        "arrangement_notes": None,
+        "slides_path": None,
+        "tags": ["synthetic"],
+        "last_sung_override": None,
+        "status": "archive" if rng.random() < 0.1 else "active",
+        "licensing_notes": None,
+        "language": "en",
+        "meter": None,
+    }
+
+
+SONG_BODY = """
+## Notes
+
+Synthetic benchmark entry. Arrangement notes only (no lyrics).
+
+## Pastoral Use
+
+Synthetic benchmark entry. Ministry guidance only (no lyrics).
+"""
+
+
+def generate_library(
+    out_dir: Path,
+    songs: int = 1000,
+    services: int | None = None,
+    series: int | None = None,
+    seed: int = 0,
+    end: date | None = None,
+) -> dict[str, int]:
+    rng = random.Random(seed)
+    services = services if services is not None else max(10, songs // 2)
+    series = series if series is not None else max(2, services // 12)
+
+    songs_dir = out_dir / "songs"
+    services_dir = out_dir / "services"
+    series_dir = out_dir / "series"
+    for directory in (songs_dir, services_dir, series_dir):
+        directory.mkdir(parents=True, exist_ok=True)
+
+    writers = make_writers(max(20, songs // 8), rng)
+    slugs: list[str] = []
+    seen: set[str] = set()
+    for _ in range(songs):
+        title = make_title(rng)
+        slug = slugify(title)
+        if slug in seen:
+            slug = f"{slug}-{len(slugs)}"
+            title = f"{title} ({len(slugs)})"
+        seen.add(slug)
+        slugs.append(slug)
+        fm = song_frontmatter(title, slug, writers, rng)
+        (songs_dir / f"{slug}.md").write_text(dump_frontmatter(fm) + SONG_BODY, encoding="utf-8")
+
+    # A core repertoire gets sung far more often than the long tail.
+    rotation = slugs[:]
+    rng.shuffle(rotation)
+    series_slugs = [f"synthetic-series-{i + 1}" for i in range(series)]
+    services_per_series = max(1, services // series)
+    days = service_dates(services, end or date.today())
+    series_days: dict[int, list[date]] = {}
+
+    for i, day in enumerate(days):
+        series_idx = min(i // services_per_series, series - 1)
+        picked: list[str] = []
+        while len(picked) < 5:
+            slug = zipf_pick(rng, rotation, skew=1.6)
+            if slug not in picked:
+                picked.append(slug)
+        series_days.setdefault(series_idx, []).append(day)
+        fm = {
+            "date": day.isoformat(),
+            "series_slug": series_slugs[series_idx],
+            "sermon_title": make_title(rng),
+            "sermon_text": f"{rng.choice(BOOKS)} {rng.randint(1, 20)}:1 - {rng.randint(2, 30)}",
+            "preacher": rng.choice(PREACHERS),
+            "songs": [
+                {"slug": slug, "usage": [usage], "key": rng.choice(KEYS) if rng.random() < 0.3 else None, "notes": None}
+                for slug, usage in zip(picked, USAGE_SLOTS)
+            ],
+        }
+        text = dump_frontmatter(fm, SERVICE_KEY_ORDER) + "\n## Service Notes\n\nSynthetic benchmark service.\n"
+        (services_dir / f"{fm['date']}.md").write_text(text, encoding="utf-8")
+
+    for idx, slug in enumerate(series_slugs):
+        # Series without services (more series than services) get an empty range.
+        first, last = (min(series_days[idx]), max(series_days[idx])) if idx in series_days else (None, None)
+        fm = {
+            "title": f"Synthetic Series {idx + 1}",
+            "slug": slug,
+            "date_range": [first.isoformat() if first else None, last.isoformat() if last else None],
+            "description": None,
+            "recommended": rng.sample(slugs, min(5, len(slugs))),
+        }
+        text = dump_frontmatter(fm, SERIES_KEY_ORDER) + "\n## Notes\n\nSynthetic benchmark series.\n"
+        (series_dir / f"{slug}.md").write_text(text, encoding="utf-8")
+
+    return {"songs": songs, "services": services, "series": series}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic HymnOps library tree.")
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--songs", type=int, default=1000)
+    parser.add_argument("--services", type=int, default=None, help="default: songs / 2")
+    parser.add_argument("--series", type=int, default=None, help="default: services / 12")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--end", type=date.fromisoformat, default=None, help="history ends on or before this date (default: today)")
+    args = parser.parse_args(argv)
+
+    counts = generate_library(args.out_dir, args.songs, args.services, args.series, args.seed, args.end)
+    for name, count in counts.items():
+        print(f"{name}={count}")
+    print(f"root={args.out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(main))
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Validate songs/, services/ and series/ frontmatter and cross-references.
+
+Python port of scripts/validate-data.ts with the same rules and messages.
+Without arguments the whole library is checked. Given file paths, only
+those files are parsed and checked; references to songs and series are
+resolved against the file names in songs/ and series/ (slugs must match
+file names, so no other file needs to be read).
+
+Usage:
+    python -m hymnops validate [--root .] [songs/foo.md services/2024-03-17.md ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+from hymnops.files import ROOT, list_markdown_files
+from hymnops.frontmatter import parse_frontmatter
+from hymnops.profiling import run
+
+
+SONG_REQUIRED_KEYS = [
+    "title",
+    "slug",
+    "aka",
+    "ccli_number",
+    "songselect_url",
+    "lyrics_source",
+    "original_artist",
+    "writers",
+    "publisher",
+    "year",
+    "tempo_bpm",
+    "key",
+    "time_signature",
+    "congregational_fit",
+    "vocal_range",
+    "dominant_themes",
+    "doctrinal_categories",
+    "emotional_tone",
+    "scriptural_anchors",
+    "theological_summary",
+    "arrangement_notes",
+    "slides_path",
+    "tags",
+    "last_sung_override",
+    "status",
+]
+SERVICE_REQUIRED_KEYS = ["date", "series_slug", "sermon_title", "sermon_text", "preacher", "songs"]
+SERIES_REQUIRED_KEYS = ["title", "slug", "date_range", "description", "recommended"]
+ALLOWED_SERVICE_USAGE = {"kid-friendly", "main", "response"}
+
+DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+DIGITS_RE = re.compile(r"^\d+$")
+SONGSELECT_URL_RE = re.compile(r"^https://songselect\.ccli\.com/songs/(\d+)(/[^\s?#]+)?/?$")
+SECTION_MARKER_RE = re.compile(r"^\s*(verse|chorus|bridge|tag|refrain)\b[\s:\d-]*$", re.IGNORECASE)
+MARKER_KEYWORD_RE = re.compile(r"\b(verse|chorus|bridge|tag|refrain)\b", re.IGNORECASE)
+PUNCTUATION_RE = re.compile(r"[^\w\s]")
+SPACES_RE = re.compile(r"\s+")
+
+
+def is_string(value: Any) -> bool:
+    return isinstance(value, str)
+
+
+def is_string_or_null(value: Any) -> bool:
+    return value is None or isinstance(value, str)
+
+
+def is_number_or_null(value: Any) -> bool:
+    return value is None or (isinstance(value, (int, float)) and not isinstance(value, bool))
+
+
+def is_string_array(value: Any) -> bool:
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+
+def is_date_ymd(value: str) -> bool:
+    return bool(DATE_RE.match(value))
+
+
+def detect_lyric_like_content(markdown: str) -> list[str]:
+    reasons: list[str] = []
+    trimmed = [line.strip() for line in re.split(r"\r?\n", markdown) if line.strip()]
+
+    if any(SECTION_MARKER_RE.match(line) for line in trimmed):
+        reasons.append("contains lyric section markers (Verse/Chorus/Bridge/Tag/Refrain)")
+    if MARKER_KEYWORD_RE.search(markdown):
+        reasons.append("contains lyric marker keywords")
+
+    def is_short(line: str) -> bool:
+        return len(line) < 60 and not line.startswith("#") and not line.startswith("- ")
+
+    short_lines = [line for line in trimmed if is_short(line)]
+    if len(short_lines) > 40:
+        reasons.append("contains more than 40 short line-broken lines (<60 chars)")
+
+    counts: Counter[str] = Counter()
+    for line in short_lines:
+        normalized = SPACES_RE.sub(" ", PUNCTUATION_RE.sub("", line.lower())).strip()
+        if len(normalized) >= 8:
+            counts[normalized] += 1
+    if any(count >= 3 for count in counts.values()):
+        reasons.append("contains repeated short lines that resemble chorus/refrain structure")
+
+    short_run = 0
+    max_short_run = 0
+    for line in trimmed:
+        short_run = short_run + 1 if is_short(line) else 0
+        max_short_run = max(max_short_run, short_run)
+    if max_short_run >= 16:
+        reasons.append("contains a long contiguous block of short line-broken text")
+
+    return reasons
+
+
+def check_required_keys(fm: dict[str, Any], required: list[str], label: str, errors: list[str], where: str) -> None:
+    for key in required:
+        if key not in fm:
+            errors.append(f'{where}: missing required {label} field "{key}"')
+
+
+def validate_song(path: Path, fm: dict[str, Any], body: str, errors: list[str]) -> str | None:
+    where = str(path)
+    name = path.stem
+    check_required_keys(fm, SONG_REQUIRED_KEYS, "song", errors, where)
+
+    if not is_string(fm.get("title")):
+        errors.append(f'{where}: "title" must be a string')
+    slug = fm.get("slug")
+    if not is_string(slug):
+        errors.append(f'{where}: "slug" must be a string')
+    elif slug != name:
+        errors.append(f'{where}: "slug" must match filename "{name}"')
+    if not is_string_array(fm.get("aka")):
+        errors.append(f'{where}: "aka" must be a string array')
+    ccli = fm.get("ccli_number")
+    if not is_string(ccli) or not DIGITS_RE.match(ccli):
+        errors.append(f'{where}: "ccli_number" must be a numeric string')
+    url = fm.get("songselect_url")
+    if not is_string(url):
+        errors.append(f'{where}: "songselect_url" must be a string')
+    else:
+        match = SONGSELECT_URL_RE.match(url)
+        if not match:
+            errors.append(f'{where}: "songselect_url" must be an official SongSelect song URL')
+        elif is_string(ccli) and match.group(1) != ccli:
+            errors.append(f'{where}: "songselect_url" song id must match "ccli_number"')
+    if fm.get("lyrics_source") not in ("SongSelect", "Other", "Unknown"):
+        errors.append(f'{where}: "lyrics_source" must be one of SongSelect | Other | Unknown')
+    if "lyrics_hint" in fm and fm["lyrics_hint"] not in ("", None):
+        errors.append(f'{where}: "lyrics_hint" must be empty string or null (avoid storing lyric excerpts)')
+
+    for key in ("original_artist", "publisher"):
+        if not is_string_or_null(fm.get(key)):
+            errors.append(f'{where}: "{key}" must be string or null')
+    if not is_string_array(fm.get("writers")):
+        errors.append(f'{where}: "writers" must be a string array')
+    for key in ("year", "tempo_bpm"):
+        if not is_number_or_null(fm.get(key)):
+            errors.append(f'{where}: "{key}" must be number or null')
+    for key in ("key", "time_signature"):
+        if not is_string_or_null(fm.get(key)):
+            errors.append(f'{where}: "{key}" must be string or null')
+    fit = fm.get("congregational_fit")
+    if not is_number_or_null(fit):
+        errors.append(f'{where}: "congregational_fit" must be number or null')
+    elif fit is not None and not 1 <= fit <= 5:
+        errors.append(f'{where}: "congregational_fit" must be between 1 and 5')
+    if not is_string_or_null(fm.get("vocal_range")):
+        errors.append(f'{where}: "vocal_range" must be string or null')
+    for key in ("dominant_themes", "doctrinal_categories", "emotional_tone", "scriptural_anchors"):
+        if not is_string_array(fm.get(key)):
+            errors.append(f'{where}: "{key}" must be a string array')
+    if not is_string(fm.get("theological_summary")):
+        errors.append(f'{where}: "theological_summary" must be a string')
+    for key in ("arrangement_notes", "slides_path"):
+        if not is_string_or_null(fm.get(key)):
+            errors.append(f'{where}: "{key}" must be string or null')
+    if not is_string_array(fm.get("tags")):
+        errors.append(f'{where}: "tags" must be a string array')
+    override = fm.get("last_sung_override")
+    if not is_string_or_null(override):
+        errors.append(f'{where}: "last_sung_override" must be string or null')
+    elif is_string(override) and not is_date_ymd(override):
+        errors.append(f'{where}: "last_sung_override" must be YYYY-MM-DD')
+    if fm.get("status") not in ("active", "archive"):
+        errors.append(f'{where}: "status" must be active | archive')
+
+    for key in ("licensing_notes", "language", "meter"):
+        if key in fm and not is_string_or_null(fm[key]):
+            errors.append(f'{where}: "{key}" must be string or null')
+
+    for reason in detect_lyric_like_content(body):
+        errors.append(f"{where}: lyric-like content flagged: {reason}")
+
+    return slug if is_string(slug) else None
+
+
+def validate_service(path: Path, fm: dict[str, Any], errors: list[str]) -> tuple[list[str], str | None]:
+    where = str(path)
+    name = path.stem
+    check_required_keys(fm, SERVICE_REQUIRED_KEYS, "service", errors, where)
+
+    service_date = fm.get("date")
+    if not is_string(service_date):
+        errors.append(f'{where}: "date" must be a string')
+    elif not is_date_ymd(service_date):
+        errors.append(f'{where}: "date" must be YYYY-MM-DD')
+    elif service_date != name:
+        errors.append(f'{where}: "date" must match filename "{name}"')
+
+    for key in ("series_slug", "sermon_title", "sermon_text", "preacher"):
+        if not is_string_or_null(fm.get(key)):
+            errors.append(f'{where}: "{key}" must be string or null')
+
+    refs: list[str] = []
+    songs = fm.get("songs")
+    if not isinstance(songs, list):
+        errors.append(f'{where}: "songs" must be an array')
+    else:
+        for index, item in enumerate(songs):
+            if not isinstance(item, dict):
+                errors.append(f"{where}: songs[{index}] must be an object")
+                continue
+            if not is_string(item.get("slug")):
+                errors.append(f"{where}: songs[{index}].slug must be a string")
+            else:
+                refs.append(item["slug"])
+            usage = item.get("usage")
+            if not is_string_array(usage):
+                errors.append(f"{where}: songs[{index}].usage must be a string array")
+            else:
+                if len(usage) != 1:
+                    errors.append(f"{where}: songs[{index}].usage must contain exactly one category")
+                invalid = [entry for entry in usage if entry not in ALLOWED_SERVICE_USAGE]
+                if invalid:
+                    errors.append(f"{where}: songs[{index}].usage contains invalid category values: {', '.join(invalid)}")
+            for key in ("key", "notes"):
+                if not is_string_or_null(item.get(key)):
+                    errors.append(f"{where}: songs[{index}].{key} must be string or null")
+
+    series_slug = fm.get("series_slug")
+    return refs, series_slug if is_string(series_slug) else None
+
+
+def validate_series(path: Path, fm: dict[str, Any], errors: list[str]) -> tuple[str | None, list[str]]:
+    where = str(path)
+    name = path.stem
+    check_required_keys(fm, SERIES_REQUIRED_KEYS, "series", errors, where)
+
+    if not is_string(fm.get("title")):
+        errors.append(f'{where}: "title" must be a string')
+    slug = fm.get("slug")
+    if not is_string(slug):
+        errors.append(f'{where}: "slug" must be a string')
+    elif slug != name:
+        errors.append(f'{where}: "slug" must match filename "{name}"')
+
+    date_range = fm.get("date_range")
+    if not isinstance(date_range, list) or len(date_range) != 2 or not all(is_string_or_null(v) for v in date_range):
+        errors.append(f'{where}: "date_range" must be [string|null, string|null]')
+    else:
+        for index, value in enumerate(date_range):
+            if is_string(value) and not is_date_ymd(value):
+                errors.append(f"{where}: date_range[{index}] must be YYYY-MM-DD or null")
+
+    if not is_string_or_null(fm.get("description")):
+        errors.append(f'{where}: "description" must be string or null')
+
+    recommended = fm.get("recommended")
+    if not is_string_array(recommended):
+        errors.append(f'{where}: "recommended" must be a string array')
+        recommended = []
+
+    return (slug if is_string(slug) else None), list(recommended)
+
+
+def read(path: Path, errors: list[str]) -> tuple[dict[str, Any], str] | None:
+    try:
+        return parse_frontmatter(path.read_text(encoding="utf-8"))
+    except (OSError, UnicodeDecodeError, ValueError) as exc:
+        errors.append(f"{path}: {exc}")
+        return None
+
+
+def validate_files(
+    song_files: list[Path],
+    service_files: list[Path],
+    series_files: list[Path],
+    known_songs: set[str] | None = None,
+    known_series: set[str] | None = None,
+) -> list[str]:
+    """Validate the given files; refs resolve against the parsed slugs plus `known_*`."""
+    errors: list[str] = []
+
+    song_slugs: set[str] = set()
+    for path in song_files:
+        parsed = read(path, errors)
+        if parsed is None:
+            continue
+        slug = validate_song(path, *parsed, errors)
+        if slug:
+            if slug in song_slugs:
+                errors.append(f'{path}: duplicate song slug "{slug}"')
+            song_slugs.add(slug)
+
+    series_slugs: set[str] = set()
+    recommended_refs: list[tuple[Path, str]] = []
+    for path in series_files:
+        parsed = read(path, errors)
+        if parsed is None:
+            continue
+        slug, recommended = validate_series(path, parsed[0], errors)
+        if slug:
+            if slug in series_slugs:
+                errors.append(f'{path}: duplicate series slug "{slug}"')
+            series_slugs.add(slug)
+        recommended_refs.extend((path, ref) for ref in recommended)
+
+    song_refs: list[tuple[Path, str]] = []
+    series_refs: list[tuple[Path, str]] = []
+    for path in service_files:
+        parsed = read(path, errors)
+        if parsed is None:
+            continue
+        refs, series_slug = validate_service(path, parsed[0], errors)
+        song_refs.extend((path, ref) for ref in refs)
+        if series_slug:
+            series_refs.append((path, series_slug))
+
+    all_songs = song_slugs | (known_songs or set())
+    all_series = series_slugs | (known_series or set())
+    for path, ref in song_refs:
+        if ref not in all_songs:
+            errors.append(f'{path}: references missing song slug "{ref}"')
+    for path, ref in recommended_refs:
+        if ref not in all_songs:
+            errors.append(f'{path}: recommended references missing song slug "{ref}"')
+    for path, ref in series_refs:
+        if ref not in all_series:
+            errors.append(f'{path}: references missing series slug "{ref}"')
+
+    return errors
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Validate library frontmatter and cross-references.")
+    parser.add_argument("--root", type=Path, default=ROOT, help="library root containing songs/, services/, series/")
+    parser.add_argument("files", nargs="*", type=Path, help="only validate these files")
+    args = parser.parse_args(argv)
+
+    root = args.root.resolve()
+    songs_dir, services_dir, series_dir = root / "songs", root / "services", root / "series"
+
+    if args.files:
+        groups: dict[Path, list[Path]] = {songs_dir: [], services_dir: [], series_dir: []}
+        for path in args.files:
+            group = groups.get(path.resolve().parent)
+            if group is None:
+                print(f"{path}: not inside songs/, services/ or series/", file=sys.stderr)
+                return 2
+            group.append(path)
+        song_files, service_files, series_files = groups[songs_dir], groups[services_dir], groups[series_dir]
+        known_songs = {path.stem for path in list_markdown_files(songs_dir)}
+        known_series = {path.stem for path in list_markdown_files(series_dir)}
+    else:
+        song_files = list_markdown_files(songs_dir)
+        service_files = list_markdown_files(services_dir)
+        series_files = list_markdown_files(series_dir)
+        known_songs = known_series = None
+
+    errors = validate_files(song_files, service_files, series_files, known_songs, known_series)
+    if errors:
+        print("Validation failed with the following issues:", file=sys.stderr)
+        for error in errors:
+            print(f"- {error}", file=sys.stderr)
+        return 1
+
+    print(f"Validation passed ({len(song_files)} songs, {len(service_files)} services, {len(series_files)} series).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(main))
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Watch songs/, services/ and series/ and keep public/data/*.json current.
+
+The library is parsed once at startup; after that each saved file is fed to
+`Library.apply_changes`, which re-derives only the records that depend on
+it. Only outputs whose content actually changed are rewritten, atomically;
+search-index.json is rebuilt whenever songs.json changes.
+
+Uses inotify on Linux and falls back to mtime polling elsewhere (or with
+`--poll`).
+
+With `--shards`, the content-hashed shards from hymnops.shards are
+refreshed alongside the monolithic files.
+
+Usage:
+    python -m hymnops.watch [--poll] [--interval 0.5] [--once] [--shards]
+"""
+
+from __future__ import annotations
+
+import argparse
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+from hymnops.files import ROOT, atomic_write_text, is_library_file
+from hymnops.library import OUTPUT_NAMES, Library, dumps
+from hymnops.profiling import run
+from hymnops.search_index import write_search_index
+from hymnops.shards import write_shards
+
+
+DEBOUNCE_SECONDS = 0.02
+POLL_INTERVAL_SECONDS = 0.5
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class WatchOverflow(Exception):
+    """The kernel dropped events; the caller should reload from scratch."""
+
+
+class InotifyWatcher:
+    def __init__(self, directories: list[Path]) -> None:
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or not libc_name:
+            raise OSError(errno.ENOSYS, "inotify is not available on this platform")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify is not available in libc")
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self.dirs: dict[int, Path] = {}
+        for directory in directories:
+            if not directory.is_dir():
+                continue
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                os.close(self.fd)
+                raise OSError(err, os.strerror(err), str(directory))
+            self.dirs[wd] = directory
+
+    def _drain(self, changed: set[Path]) -> None:
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return
+            offset = 0
+            while offset < len(buf):
+                wd, mask, _cookie, length = EVENT_HEADER.unpack_from(buf, offset)
+                offset += EVENT_HEADER.size
+                raw_name = buf[offset : offset + length].rstrip(b"\0")
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    raise WatchOverflow()
+                directory = self.dirs.get(wd)
+                if directory is not None and raw_name:
+                    path = directory / os.fsdecode(raw_name)
+                    if is_library_file(path):
+                        changed.add(path)
+
+    def wait(self) -> set[Path]:
+        changed: set[Path] = set()
+        select.select([self.fd], [], [])
+        self._drain(changed)
+        deadline = time.monotonic() + DEBOUNCE_SECONDS
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if not ready:
+                break
+            self._drain(changed)
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    def __init__(self, directories: list[Path], interval: float = POLL_INTERVAL_SECONDS) -> None:
+        self.directories = directories
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        state: dict[Path, tuple[int, int]] = {}
+        for directory in self.directories:
+            if not directory.is_dir():
+                continue
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    path = directory / entry.name
+                    if not is_library_file(path):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    state[path] = (st.st_mtime_ns, st.st_size)
+        return state
+
+    def wait(self) -> set[Path]:
+        while True:
+            time.sleep(self.interval)
+            current = self._scan()
+            changed = {p for p in current.keys() | self.snapshot.keys() if current.get(p) != self.snapshot.get(p)}
+            self.snapshot = current
+            if changed:
+                return changed
+
+    def close(self) -> None:
+        pass
+
+
+class OutputWriter:
+    """Writes rendered outputs, skipping any whose content has not changed."""
+
+    def __init__(self, output_dirs: list[Path]) -> None:
+        self.output_dirs = output_dirs
+        self.last: dict[str, Any] = {}
+
+    def write(self, library: Library, names: set[str] | tuple[str, ...]) -> list[str]:
+        written: list[str] = []
+        for name in OUTPUT_NAMES:
+            if name not in names:
+                continue
+            if name == "derived.json":
+                derived = library.derived()
+                comparable = {k: v for k, v in derived.items() if k != "generated_at"}
+                if self.last.get(name) == comparable:
+                    continue
+                self.last[name] = comparable
+                payload = dumps(derived)
+            else:
+                payload = library.render(name)
+                if self.last.get(name) == payload:
+                    continue
+                self.last[name] = payload
+            for output_dir in self.output_dirs:
+                atomic_write_text(output_dir / name, payload)
+            written.append(name)
+        return written
+
+
+def make_watcher(directories: list[Path], force_poll: bool, interval: float) -> InotifyWatcher | PollingWatcher:
+    if not force_poll:
+        try:
+            return InotifyWatcher(directories)
+        except OSError as exc:
+            print(f"inotify unavailable ({exc}); falling back to polling")
+    return PollingWatcher(directories, interval)
+
+
+def full_build(root: Path, writer: OutputWriter) -> Library:
+    started = time.perf_counter()
+    library = Library(root)
+    library.load()
+    writer.last.clear()
+    writer.write(library, OUTPUT_NAMES)
+    write_search_index(library, writer.output_dirs)
+    elapsed = (time.perf_counter() - started) * 1000
+    print(
+        f"Built indexes ({len(library.song_records)} songs, {len(library.services)} services, "
+        f"{len(library.series)} series) in {elapsed:.1f} ms."
+    )
+    return library
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Incrementally rebuild public/data/*.json on file changes.")
+    parser.add_argument("--root", type=Path, default=ROOT, help="library root containing songs/, services/, series/")
+    parser.add_argument("--poll", action="store_true", help="use mtime polling instead of inotify")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL_SECONDS, help="polling interval in seconds")
+    parser.add_argument("--once", action="store_true", help="build once and exit")
+    parser.add_argument("--shards", action="store_true", help="also refresh public/data/shards/")
+    args = parser.parse_args(argv)
+
+    root = args.root.resolve()
+    writer = OutputWriter([root / "public" / "data", root / "dist" / "data"])
+    shard_dirs = [root / "public" / "data" / "shards", root / "dist" / "data" / "shards"]
+    library = full_build(root, writer)
+    if args.shards:
+        write_shards(library, shard_dirs)
+    if args.once:
+        return 0
+
+    directories = [library.songs_dir, library.services_dir, library.series_dir]
+    watcher = make_watcher(directories, args.poll, args.interval)
+    print(f"Watching {', '.join(d.name + '/' for d in directories)} (Ctrl-C to stop)")
+
+    try:
+        while True:
+            try:
+                changed = watcher.wait()
+            except WatchOverflow:
+                print("event queue overflowed; rebuilding from scratch")
+                library = full_build(root, writer)
+                if args.shards:
+                    write_shards(library, shard_dirs)
+                continue
+
+            started = time.perf_counter()
+            dirty: set[str] = set()
+            for path in sorted(changed):
+                try:
+                    dirty |= library.apply_changes([path])
+                except (OSError, UnicodeDecodeError, ValueError) as exc:
+                    print(f"skipped {path.relative_to(root)}: {exc}")
+            written = writer.write(library, dirty)
+            if "songs.json" in written:
+                write_search_index(library, writer.output_dirs)
+            if args.shards and written:
+                write_shards(library, shard_dirs)
+            elapsed = (time.perf_counter() - started) * 1000
+            names = ", ".join(written) if written else "nothing"
+            print(f"{len(changed)} file(s) changed -> wrote {names} in {elapsed:.1f} ms")
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        watcher.close()
+
+
+if __name__ == "__main__":
+    sys.exit(run(main))
@@ -0,0 +1,53 @@
+from pathlib import Path
+
+from hymnops.columnar import export, load_manifest, read_columns
+
+
+SERVICE = """---
+date: "{date}"
+series_slug: null
+sermon_title: null
+sermon_text: null
+preacher: null
+songs:
+  - slug: "{slug}"
+    usage: ["main"]
+    key: null
+    notes: null
+---
+"""
+
+
+def write_service(services: Path, name: str, date: str, slug: str) -> None:
+    (services / name).write_text(SERVICE.format(date=date, slug=slug), encoding="utf-8")
+
+
+def test_unreadable_service_files_are_skipped_and_reported(tmp_path: Path) -> None:
+    services = tmp_path / "services"
+    services.mkdir()
+    write_service(services, "2024-12-29.md", "2024-12-29", "joy")
+    write_service(services, "2025-01-05.md", "2025-01-05", "grace")
+    (services / "2025-01-12.md").write_bytes(b"---\ndate: \"2025-01-12\"\npreacher: \"Ren\xe9\"\n---\n")
+    (services / "2025-01-19.md").write_text("no frontmatter\n", encoding="utf-8")
+    output = tmp_path / "history"
+
+    stats = export(tmp_path, output, "json")
+    assert stats["services_skipped"] == 2
+    assert read_columns(output)["slug"] == ["joy", "grace"]
+    files = load_manifest(output)["files"]
+    assert files["2025-01-12.md"]["year"] is None and "utf-8" in files["2025-01-12.md"]["error"]
+    assert files["2025-01-19.md"]["year"] is None
+
+    assert export(tmp_path, output, "json")["partitions_written"] == 0
+    write_service(services, "2025-01-12.md", "2025-01-12", "hope")
+    stats = export(tmp_path, output, "json")
+    assert stats == {"partitions_written": 1, "partitions_kept": 1, "rows": 3, "services_skipped": 1}
+
+
+def test_service_is_partitioned_by_its_date_field(tmp_path: Path) -> None:
+    services = tmp_path / "services"
+    services.mkdir()
+    write_service(services, "2025-01-05-late-entry.md", "2024-12-29", "joy")
+    output = tmp_path / "history"
+    export(tmp_path, output, "json")
+    assert list(load_manifest(output)["partitions"]) == ["2024"]
@@ -0,0 +1,63 @@
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+from hymnops.library import OUTPUT_NAMES, load_library
+
+
+NOW = datetime(2025, 3, 30, tzinfo=timezone.utc)
+
+SONG = """---
+title: "{title}"
+slug: "holy"
+writers:
+  - "{writer}"
+status: "active"
+---
+"""
+
+SERVICE = """---
+date: "2025-03-09"
+songs:
+  - slug: "holy"
+    usage: ["main"]
+---
+"""
+
+
+def make_root(tmp_path: Path) -> Path:
+    for folder in ("songs", "services", "series"):
+        (tmp_path / folder).mkdir()
+    (tmp_path / "songs" / "holy.md").write_text(SONG.format(title="Holy", writer="Ann Lee"), encoding="utf-8")
+    (tmp_path / "songs" / "holy-2.md").write_text(SONG.format(title="Holy (Live)", writer="Bo Chen"), encoding="utf-8")
+    (tmp_path / "services" / "2025-03-09.md").write_text(SERVICE, encoding="utf-8")
+    return tmp_path
+
+
+def rendered(root: Path) -> dict[str, str]:
+    library = load_library(root)
+    return {name: library.render(name, NOW) for name in OUTPUT_NAMES}
+
+
+def test_song_files_sharing_a_slug_are_both_emitted(tmp_path: Path) -> None:
+    library = load_library(make_root(tmp_path))
+    songs = json.loads(library.render("songs.json", NOW))
+    assert [(song["title"], song["times_sung"]) for song in songs] == [("Holy", 1), ("Holy (Live)", 1)]
+    derived = library.derived(NOW)
+    assert [item["title"] for item in derived["top_songs"]] == ["Holy", "Holy (Live)"]
+    # Lookups by slug use the last song in title order, like build-index.ts's songBySlug.
+    assert derived["top_writers"] == [{"writer": "Bo Chen", "count": 1}]
+
+
+def test_incremental_updates_match_a_full_load(tmp_path: Path) -> None:
+    root = make_root(tmp_path)
+    library = load_library(root)
+    duplicate = root / "songs" / "holy-2.md"
+    duplicate.unlink()
+    library.apply_changes([duplicate])
+    assert {name: library.render(name, NOW) for name in OUTPUT_NAMES} == rendered(root)
+
+    duplicate.write_text(SONG.format(title="Again", writer="Cy Park"), encoding="utf-8")
+    library.apply_changes([duplicate])
+    assert {name: library.render(name, NOW) for name in OUTPUT_NAMES} == rendered(root)
+    assert library.derived(NOW)["top_writers"] == [{"writer": "Ann Lee", "count": 1}]
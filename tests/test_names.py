@@ -0,0 +1,27 @@
+from collections import Counter
+
+from hymnops.names import cluster_names, pick_canonical
+
+
+def test_typo_with_equal_count_does_not_become_canonical() -> None:
+    clusters = cluster_names(Counter({"Chris Tomlin": 3, "Chris Tomllin": 3}))
+    assert clusters == {"Chris Tomlin": ["Chris Tomllin"]}
+
+
+def test_tie_goes_to_the_spelling_other_members_agree_with() -> None:
+    members = ["Chris Tomllin", "Chris Tomlin", "Tomlin, Chris", "C. Tomlin"]
+    counts = Counter({"Chris Tomllin": 2, "Chris Tomlin": 2, "Tomlin, Chris": 1, "C. Tomlin": 1})
+    assert pick_canonical(members, counts, set()) == "Chris Tomlin"
+
+
+def test_more_used_spelling_still_wins() -> None:
+    assert pick_canonical(["Chris Tomlin", "Chris Tomllin"], Counter({"Chris Tomlin": 1, "Chris Tomllin": 4}), set()) == "Chris Tomllin"
+
+
+def test_saved_canonical_wins() -> None:
+    assert pick_canonical(["Chris Tomlin", "Chris Tomllin"], Counter({"Chris Tomlin": 4}), {"Chris Tomllin"}) == "Chris Tomllin"
+
+
+def test_bare_name_does_not_chain_different_middle_names() -> None:
+    clusters = cluster_names(Counter({"John Paul Smith": 1, "John Peter Smith": 1, "John Smith": 1}))
+    assert sorted(clusters) == ["John Paul Smith", "John Peter Smith", "John Smith"]
@@ -0,0 +1,78 @@
+from pathlib import Path
+
+import pytest
+
+from hymnops.records import Series, Service, Song, read_record
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SERIES = """---
+title: "Malachi"
+slug: "malachi"
+date_range: ["2025-03-09", "2025-04-13"]
+description: null
+recommended:
+  - "we-are-one"
+---
+
+Notes.
+"""
+
+SERVICE = """---
+date: "2025-03-09"
+series_slug: "malachi"
+sermon_title: "How have you loved us?"
+sermon_text: "Malachi 1:1 - 5"
+preacher: "Lincoln"
+songs:
+  - slug: "we-are-one"
+    usage: ["main"]
+    key: "G"
+    notes: null
+---
+"""
+
+
+def write(tmp_path: Path, text: str) -> Path:
+    path = tmp_path / "record.md"
+    path.write_bytes(text.encode("utf-8"))
+    return path
+
+
+@pytest.mark.parametrize(
+    ("kind", "folder"),
+    [(Song, "songs"), (Service, "services"), (Series, "series")],
+)
+def test_every_library_file_round_trips(kind: type, folder: str) -> None:
+    for path in sorted((ROOT / folder).glob("*.md")):
+        assert read_record(path, kind).to_markdown() == path.read_text(encoding="utf-8"), path.name
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        SERIES,
+        "\ufeff" + SERIES,
+        SERIES.replace("description: null\n", ""),
+        SERIES.replace("---\n\nNotes", 'owner: "music team"\n---\n\nNotes'),
+    ],
+    ids=["canonical", "bom", "omitted-key", "extra-key"],
+)
+def test_series_round_trips(tmp_path: Path, text: str) -> None:
+    assert read_record(write(tmp_path, text), Series).to_markdown() == text
+
+
+def test_service_song_without_optional_keys_round_trips(tmp_path: Path) -> None:
+    text = SERVICE.replace('    key: "G"\n    notes: null\n', "")
+    assert read_record(write(tmp_path, text), Service).to_markdown() == text
+
+
+def test_reordered_keys_come_back_in_model_order(tmp_path: Path) -> None:
+    text = SERIES.replace('title: "Malachi"\nslug: "malachi"\n', 'slug: "malachi"\ntitle: "Malachi"\n')
+    assert read_record(write(tmp_path, text), Series).to_markdown() == SERIES
+
+
+def test_crlf_comes_back_as_lf(tmp_path: Path) -> None:
+    text = SERIES.replace("\n", "\r\n")
+    assert read_record(write(tmp_path, text), Series).to_markdown() == SERIES
@@ -0,0 +1,51 @@
+from hymnops.records import Records, Series, Service, Song
+from hymnops.sermons import Sermon, SuggestionIndex, suggest_term
+
+
+def song(slug: str, *anchors: str) -> Song:
+    return Song.from_frontmatter({"title": slug.title(), "slug": slug, "status": "active", "scriptural_anchors": list(anchors)})
+
+
+def service(day: str, *slugs: str) -> Service:
+    return Service.from_frontmatter(
+        {"date": day, "series_slug": "malachi", "sermon_text": "Malachi 1:1 - 5", "songs": [{"slug": slug, "usage": ["main"]} for slug in slugs]}
+    )
+
+
+def series_sermon(day: str, text: str) -> Sermon:
+    return Sermon(date=day, series="Malachi", title="", text=text, preacher="")
+
+
+def library(services: list[Service]) -> SuggestionIndex:
+    songs = [song("strong", "Malachi 1:2", "Malachi 2:10"), song("third", "Malachi 2:1")]
+    songs += [song(f"filler-{n}", f"Malachi 1:{n}") for n in range(1, 5)]
+    series = [Series.from_frontmatter({"title": "Malachi", "slug": "malachi", "recommended": ["strong"]})]
+    return SuggestionIndex(Records(songs=songs, services=services, series=series))
+
+
+def test_consecutive_sermons_in_a_series_rest_the_top_pick() -> None:
+    index = library([])
+    plan = suggest_term(index, [series_sermon("2025-03-09", "Malachi 1:1 - 5"), series_sermon("2025-03-16", "Malachi 2:10 - 16")])
+    first, second = ([item["slug"] for item in entry["suggestions"]] for entry in plan)
+    assert first[0] == "strong"
+    assert "third" not in first[:5]
+    assert second[0] == "third"
+    assert "suggested 1 weeks before" in plan[1]["suggestions"][second.index("strong")]["reasons"]
+
+
+def test_use_before_a_past_sermon_counts_even_if_sung_again_later() -> None:
+    index = library([service("2025-03-02", "strong"), service("2025-06-01", "strong")])
+    entry = index.suggest(series_sermon("2025-03-09", "Malachi 1:1 - 5"))
+    picks = {item["slug"]: item for item in entry["suggestions"]}
+    assert "sung 1 weeks before" in picks["strong"]["reasons"]
+    assert entry["suggestions"][0]["slug"] != "strong"
+
+
+def test_penalty_shrinks_as_the_last_use_gets_older() -> None:
+    sermon = series_sermon("2025-03-30", "Malachi 1:1 - 5")
+    scores = []
+    for day in ["2025-03-23", "2025-03-16", "2025-03-09", "2025-03-02"]:
+        entry = library([service(day, "strong")]).suggest(sermon)
+        scores.append(next(item["score"] for item in entry["suggestions"] if item["slug"] == "strong"))
+    assert scores == sorted(scores)
+    assert scores[0] < scores[-1]